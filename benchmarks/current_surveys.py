@@ -0,0 +1,69 @@
+"""Times CurrentSurveysHelper for an increasing number of current
+survey sparsers, one survey schedule per map area, to show that
+resolution scales linearly.
+
+    python benchmarks/current_surveys.py [max number of sparsers]
+"""
+import os
+import sys
+
+from datetime import datetime, timezone
+from dateutil.relativedelta import relativedelta
+from timeit import default_timer as timer
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from survey import S, CompactSurvey, CompactSurveySchedule  # noqa
+from survey.helpers import CurrentSurveysHelper  # noqa
+
+start = datetime(2016, 1, 1, tzinfo=timezone.utc)
+survey_names = ['baseline', 'annual-1', 'annual-2']
+
+
+def build(map_area_count):
+    """Returns one survey schedule per map area, each with three
+    surveys, and a sparser for every survey.
+    """
+    survey_schedules = []
+    sparsers = []
+    for n in range(0, map_area_count):
+        map_area = f'community_{n}'
+        survey_schedule = CompactSurveySchedule(
+            name='year-1',
+            group_name='bcpp-survey',
+            map_area=map_area,
+            start=start,
+            end=start + relativedelta(years=1))
+        survey_schedule.add_survey(*[CompactSurvey(
+            name=name,
+            position=position,
+            map_area=map_area,
+            start=start + relativedelta(months=4 * position),
+            end=start + relativedelta(months=4 * position + 4, days=-1),
+            full_enrollment_datetime=start + relativedelta(months=4 * position + 1))
+            for position, name in enumerate(survey_names)])
+        survey_schedules.append(survey_schedule)
+        sparsers.extend(S(survey.field_value) for survey in survey_schedule.surveys)
+    return survey_schedules, sparsers
+
+
+def main(max_count=10000):
+    count = 1250
+    while count <= max_count:
+        survey_schedules, sparsers = build(count // len(survey_names) + 1)
+        sparsers = sparsers[:count]
+        t0 = timer()
+        helper = CurrentSurveysHelper(
+            current_survey_schedules=sparsers,
+            registered_survey_schedules=survey_schedules)
+        elapsed = timer() - t0
+        sys.stdout.write(
+            f'{len(sparsers):>6} sparsers, '
+            f'{len(helper.configuration.surveys):>6} current surveys, '
+            f'{elapsed * 1000:8.1f} ms, '
+            f'{elapsed * 1000000 / len(sparsers):6.1f} us per sparser\n')
+        count *= 2
+
+
+if __name__ == '__main__':
+    main(*[int(arg) for arg in sys.argv[1:]])
@@ -0,0 +1,70 @@
+"""Times registering survey schedules with site_surveys.register_many
+and with site_surveys.register, one at a time, to show that
+registration scales linearly.
+
+    python benchmarks/register_many.py [number of survey schedules]
+"""
+import os
+import sys
+
+from datetime import datetime, timezone
+from dateutil.relativedelta import relativedelta
+from timeit import default_timer as timer
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from survey import CompactSurvey, CompactSurveySchedule  # noqa
+from survey.site_surveys import SiteSurveys  # noqa
+
+start = datetime(2016, 1, 1, tzinfo=timezone.utc)
+
+
+def build(count):
+    """Returns survey schedules, one per day, each with one survey.
+    """
+    survey_schedules = []
+    for n in range(0, count):
+        survey_schedule = CompactSurveySchedule(
+            name=f'schedule-{n}',
+            group_name='bcpp-survey',
+            map_area='test_community',
+            start=start + relativedelta(days=n),
+            end=start + relativedelta(days=n + 30))
+        survey_schedule.add_survey(CompactSurvey(
+            name='baseline',
+            position=0,
+            map_area='test_community',
+            start=survey_schedule.start,
+            end=survey_schedule.end,
+            full_enrollment_datetime=survey_schedule.start + relativedelta(days=1)))
+        survey_schedules.append(survey_schedule)
+    return survey_schedules
+
+
+def main(count=20000):
+    survey_schedules = build(count)
+
+    site_surveys = SiteSurveys()
+    t0 = timer()
+    site_surveys.register_many(survey_schedules)
+    elapsed = timer() - t0
+    sys.stdout.write(
+        f'register_many {count:>6} survey schedules, {elapsed * 1000:8.1f} ms\n')
+
+    site_surveys = SiteSurveys()
+    t0 = timer()
+    for survey_schedule in survey_schedules:
+        site_surveys.register(survey_schedule)
+    elapsed = timer() - t0
+    sys.stdout.write(
+        f'register      {count:>6} survey schedules, {elapsed * 1000:8.1f} ms\n')
+
+    t0 = timer()
+    site_surveys.snapshot
+    elapsed = timer() - t0
+    sys.stdout.write(
+        f'snapshot      {count:>6} survey schedules, {elapsed * 1000:8.1f} ms\n')
+
+
+if __name__ == '__main__':
+    main(*[int(arg) for arg in sys.argv[1:]])
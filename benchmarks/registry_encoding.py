@@ -0,0 +1,108 @@
+"""Compares the memory held by a registry of Survey objects with the
+size of its RegistryEncoding, and times survey lookups, interval
+queries and navigation on each.
+
+The encoding makes its objects on first use, so the time to the first
+answers of a new process is compared with compiling a snapshot.
+
+    python benchmarks/registry_encoding.py [number of map areas]
+"""
+import os
+import sys
+import tracemalloc
+
+from datetime import datetime, timezone
+from dateutil.relativedelta import relativedelta
+from timeit import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from survey import Survey, SurveySchedule  # noqa
+from survey.registry_encoding import RegistryEncoding  # noqa
+from survey.registry_snapshot import RegistrySnapshot  # noqa
+
+start = datetime(2016, 1, 1, tzinfo=timezone.utc)
+survey_names = ['baseline', 'annual-1', 'annual-2']
+
+
+def build(map_area_count, schedule_count=3):
+    """Returns survey schedules, one per year, each with three
+    surveys per map area.
+    """
+    map_areas = [f'community_{n}' for n in range(0, map_area_count)]
+    survey_schedules = []
+    for year in range(0, schedule_count):
+        schedule_start = start + relativedelta(years=year)
+        survey_schedule = SurveySchedule(
+            name=f'year-{year + 1}',
+            group_name='bcpp-survey',
+            map_area=map_areas[0],
+            map_areas=map_areas,
+            start=schedule_start,
+            end=schedule_start + relativedelta(years=1, days=-1))
+        survey_schedule.add_survey(*[Survey(
+            name=name,
+            position=position,
+            map_area=map_area,
+            start=schedule_start + relativedelta(months=4 * position),
+            end=schedule_start + relativedelta(months=4 * position + 4, days=-1),
+            full_enrollment_datetime=(
+                schedule_start + relativedelta(months=4 * position + 1)))
+            for map_area in map_areas
+            for position, name in enumerate(survey_names)])
+        survey_schedules.append(survey_schedule)
+    return survey_schedules
+
+
+def main(map_area_count=1000):
+    tracemalloc.start()
+    survey_schedules = build(map_area_count)
+    snapshot = RegistrySnapshot(survey_schedules)
+    objects_size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    surveys = snapshot.surveys
+
+    encoding = RegistryEncoding(RegistryEncoding.encode(survey_schedules))
+    sys.stdout.write(
+        f'{len(surveys)} surveys\n'
+        f'objects and snapshot {objects_size:>12} bytes\n'
+        f'encoding             {len(encoding.buffer):>12} bytes\n')
+
+    buffer = encoding.buffer
+    survey = surveys[len(surveys) // 2]
+    reference_datetime, map_area = survey.start, survey.map_area
+    field_values = [s.field_value for s in surveys[::len(surveys) // 100]]
+
+    def first_answers(lookups):
+        for field_value in field_values:
+            lookups.get_survey(field_value)
+        lookups.nth_survey_schedule(survey_schedules[0], 1)
+
+    number = 10
+    for label, make_lookups in [
+            ('snapshot', lambda: RegistrySnapshot(survey_schedules)),
+            ('encoding', lambda: RegistryEncoding(buffer))]:
+        elapsed = timeit(lambda: first_answers(make_lookups()), number=number)
+        sys.stdout.write(
+            f'{label} load and first 100 lookups {elapsed * 1000 / number:8.2f} ms\n')
+
+    number = 10000
+    for label, lookups in [('snapshot', snapshot), ('encoding', encoding)]:
+        elapsed = timeit(lambda: lookups.get_survey(survey.field_value), number=number)
+        sys.stdout.write(
+            f'{label} get_survey {elapsed * 1000000 / number:8.2f} us\n')
+        lookups.surveys_at(reference_datetime)
+        elapsed = timeit(
+            lambda: lookups.surveys_at(reference_datetime, map_area=map_area),
+            number=number)
+        sys.stdout.write(
+            f'{label} surveys_at {elapsed * 1000000 / number:8.2f} us\n')
+        elapsed = timeit(
+            lambda: lookups.nth_survey_schedule(survey_schedules[0], 2),
+            number=number)
+        sys.stdout.write(
+            f'{label} nth_survey_schedule {elapsed * 1000000 / number:8.2f} us\n')
+
+
+if __name__ == '__main__':
+    main(*[int(arg) for arg in sys.argv[1:]])
@@ -0,0 +1,84 @@
+"""Shows the SQLite query plan and timing of the listboard filter on
+survey_schedule before and after adding the opt-in indexes of
+SurveyModelMixin.
+
+    python benchmarks/survey_indexes.py [number of rows]
+"""
+import os
+import sqlite3
+import sys
+
+from datetime import datetime, timedelta
+from time import perf_counter
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import django  # noqa
+from django.conf import settings  # noqa
+
+if not settings.configured:
+    # the model mixins need configured settings and a loaded app registry
+    settings.configure()
+    django.setup()
+
+from survey.model_mixins import SurveyModelMixin  # noqa
+
+table = 'subjectvisit'
+listboard_sql = (
+    f'SELECT id, survey, report_datetime FROM {table} '
+    f'WHERE survey_schedule = ? ORDER BY report_datetime DESC LIMIT 50')
+count_sql = f'SELECT COUNT(*) FROM {table} WHERE survey_schedule = ?'
+
+
+def build(connection, row_count):
+    connection.execute(
+        f'CREATE TABLE {table} (id INTEGER PRIMARY KEY, '
+        f'survey_schedule VARCHAR(150) NOT NULL, survey VARCHAR(150) NOT NULL, '
+        f'report_datetime DATETIME NOT NULL)')
+    survey_schedules = [
+        f'bcpp-survey.year-{year}.community_{n}'
+        for year in range(1, 4) for n in range(0, 30)]
+    start = datetime(2016, 1, 1)
+
+    def rows():
+        for n in range(0, row_count):
+            survey_schedule = survey_schedules[n % len(survey_schedules)]
+            group_name, name, map_area = survey_schedule.split('.')
+            yield (survey_schedule,
+                   f'{group_name}.{name}.baseline.{map_area}',
+                   (start + timedelta(minutes=n)).isoformat())
+    connection.executemany(
+        f'INSERT INTO {table} (survey_schedule, survey, report_datetime) '
+        f'VALUES (?, ?, ?)', rows())
+    connection.commit()
+    return survey_schedules[len(survey_schedules) // 2]
+
+
+def report(connection, label, survey_schedule, number=20):
+    sys.stdout.write(f'{label}\n')
+    for sql in [listboard_sql, count_sql]:
+        plan = connection.execute(
+            f'EXPLAIN QUERY PLAN {sql}', (survey_schedule, )).fetchall()
+        t0 = perf_counter()
+        for _ in range(0, number):
+            connection.execute(sql, (survey_schedule, )).fetchall()
+        elapsed = (perf_counter() - t0) / number
+        sys.stdout.write(
+            f'  {elapsed * 1000:9.2f} ms  {"; ".join(row[-1] for row in plan)}\n')
+
+
+def main(row_count=1000000):
+    connection = sqlite3.connect(':memory:')
+    survey_schedule = build(connection, row_count)
+    report(connection, f'{row_count} rows, no index', survey_schedule)
+    indexes = (SurveyModelMixin.survey_schedule_indexes('report_datetime')
+               + SurveyModelMixin.survey_indexes())
+    for n, index in enumerate(indexes):
+        connection.execute(
+            f'CREATE INDEX {table}_{n} ON {table} ({", ".join(index.fields)})')
+    fields = ', '.join(f'({", ".join(index.fields)})' for index in indexes)
+    report(connection, f'{row_count} rows, indexes on {fields}', survey_schedule)
+
+
+if __name__ == '__main__':
+    main(*[int(arg) for arg in sys.argv[1:]])
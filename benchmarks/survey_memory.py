@@ -0,0 +1,66 @@
+"""Compares the per-survey memory footprint of Survey and
+CompactSurvey (and their schedules) using tracemalloc.
+
+    python benchmarks/survey_memory.py [number of map areas]
+"""
+import os
+import sys
+import tracemalloc
+
+from datetime import datetime, timezone
+from dateutil.relativedelta import relativedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from survey import Survey, SurveySchedule, CompactSurvey, CompactSurveySchedule  # noqa
+
+start = datetime(2016, 1, 1, tzinfo=timezone.utc)
+
+
+def build(survey_cls, survey_schedule_cls, map_area_count):
+    survey_schedule = survey_schedule_cls(
+        name='year-1',
+        group_name='bcpp-survey',
+        map_area='community_0',
+        map_areas=[f'community_{n}' for n in range(0, map_area_count)],
+        start=start,
+        end=start + relativedelta(years=1))
+    surveys = []
+    for n in range(0, map_area_count):
+        for position, name in enumerate(['baseline', 'annual-1', 'annual-2']):
+            surveys.append(survey_cls(
+                name=name,
+                position=position,
+                map_area=f'community_{n}',
+                start=start + relativedelta(months=4 * position),
+                end=start + relativedelta(months=4 * position + 4, days=-1),
+                full_enrollment_datetime=(
+                    start + relativedelta(months=4 * position + 1))))
+    survey_schedule.add_survey(*surveys)
+    return survey_schedule
+
+
+def measure(survey_cls, survey_schedule_cls, map_area_count):
+    tracemalloc.start()
+    snapshot = tracemalloc.take_snapshot()
+    survey_schedule = build(survey_cls, survey_schedule_cls, map_area_count)
+    size = sum(stat.size_diff for stat in tracemalloc.take_snapshot().compare_to(
+        snapshot, 'filename'))
+    tracemalloc.stop()
+    return size, len(survey_schedule.registry)
+
+
+def main(map_area_count=30):
+    results = []
+    for survey_cls, survey_schedule_cls in [
+            (Survey, SurveySchedule), (CompactSurvey, CompactSurveySchedule)]:
+        size, count = measure(survey_cls, survey_schedule_cls, map_area_count)
+        results.append(size / count)
+        sys.stdout.write(
+            f'{survey_cls.__name__:<15} {count} surveys, {size} bytes, '
+            f'{size / count:.0f} bytes per survey\n')
+    sys.stdout.write(f'saving {100 * (1 - results[1] / results[0]):.0f}%\n')
+
+
+if __name__ == '__main__':
+    main(*[int(arg) for arg in sys.argv[1:]])
@@ -0,0 +1,73 @@
+"""Compares building a registry of Survey objects, one per map area,
+with building it from SurveyTemplates.
+
+    python benchmarks/survey_templates.py [number of map areas]
+"""
+import os
+import sys
+import tracemalloc
+
+from datetime import datetime, timezone
+from dateutil.relativedelta import relativedelta
+from time import perf_counter
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from survey import Survey, SurveySchedule, SurveyTemplate  # noqa
+
+start = datetime(2016, 1, 1, tzinfo=timezone.utc)
+survey_names = ['baseline', 'annual-1', 'annual-2']
+
+
+def build(map_area_count, templates=False, schedule_count=3):
+    """Returns survey schedules, one per year, each with three
+    surveys per map area.
+    """
+    map_areas = [f'community_{n}' for n in range(0, map_area_count)]
+    survey_schedules = []
+    for year in range(0, schedule_count):
+        schedule_start = start + relativedelta(years=year)
+        survey_schedule = SurveySchedule(
+            name=f'year-{year + 1}',
+            group_name='bcpp-survey',
+            map_area=map_areas[0],
+            map_areas=map_areas,
+            start=schedule_start,
+            end=schedule_start + relativedelta(years=1, days=-1))
+        options = [dict(
+            name=name,
+            position=position,
+            start=schedule_start + relativedelta(months=4 * position),
+            end=schedule_start + relativedelta(months=4 * position + 4, days=-1),
+            full_enrollment_datetime=(
+                schedule_start + relativedelta(months=4 * position + 1)))
+            for position, name in enumerate(survey_names)]
+        if templates:
+            survey_schedule.add_survey_template(
+                *[SurveyTemplate(**opts) for opts in options])
+        else:
+            survey_schedule.add_survey(
+                *[Survey(map_area=map_area, **opts)
+                  for map_area in map_areas for opts in options])
+        survey_schedules.append(survey_schedule)
+    return survey_schedules
+
+
+def main(map_area_count=30):
+    for label, templates in [('surveys  ', False), ('templates', True)]:
+        tracemalloc.start()
+        t0 = perf_counter()
+        survey_schedules = build(map_area_count, templates=templates)
+        elapsed = perf_counter() - t0
+        size = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        t0 = perf_counter()
+        survey_schedules[0].get_surveys(map_area='community_1')
+        lookup = perf_counter() - t0
+        sys.stdout.write(
+            f'{label} build {elapsed * 1000:8.2f} ms {size:>10} bytes, '
+            f'first get_surveys(map_area) {lookup * 1000000:8.2f} us\n')
+
+
+if __name__ == '__main__':
+    main(*[int(arg) for arg in sys.argv[1:]])
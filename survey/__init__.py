@@ -1,5 +1,5 @@
-from .sparser import S
+from .sparser import S, CompactS
 from .site_surveys import site_surveys
-from .survey import Survey
-from .survey_schedule import SurveySchedule
+from .survey import Survey, CompactSurvey, SurveyTemplate
+from .survey_schedule import SurveySchedule, CompactSurveySchedule
 from .view_mixins import SurveyViewMixin, SurveyQuerysetViewMixin
@@ -7,6 +7,8 @@ from django.conf import settings
 from django.core.management.color import color_style
 
 from .exceptions import SurveyError, SurveyMapAreaError
+from .registry_artifact import RegistryArtifact, RegistryArtifactError
+from .registry_encoding import RegistryEncoding, RegistryEncodingError
 from .site_surveys import site_surveys
 from .sparser import S
 
@@ -17,6 +19,9 @@ class AppConfig(DjangoApponfig):
     name = 'survey'
 
     use_settings = False
+    registry_artifact_cls = RegistryArtifact
+    registry_artifact_loaded = False
+    registry_encoding_cls = RegistryEncoding
 
     # format is S(group.survey_schedule.survey.map_area)
     current_surveys = [
@@ -24,6 +29,10 @@ class AppConfig(DjangoApponfig):
         S('test_survey.year-1.annual-1.test_community'),
         S('test_survey.year-1.annual-2.test_community')]
 
+    # named current surveys, e.g. one per map_area,
+    # format is {name: [S(...), ...]}. See site_surveys.using_current.
+    current_surveys_by_name = {}
+
     def ready(self):
         sys.stdout.write(f'Loading {self.verbose_name} ...\n')
         self.load_surveys()
@@ -43,6 +52,10 @@ class AppConfig(DjangoApponfig):
                         'CURRENT_SURVEYS.\n Set AppConfig.use_settings '
                         '= True to suppress this warning\n'))
             site_surveys.register_current(*self.current_surveys)
+            self.current_surveys_by_name = getattr(
+                settings, 'CURRENT_SURVEYS_BY_NAME', self.current_surveys_by_name)
+            for name, current_surveys in self.current_surveys_by_name.items():
+                site_surveys.register_current(*current_surveys, name=name)
             if (self.current_survey_schedule
                     and self.current_survey_schedule
                     not in site_surveys.get_survey_schedule_field_values()):
@@ -60,9 +73,14 @@ class AppConfig(DjangoApponfig):
             sys.stdout.write(' * current surveys are:\n')
             for survey in site_surveys.current_surveys:
                 sys.stdout.write(f'   - {survey.field_value}\n')
+            for name in site_surveys.current_configuration_names:
+                sys.stdout.write(f' * current surveys for \'{name}\' are:\n')
+                for survey in site_surveys.get_current_configuration(name).surveys:
+                    sys.stdout.write(f'   - {survey.field_value}\n')
             current_map_areas = ', '.join(site_surveys.current_map_areas)
             sys.stdout.write(
                 f' * detected map_areas: \'{current_map_areas}\'\n')
+            site_surveys.freeze()
         sys.stdout.write(f' Done loading {self.verbose_name}.\n')
 
     def load_surveys(self):
@@ -70,6 +88,15 @@ class AppConfig(DjangoApponfig):
 
         Set to 'manual' to prevent autodetecting surveys.
 
+        Set to 'compiled' to load surveys from the artifact written by
+        `python manage.py compile_surveys`. Set to 'mapped' to serve
+        surveys from the memory mapped encoding written by
+        `python manage.py compile_surveys --encoded`. Both fall back to
+        autodetect if the file is missing or out of date. With
+        'compiled' or 'mapped', a later import of a `surveys.py` module
+        returns its registered objects, see
+        `RegistryArtifact.install_modules`.
+
         Default behaviour is to autodetect.
         """
         try:
@@ -81,6 +108,43 @@ class AppConfig(DjangoApponfig):
                 style.WARNING(f' * Test environment. You need to load surveys '
                               f'manually using SurveyTestHelper. See '
                               f'settings.SURVEY_TEST_ENVIRONMENT.\n'))
+        elif load_surveys == 'compiled':
+            registry_artifact = self.registry_artifact_cls()
+            try:
+                survey_schedules = registry_artifact.read()
+            except RegistryArtifactError as e:
+                sys.stdout.write(style.WARNING(
+                    f' * {e} Autodetecting surveys instead. Run '
+                    f'\'python manage.py compile_surveys\'.\n'))
+                site_surveys.autodiscover()
+            else:
+                site_surveys.register_many(survey_schedules)
+                registry_artifact.install_modules()
+                self.registry_artifact_loaded = True
+                sys.stdout.write(
+                    f' * loaded surveys from {registry_artifact.path}\n')
+        elif load_surveys == 'mapped':
+            registry_artifact = self.registry_artifact_cls()
+            try:
+                registry_encoding = self.registry_encoding_cls.open()
+                if registry_encoding.source_hash != registry_artifact.source_hash:
+                    raise RegistryEncodingError(
+                        'Survey registry encoding is out of date. A surveys.py '
+                        'has changed.')
+            except RegistryEncodingError as e:
+                sys.stdout.write(style.WARNING(
+                    f' * {e} Autodetecting surveys instead. Run '
+                    f'\'python manage.py compile_surveys --encoded\'.\n'))
+                site_surveys.autodiscover()
+            else:
+                site_surveys.load_encoding(registry_encoding)
+                registry_artifact.install_modules(
+                    registry_encoding.compiled_names,
+                    registry_encoding.compiled_constants)
+                self.registry_artifact_loaded = True
+                sys.stdout.write(
+                    f' * serving surveys from '
+                    f'{self.registry_encoding_cls.default_path()}\n')
         else:
             site_surveys.autodiscover()
 
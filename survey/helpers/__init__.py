@@ -1,3 +1,5 @@
 from .current_surveys_helper import CurrentSurveysHelper, CurrentSurveyError
+from .current_surveys_helper import CurrentSurveys
 from .date_helper import DateHelper, DateError
-from .map_area_helper import MapAreaHelper
+from .map_area_helper import MapAreaHelper, MapAreaTable, map_area_table
+from .survey_overlap_helper import SurveyOverlapHelper
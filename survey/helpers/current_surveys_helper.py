@@ -1,15 +1,43 @@
 from django.core.exceptions import ValidationError
 
+from ..registry_snapshot import OrderedLinks
+
 
 class CurrentSurveyError(ValidationError):
     pass
 
 
+class CurrentSurveys:
+    """A validated current survey configuration.
+
+    survey_schedules are ordered by start, surveys by position.
+    `links` holds the next/previous links between the surveys.
+
+    Not changed once built; see `site_surveys.reload_current`.
+    """
+
+    def __init__(self, survey_schedules=None, surveys=None, name=None):
+        self.name = name
+        self.survey_schedules = tuple(survey_schedules or [])
+        self.surveys = tuple(surveys or [])
+        self.survey_schedule_set = frozenset(self.survey_schedules)
+        self.survey_set = frozenset(self.surveys)
+        self.map_areas = frozenset(survey.map_area for survey in self.surveys)
+        self.links = OrderedLinks(self.surveys)
+
+    def __repr__(self):
+        return (f'{self.__class__.__name__}(name={self.name}, '
+                f'survey_schedules={len(self.survey_schedules)}, '
+                f'surveys={len(self.surveys)})')
+
+
 class CurrentSurveysHelper:
 
-    def __init__(self, current_survey_schedules=None, registered_survey_schedules=None):
-        self.current_survey_schedules = []
-        self.current_surveys = []
+    current_surveys_cls = CurrentSurveys
+
+    def __init__(self, current_survey_schedules=None, registered_survey_schedules=None,
+                 name=None):
+        self.name = name
         self.registered_survey_schedules = {}
 
         for survey_schedule in registered_survey_schedules:
@@ -23,31 +51,55 @@ class CurrentSurveysHelper:
         except AttributeError:
             current_sparsers = current_survey_schedules
 
+        current_survey_schedules = {}
+        current_field_values = set()
+        survey_names = {}
         for sparser in current_sparsers:
+            field_value = sparser.survey_schedule_field_value
             registered_survey_schedule = self.registered_survey_schedules.get(
-                sparser.survey_schedule_field_value)
-            try:
-                survey_names = [
-                    s.survey_name for s in registered_survey_schedule.surveys]
-            except AttributeError:
+                field_value)
+            if not registered_survey_schedule:
                 raise CurrentSurveyError(
                     f'Survey schedule is not registered. Got {sparser}',
                     code='not_found')
-            else:
-                if sparser.survey_name not in survey_names:
-                    raise CurrentSurveyError(
-                        f'Survey schedule contains a survey that is not '
-                        f'registered. Got {sparser}',
-                        code='survey_name')
-            registered_survey_schedule.current = True
-            self.current_survey_schedules.append(registered_survey_schedule)
-        self.current_survey_schedules.sort(key=lambda x: x.start)
+            if field_value not in survey_names:
+                survey_names[field_value] = registered_survey_schedule.survey_names
+            if sparser.survey_name not in survey_names[field_value]:
+                raise CurrentSurveyError(
+                    f'Survey schedule contains a survey that is not '
+                    f'registered. Got {sparser}',
+                    code='survey_name')
+            current_survey_schedules[field_value] = registered_survey_schedule
+            current_field_values.add(sparser.survey_field_value)
+        self.current_survey_schedules = sorted(
+            current_survey_schedules.values(), key=lambda x: x.start)
 
-        for survey_schedule in self.current_survey_schedules:
-            for survey in survey_schedule.surveys:
-                if survey.field_value in [s.name for s in current_sparsers]:
-                    survey.current = True
-                    self.current_surveys.append(survey)
+        self.current_surveys = self.get_current_surveys(
+            current_sparsers, current_field_values)
+
+        self.configuration = self.current_surveys_cls(
+            survey_schedules=self.current_survey_schedules,
+            surveys=self.current_surveys,
+            name=self.name)
 
-        self.current_surveys = list(set(self.current_surveys))
-        self.current_surveys.sort(key=lambda x: x.position or 0)
+    def get_current_surveys(self, current_sparsers, current_field_values):
+        """Returns the current surveys ordered by position.
+
+        Surveys of survey templates are made for the current
+        map_areas only.
+        """
+        current_surveys = []
+        for survey_schedule in self.current_survey_schedules:
+            for survey in survey_schedule.registry:
+                if survey.field_value in current_field_values:
+                    current_surveys.append(survey)
+        template_field_values = set()
+        for sparser in current_sparsers:
+            survey = self.registered_survey_schedules[
+                sparser.survey_schedule_field_value].get_template_survey(
+                    sparser.survey_name, sparser.map_area)
+            if survey and survey.field_value not in template_field_values:
+                template_field_values.add(survey.field_value)
+                current_surveys.append(survey)
+        current_surveys.sort(key=lambda x: x.position or 0)
+        return current_surveys
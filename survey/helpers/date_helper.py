@@ -1,17 +1,50 @@
 import arrow
 
+from datetime import timedelta, timezone
+
 
 class DateError(Exception):
     pass
 
 
+def to_utc(dt):
+    """Returns the datetime converted to UTC.
+
+    A naive datetime is taken to be UTC, as arrow does.
+    """
+    if dt.tzinfo is None or dt.utcoffset() is None:
+        return dt.replace(tzinfo=timezone.utc)
+    return dt.astimezone(timezone.utc)
+
+
+def floor_hour(dt):
+    """Returns the datetime in UTC floored to the hour.
+
+    Same as arrow's `.to('utc').floor('hour')`.
+    """
+    return to_utc(dt).replace(minute=0, second=0, microsecond=0)
+
+
+def ceil_hour(dt):
+    """Returns the datetime in UTC ceiled to the last microsecond
+    of the hour.
+
+    Same as arrow's `.to('utc').ceil('hour')`.
+    """
+    return floor_hour(dt) + timedelta(hours=1, microseconds=-1)
+
+
+def to_arrow(dt):
+    return arrow.Arrow.fromdatetime(dt, dt.tzinfo).to('utc')
+
+
 class DateHelper:
 
     def __init__(self, start=None, end=None):
-        self.start = arrow.Arrow.fromdatetime(
-            start, start.tzinfo).to('utc').floor('hour').datetime
-        self.end = arrow.Arrow.fromdatetime(
-            end, end.tzinfo).to('utc').ceil('hour').datetime
+        self.start = floor_hour(start)
+        self.end = ceil_hour(end)
+        self._rstart = None
+        self._rend = None
 
         if self.start > self.end:
             start = self.start.strftime('%Y-%m-%d %Z')
@@ -29,8 +62,12 @@ class DateHelper:
 
     @property
     def rstart(self):
-        return arrow.Arrow.fromdatetime(self.start, self.start.tzinfo).to('utc')
+        if self._rstart is None:
+            self._rstart = to_arrow(self.start)
+        return self._rstart
 
     @property
     def rend(self):
-        return arrow.Arrow.fromdatetime(self.end, self.end.tzinfo).to('utc')
+        if self._rend is None:
+            self._rend = to_arrow(self.end)
+        return self._rend
@@ -1,20 +1,78 @@
 
+class MapAreaTable:
+    """Intern table of map areas.
+
+    Surveys that share a map area share one string and one display
+    value. The current map area is read from site_mappers once and
+    kept until `invalidate` is called.
+    """
+
+    def __init__(self):
+        self._map_areas = {}
+        self._displays = {}
+        self._current_map_area = None
+        self.current_map_area_loaded = False
+
+    def intern(self, map_area):
+        """Returns the table's copy of map_area, adding it and its
+        display value if new.
+        """
+        if map_area is None:
+            return None
+        try:
+            return self._map_areas[map_area]
+        except KeyError:
+            self._map_areas[map_area] = map_area
+            self._displays[map_area] = ' '.join(map_area.split('_')).title()
+            return map_area
+
+    def display(self, map_area):
+        """Returns the display value of a map area, e.g.
+        'Test Community' for 'test_community'.
+        """
+        try:
+            return self._displays[map_area]
+        except KeyError:
+            return self._displays[self.intern(map_area)]
+
+    @property
+    def current_map_area(self):
+        if not self.current_map_area_loaded:
+            from edc_map.site_mappers import site_mappers
+            self._current_map_area = self.intern(site_mappers.current_map_area)
+            self.current_map_area_loaded = True
+        return self._current_map_area
+
+    def invalidate(self):
+        """Forgets the current map area so that the next access
+        reads it again from site_mappers.
+        """
+        self._current_map_area = None
+        self.current_map_area_loaded = False
+
+
+map_area_table = MapAreaTable()
+
+
 class MapAreaHelper:
 
+    map_area_table = map_area_table
+
     def __init__(self, map_area=None, map_areas=None):
-        self.map_area = map_area or self.get_map_area()
+        self.map_area = self.map_area_table.intern(map_area) or self.get_map_area()
         self.map_areas = map_areas or []
         if not self.map_areas and self.map_area:
             self.map_areas = [self.map_area]
 
     @property
     def map_area_display(self):
-        return ' '.join(self.map_area.split('_')).title()
+        return self.map_area_table.display(self.map_area)
 
     def get_map_area(self):
-        """Returns a map area from AppConfig."""
-        from edc_map.site_mappers import site_mappers
-        return site_mappers.current_map_area
+        """Returns the current map area from site_mappers, read once
+        per registry load.
+        """
+        return self.map_area_table.current_map_area
 
 #     def validate_map_area(self):
 #
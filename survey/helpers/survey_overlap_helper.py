@@ -0,0 +1,66 @@
+from heapq import merge
+from itertools import groupby
+from operator import attrgetter
+
+
+class SurveyOverlapHelper:
+    """Finds surveys that overlap another survey for the same
+    map_area.
+
+    Pass the surveys of one survey schedule. Sorts once on
+    (map_area, start, end) and sweeps, O(n log n). Intervals are
+    closed (start <= datetime <= end), as in `SurveySchedule.get_surveys`.
+
+    Survey templates apply to every map_area of the schedule. They are
+    swept once on their own and merged, already sorted, into the sweep
+    of each map_area.
+    """
+
+    def __init__(self, surveys=None, survey_templates=None):
+        self.overlaps = []
+        surveys = list(surveys or [])
+        survey_templates = list(survey_templates or [])
+        if len(surveys) + len(survey_templates) < 2:
+            return
+        by_dates = attrgetter('start', 'end')
+        survey_templates.sort(key=by_dates)
+        self.sweep(survey_templates)
+        surveys.sort(key=lambda x: (x.map_area or '', x.start, x.end))
+        for _, group in groupby(surveys, key=lambda x: x.map_area or ''):
+            self.sweep(
+                merge(group, survey_templates, key=by_dates), survey_templates)
+
+    def sweep(self, surveys, survey_templates=None):
+        """Sweeps surveys of one map_area sorted on (start, end).
+
+        A pair of survey templates is skipped, see `__init__`.
+        """
+        templates = set(map(id, survey_templates or []))
+        reach = None  # the survey with the latest end
+        for survey in surveys:
+            if reach is not None and survey.start <= reach.end and not (
+                    id(survey) in templates and id(reach) in templates):
+                self.overlaps.append((reach, survey))
+            if reach is None or survey.end > reach.end:
+                reach = survey
+
+    @property
+    def messages(self):
+        messages = []
+        for survey, other in self.overlaps:
+            messages.append(
+                f'{survey.name} {self.format_dates(survey)} overlaps '
+                f'{other.name} {self.format_dates(other)} for '
+                f'{self.format_map_area(survey, other)}')
+        return messages
+
+    def format_dates(self, survey):
+        start = survey.start.strftime('%Y-%m-%d %H:%M %Z')
+        end = survey.end.strftime('%Y-%m-%d %H:%M %Z')
+        return f'{start} to {end}'
+
+    def format_map_area(self, survey, other):
+        map_area = survey.map_area or other.map_area
+        if map_area is None:
+            return 'all map_areas'
+        return f'map_area \'{map_area}\''
@@ -0,0 +1,70 @@
+from bisect import bisect_left, bisect_right
+
+
+class IntervalNode:
+
+    def __init__(self, center=None, items=None, left=None, right=None):
+        self.center = center
+        self.left = left
+        self.right = right
+        self.by_start = sorted(items, key=lambda x: x.start)
+        self.starts = [item.start for item in self.by_start]
+        self.by_end = sorted(items, key=lambda x: x.end)
+        self.ends = [item.end for item in self.by_end]
+
+
+class IntervalIndex:
+    """A static, centered interval tree of objects with a `start`
+    and `end` attr, e.g. surveys or survey schedules.
+
+    Intervals are closed (start <= datetime <= end), as in
+    `SurveySchedule.get_surveys`. A query costs O(log n + k).
+    """
+
+    def __init__(self, items=None):
+        self.items = tuple(items or [])
+        self.root = self.build(list(self.items))
+
+    def __repr__(self):
+        return f'{self.__class__.__name__}(items={len(self.items)})'
+
+    def __len__(self):
+        return len(self.items)
+
+    def build(self, items):
+        if not items:
+            return None
+        points = sorted([item.start for item in items] + [item.end for item in items])
+        center = points[len(points) // 2]
+        left, right, overlapping = [], [], []
+        for item in items:
+            if item.end < center:
+                left.append(item)
+            elif item.start > center:
+                right.append(item)
+            else:
+                overlapping.append(item)
+        return IntervalNode(
+            center=center,
+            items=overlapping,
+            left=self.build(left),
+            right=self.build(right))
+
+    def at(self, reference_datetime):
+        """Returns a list of items where start <= reference_datetime <= end.
+        """
+        found = []
+        node = self.root
+        while node:
+            if reference_datetime < node.center:
+                found.extend(
+                    node.by_start[:bisect_right(node.starts, reference_datetime)])
+                node = node.left
+            elif reference_datetime > node.center:
+                found.extend(
+                    node.by_end[bisect_left(node.ends, reference_datetime):])
+                node = node.right
+            else:
+                found.extend(node.by_start)
+                break
+        return found
@@ -8,9 +8,15 @@ class SurveyScheduleIterator:
     given model object.
 
     If no model_obj given, will iterate over all.
+
+    If single_query=True, fetches the objects of all survey
+    schedules in the iteration with one query on the first call
+    to `next` instead of one query per survey schedule.
+
+    `first`, `last` and `at` always use the single query.
     """
 
-    def __init__(self, model_obj=None, model_cls=None, **options):
+    def __init__(self, model_obj=None, model_cls=None, single_query=None, **options):
         self.n = 0
         if not model_cls:
             self.model_cls = model_obj.__class__
@@ -19,6 +25,8 @@ class SurveyScheduleIterator:
         self.filter_options = options
         self.model_obj = model_obj
         self.first_model_object = model_obj
+        self.single_query = single_query
+        self._objects = None
 
     def __iter__(self):
         self.n = 0
@@ -30,12 +38,17 @@ class SurveyScheduleIterator:
         Skips over a None in the sequence, e.g. returns "3" in sequence
         1, None, 3.
         """
-        if not self.model_obj and self.n == 0:
+        if self.single_query:
+            self.model_obj = self.next_fetched()
+        elif not self.model_obj and self.n == 0:
             for survey_schedule in site_surveys.get_survey_schedules():
-                self.model_obj = self.model_cls.objects.get(
-                    survey_schedule=survey_schedule,
-                    **self.filter_options)
-                if self.model_obj:
+                try:
+                    self.model_obj = self.model_cls.objects.get(
+                        survey_schedule=survey_schedule.field_value,
+                        **self.filter_options)
+                except ObjectDoesNotExist:
+                    continue
+                else:
                     break
         elif self.model_obj:
             survey_schedule_object = self.model_obj.survey_schedule_object
@@ -58,5 +71,101 @@ class SurveyScheduleIterator:
         return self.model_obj
 
     def __reversed__(self):
-        iterable = list(self)
-        return reversed(iterable)
+        """Returns an iterator over the objects, last first.
+
+        Given a model_obj, walks back from the last survey schedule
+        of the group with one query per survey schedule and stops
+        where the caller stops. Otherwise, or if single_query=True,
+        reverses the single query.
+        """
+        if self.first_model_object and not self.single_query:
+            return self.walk_back()
+        return reversed(self.get_objects())
+
+    def walk_back(self):
+        """Yields the objects of the survey schedules after
+        model_obj's, last first, skipping gaps.
+        """
+        survey_schedule = self.first_model_object.survey_schedule_object
+        for survey_schedule in reversed(
+                self.chain(survey_schedule and survey_schedule.next)):
+            try:
+                yield self.model_cls.objects.get(
+                    survey_schedule=survey_schedule.field_value,
+                    **self.filter_options)
+            except ObjectDoesNotExist:
+                continue
+
+    def first(self):
+        """Returns the first object or None.
+        """
+        objects = self.get_objects()
+        return objects[0] if objects else None
+
+    def last(self):
+        """Returns the last object or None, e.g. the object of the
+        most recent survey schedule.
+        """
+        objects = self.get_objects()
+        return objects[-1] if objects else None
+
+    def at(self, index):
+        """Returns the object at index or raises IndexError.
+
+        Negative indexes count from the last object.
+        """
+        return self.get_objects()[index]
+
+    def next_fetched(self):
+        """Returns the nth object of `fetch` or None.
+        """
+        try:
+            return self.get_objects()[self.n]
+        except IndexError:
+            return None
+
+    def get_objects(self):
+        """Returns the list of `fetch`, fetched once.
+        """
+        if self._objects is None:
+            self._objects = self.fetch()
+        return self._objects
+
+    def fetch(self):
+        """Returns a list of the objects of the iteration ordered by
+        survey schedule, fetched with one query.
+
+        Survey schedules without an object are skipped.
+        """
+        if self.first_model_object:
+            survey_schedule = self.first_model_object.survey_schedule_object
+            survey_schedules = self.chain(survey_schedule and survey_schedule.next)
+        else:
+            survey_schedules = site_surveys.get_survey_schedules()
+        objects = {}
+        for obj in self.model_cls.objects.filter(
+                survey_schedule__in=[s.field_value for s in survey_schedules],
+                **self.filter_options):
+            if obj.survey_schedule in objects:
+                raise self.model_cls.MultipleObjectsReturned(
+                    f'Expected one {self.model_cls._meta.object_name} per '
+                    f'survey schedule. Got more than one for '
+                    f'\'{obj.survey_schedule}\'.')
+            objects[obj.survey_schedule] = obj
+        if not self.first_model_object:
+            # start from the first survey schedule with an object
+            survey_schedules = self.chain(next(
+                (s for s in survey_schedules if s.field_value in objects), None))
+        return [objects[s.field_value] for s in survey_schedules
+                if s.field_value in objects]
+
+    @staticmethod
+    def chain(survey_schedule):
+        """Returns a list of the survey schedule followed by each
+        `next` survey schedule.
+        """
+        survey_schedules = []
+        while survey_schedule:
+            survey_schedules.append(survey_schedule)
+            survey_schedule = survey_schedule.next
+        return survey_schedules
@@ -0,0 +1,52 @@
+from django.apps import apps as django_apps
+from django.core.management.base import BaseCommand, CommandError
+
+from ...registry_artifact import RegistryArtifact
+from ...registry_encoding import RegistryEncoding
+from ...site_surveys import site_surveys
+
+
+class Command(BaseCommand):
+
+    help = ('Compiles the surveys found by autodiscover into the artifact '
+            'loaded if settings.LOAD_SURVEYS = \'compiled\'.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--path',
+            dest='path',
+            default=None,
+            help='Artifact path. Default: settings.SURVEY_REGISTRY_ARTIFACT.')
+        parser.add_argument(
+            '--encoded',
+            dest='encoded',
+            action='store_true',
+            default=False,
+            help=('Write the memory mappable encoding loaded if '
+                  'settings.LOAD_SURVEYS = \'mapped\'. Default path: '
+                  'settings.SURVEY_REGISTRY_ENCODING.'))
+
+    def handle(self, *args, **options):
+        app_config = django_apps.get_app_config('survey')
+        if app_config.registry_artifact_loaded or not site_surveys.loaded:
+            # discover from the surveys.py modules, not the artifact
+            RegistryArtifact.uninstall_modules()
+            site_surveys._registry = []
+            site_surveys.loaded = False
+            site_surveys.autodiscover()
+        if not site_surveys.loaded:
+            raise CommandError('No surveys found. Nothing to compile.')
+        registry_artifact = RegistryArtifact(path=options.get('path'))
+        if options.get('encoded'):
+            path = options.get('path') or RegistryEncoding.default_path()
+            RegistryEncoding.write(
+                path, site_surveys.registry,
+                source_hash=registry_artifact.source_hash,
+                compiled_names=registry_artifact.get_compiled_names(
+                    site_surveys.registry),
+                compiled_constants=registry_artifact.get_compiled_constants())
+        else:
+            path = registry_artifact.path
+            registry_artifact.write(site_surveys.registry)
+        self.stdout.write(self.style.SUCCESS(
+            f'Compiled {len(site_surveys.registry)} survey schedules to {path}.'))
@@ -0,0 +1,84 @@
+from django.db import models
+from django.db.models.query import ModelIterable
+from django.db.models.sql.constants import GET_ITERATOR_CHUNK_SIZE
+
+from .model_mixins import attach_survey_objects
+from .survey_codes import translate_survey_lookups
+
+
+class SurveyModelIterable(ModelIterable):
+    """Yields model instances with the survey schedule and survey
+    objects attached, see `SurveyQuerySetMixin.with_survey_objects`.
+
+    Instances are attached a chunk at a time and each distinct field
+    value is resolved once for the whole iteration. A row that does
+    not resolve does not stop the iteration, see
+    `attach_survey_objects`.
+    """
+
+    # Django >= 2.0 sets chunk_size from `iterator(chunk_size=...)`
+    chunk_size = GET_ITERATOR_CHUNK_SIZE
+
+    def __iter__(self):
+        survey_schedules = {}
+        surveys = {}
+        chunk = []
+        for obj in super().__iter__():
+            chunk.append(obj)
+            if len(chunk) >= self.chunk_size:
+                yield from attach_survey_objects(
+                    chunk, survey_schedules=survey_schedules, surveys=surveys)
+                chunk = []
+        if chunk:
+            yield from attach_survey_objects(
+                chunk, survey_schedules=survey_schedules, surveys=surveys)
+
+
+class SurveyQuerySetMixin:
+    """QuerySet mixin for models declared with SurveyScheduleModelMixin
+    or SurveyModelMixin.
+    """
+
+    def with_survey_objects(self):
+        """Returns a queryset that attaches `survey_schedule_object`
+        and `survey_object` to each instance as the queryset is
+        evaluated or iterated, including with `iterator()`.
+
+        Has no effect on `values()` or `values_list()` querysets.
+        """
+        clone = self._clone()
+        if issubclass(clone._iterable_class, ModelIterable):
+            clone._iterable_class = SurveyModelIterable
+        return clone
+
+
+class SurveyCodeQuerySetMixin(SurveyQuerySetMixin):
+    """QuerySet mixin for models declared with SurveyCodeModelMixin
+    or SurveyScheduleCodeModelMixin.
+
+    Translates `filter`, `exclude` and `get` keyword lookups on survey
+    and survey_schedule field values to lookups on their codes, see
+    `translate_survey_lookups`. Q objects are not translated.
+    """
+
+    def filter(self, *args, **kwargs):
+        return super().filter(*args, **translate_survey_lookups(self.model, **kwargs))
+
+    def exclude(self, *args, **kwargs):
+        return super().exclude(*args, **translate_survey_lookups(self.model, **kwargs))
+
+
+class SurveyQuerySet(SurveyQuerySetMixin, models.QuerySet):
+    pass
+
+
+class SurveyCodeQuerySet(SurveyCodeQuerySetMixin, models.QuerySet):
+    pass
+
+
+class SurveyManager(models.Manager.from_queryset(SurveyQuerySet)):
+    pass
+
+
+class SurveyCodeManager(models.Manager.from_queryset(SurveyCodeQuerySet)):
+    pass
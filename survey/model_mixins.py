@@ -1,43 +1,259 @@
 from django.db import models
 
+from .exceptions import SurveyError
 from .site_surveys import site_surveys
+from .survey_schedule import SurveyScheduleError
 
 
-class SurveyScheduleModelMixin(models.Model):
+def field_indexes(field_name, *partners):
+    """Returns a list of indexes on field_name, one composite index
+    per partner field or, if no partners, a single column index.
+
+    A composite index (field_name, partner) also serves filters on
+    field_name alone, so no single column index is added with it.
+    """
+    if not partners:
+        return [models.Index(fields=[field_name])]
+    return [models.Index(fields=[field_name, partner]) for partner in partners]
+
+
+class SurveyScheduleObjectMixin:
+    """Resolves `survey_schedule_object` from the model's
+    survey_schedule field value.
+
+    See SurveyScheduleModelMixin and SurveyScheduleCodeModelMixin.
+    """
+
+    # (field value, object) pairs kept on the instance, not pickled
+    survey_object_attrs = ('_survey_schedule_object',)
+
+    @property
+    def survey_schedule_object(self):
+        """Returns the survey schedule object for the field value.
+
+        Kept on the instance with the field value it was resolved
+        from, so reassigning `survey_schedule` resolves again.
+        """
+        field_value, survey_schedule = getattr(
+            self, '_survey_schedule_object', (None, None))
+        if survey_schedule and field_value == self.survey_schedule:
+            return survey_schedule
+        survey_schedule = site_surveys.get_survey_schedule_from_field_value(
+            self.survey_schedule)
+        self._survey_schedule_object = (self.survey_schedule, survey_schedule)
+        return survey_schedule
+
+    def __reduce__(self):
+        """Drops the resolved survey objects from the pickled state,
+        e.g. for the cache or session.
+        """
+        unpickle, args, data = super().__reduce__()
+        data = {k: v for k, v in data.items() if k not in self.survey_object_attrs}
+        return unpickle, args, data
+
+
+class SurveyObjectMixin(SurveyScheduleObjectMixin):
+    """Resolves `survey_object` from the model's survey field value.
+
+    See SurveyModelMixin and SurveyCodeModelMixin.
+    """
+
+    survey_object_attrs = ('_survey_schedule_object', '_survey_object')
+
+    @property
+    def survey_object(self):
+        """Returns the survey object for the field value.
+
+        Kept on the instance with the field value it was resolved
+        from, so reassigning `survey` resolves again.
+        """
+        field_value, survey = getattr(self, '_survey_object', (None, None))
+        if survey and field_value == self.survey:
+            return survey
+        survey = site_surveys.get_survey_from_field_value(self.survey)
+        self._survey_object = (self.survey, survey)
+        return survey
+
+
+class SurveyScheduleModelMixin(SurveyScheduleObjectMixin, models.Model):
     """Access survey schedule attrs via a model.
 
     Note: the model must set the survey_schedule field manually.
     For example, see post_save signal in household that creates
     HouseholdStructure instances.
+
+    The survey_schedule column is not indexed. To add indexes,
+    declare them on the model's Meta, for example:
+
+        class Meta:
+            indexes = SurveyScheduleModelMixin.survey_schedule_indexes(
+                'household', 'report_datetime')
     """
 
     survey_schedule = models.CharField(
         max_length=150,
         help_text='survey_schedule.field_value')
 
-    @property
-    def survey_schedule_object(self):
-        return site_surveys.get_survey_schedule_from_field_value(
-            self.survey_schedule)
+    @staticmethod
+    def survey_schedule_indexes(*partners):
+        """Returns indexes on survey_schedule for Meta.indexes, see
+        `field_indexes`.
+        """
+        return field_indexes('survey_schedule', *partners)
 
     class Meta:
         abstract = True
 
 
-class SurveyModelMixin(SurveyScheduleModelMixin):
+class SurveyModelMixin(SurveyObjectMixin, SurveyScheduleModelMixin):
     """Access survey attrs via a model.
 
     Note: the model must set the survey field manually.
     For example, see save methods on visit or CRFs.
+
+    As with survey_schedule, the survey column is not indexed, see
+    `survey_indexes`.
     """
 
     survey = models.CharField(
         max_length=150,
         help_text='survey.field_value')
 
+    @staticmethod
+    def survey_indexes(*partners):
+        """Returns indexes on survey for Meta.indexes, see
+        `field_indexes`.
+        """
+        return field_indexes('survey', *partners)
+
+    class Meta:
+        abstract = True
+
+
+class SurveyScheduleCodeModelMixin(SurveyScheduleObjectMixin, models.Model):
+    """Access survey schedule attrs via a model that stores the
+    survey schedule as an integer code, see `site_surveys.survey_codes`.
+
+    An alternative to SurveyScheduleModelMixin. `survey_schedule` is
+    a property that translates to and from the code. Use
+    SurveyCodeManager to filter on survey_schedule field values.
+
+    `survey_schedule` is None for a code that is not registered and
+    `survey_schedule_object` raises SurveyScheduleError.
+    """
+
+    survey_schedule_code = models.IntegerField(
+        null=True,
+        help_text='site_surveys.survey_codes.code(survey_schedule.field_value)')
+
+    @property
+    def survey_schedule(self):
+        return site_surveys.survey_codes.survey_schedule_field_value(
+            self.survey_schedule_code)
+
+    @survey_schedule.setter
+    def survey_schedule(self, field_value):
+        self.survey_schedule_code = site_surveys.survey_codes.code(field_value)
+
+    @property
+    def survey_schedule_object(self):
+        if self.survey_schedule is None:
+            raise SurveyScheduleError(
+                f'Unable to find a registered survey schedule for code '
+                f'{self.survey_schedule_code}.')
+        return super().survey_schedule_object
+
+    @staticmethod
+    def survey_schedule_indexes(*partners):
+        """Returns indexes on survey_schedule_code for Meta.indexes,
+        see `field_indexes`.
+        """
+        return field_indexes('survey_schedule_code', *partners)
+
+    class Meta:
+        abstract = True
+
+
+class SurveyCodeModelMixin(SurveyObjectMixin, SurveyScheduleCodeModelMixin):
+    """Access survey attrs via a model that stores the survey and
+    survey schedule as integer codes.
+
+    An alternative to SurveyModelMixin, see SurveyScheduleCodeModelMixin.
+
+    `survey` is None for a code that is not registered and
+    `survey_object` raises SurveyError.
+    """
+
+    survey_code = models.IntegerField(
+        null=True,
+        help_text='site_surveys.survey_codes.code(survey.field_value)')
+
+    @property
+    def survey(self):
+        return site_surveys.survey_codes.survey_field_value(self.survey_code)
+
+    @survey.setter
+    def survey(self, field_value):
+        self.survey_code = site_surveys.survey_codes.code(field_value)
+
     @property
     def survey_object(self):
-        return site_surveys.get_survey_from_field_value(self.survey)
+        if self.survey is None:
+            raise SurveyError(
+                f'Unable to find a registered survey for code {self.survey_code}.')
+        return super().survey_object
+
+    @staticmethod
+    def survey_indexes(*partners):
+        """Returns indexes on survey_code for Meta.indexes, see
+        `field_indexes`.
+        """
+        return field_indexes('survey_code', *partners)
 
     class Meta:
         abstract = True
+
+
+def attach_survey_objects(model_objs, survey_schedules=None, surveys=None):
+    """Resolves the survey schedule and survey objects for a list
+    of model instances and attaches them to each instance.
+
+    Each distinct field value is resolved once. To keep resolved
+    objects across calls, pass dictionaries of {field_value: object}
+    as `survey_schedules` and `surveys`. New values are added to
+    them. Returns the list.
+
+    A field value that does not resolve, e.g. of a stale or
+    unregistered row, does not raise here. None is attached and
+    `survey_schedule_object` or `survey_object` raise on access.
+    """
+    model_objs = list(model_objs)
+    survey_schedules = {} if survey_schedules is None else survey_schedules
+    surveys = {} if surveys is None else surveys
+    resolve_each(
+        site_surveys.get_survey_schedule_from_field_value,
+        (obj.survey_schedule for obj in model_objs), survey_schedules)
+    resolve_each(
+        site_surveys.get_survey_from_field_value,
+        (obj.survey for obj in model_objs if isinstance(obj, SurveyObjectMixin)),
+        surveys)
+    for obj in model_objs:
+        obj._survey_schedule_object = (
+            obj.survey_schedule, survey_schedules.get(obj.survey_schedule))
+        if isinstance(obj, SurveyObjectMixin):
+            obj._survey_object = (obj.survey, surveys.get(obj.survey))
+    return model_objs
+
+
+def resolve_each(get_object, field_values, resolved):
+    """Adds {field_value: object} to `resolved` for each distinct
+    field value not in it, or {field_value: None} if get_object
+    raises.
+    """
+    for field_value in dict.fromkeys(field_values):
+        if field_value not in resolved:
+            try:
+                resolved[field_value] = get_object(field_value)
+            except Exception:
+                # raised again on access, see survey_schedule_object
+                resolved[field_value] = None
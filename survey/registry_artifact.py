@@ -0,0 +1,261 @@
+import hashlib
+import os
+import pickle
+import sys
+
+from django.apps import apps as django_apps
+from django.conf import settings
+from importlib.util import find_spec
+from types import ModuleType
+
+from .site_surveys import site_surveys
+from .survey import BaseSurvey
+from .survey_schedule import BaseSurveySchedule
+
+
+class RegistryArtifactError(Exception):
+    pass
+
+
+def is_constant(value):
+    """Returns True if value is a plain constant, e.g. a str, a
+    number or a list or dict of them, that reads back the same from
+    a RegistryArtifact or a RegistryEncoding.
+    """
+    if value is None or isinstance(value, (str, int, float)):
+        return True
+    elif isinstance(value, list):
+        return all(is_constant(item) for item in value)
+    elif isinstance(value, dict):
+        return all(
+            isinstance(key, str) and is_constant(item) for key, item in value.items())
+    return False
+
+
+def get_registered_object(field_value):
+    """Returns the registered survey schedule or survey of a
+    field_value.
+    """
+    if field_value.count('.') == 2:
+        return site_surveys.get_survey_schedule_from_field_value(field_value)
+    return site_surveys.get_survey_from_field_value(field_value)
+
+
+class CompiledSurveysModule(ModuleType):
+    """Stands in for an INSTALLED_APP `surveys.py` module that was
+    not imported because the registry was loaded from an artifact.
+
+    Module-level names bound to a survey schedule or survey return
+    the registered object, so `from app.surveys import survey_one`
+    gets the object in site_surveys. Module-level plain constants,
+    e.g. `map_areas`, are set as compiled. Any other name runs the
+    module once, with already registered survey schedules ignored,
+    and rebinds the survey names to the registered objects.
+    """
+
+    def __init__(self, name, spec, compiled_names, constants=None):
+        super().__init__(name)
+        self.__dict__.update(constants or {})
+        self.__spec__ = spec
+        self.__loader__ = spec.loader
+        self.__file__ = spec.origin
+        self.__package__ = name.rpartition('.')[0]
+        self.__compiled_names__ = compiled_names
+        self.__executed__ = False
+
+    def __getattr__(self, name):
+        compiled_names = self.__dict__.get('__compiled_names__', {})
+        if name in compiled_names:
+            return get_registered_object(compiled_names[name])
+        if name.startswith('__') or self.__dict__.get('__executed__', True):
+            raise AttributeError(
+                f'module \'{self.__name__}\' has no attribute \'{name}\'')
+        self.exec_module()
+        return getattr(self, name)
+
+    def exec_module(self):
+        self.__executed__ = True
+        with site_surveys.ignoring_registered():
+            self.__spec__.loader.exec_module(self)
+        for name, field_value in self.__compiled_names__.items():
+            setattr(self, name, get_registered_object(field_value))
+
+
+class RegistryArtifact:
+    """A compiled, on-disk copy of the registered survey schedules.
+
+    Written by `python manage.py compile_surveys` and read by
+    AppConfig if settings.LOAD_SURVEYS = 'compiled'. Loading skips
+    autodiscover and the Survey and SurveySchedule __init__.
+
+    The artifact is invalid if its version differs or if any
+    INSTALLED_APP `surveys.py` changed since it was written.
+
+    The artifact also records the module-level names of the survey
+    schedules and surveys, and the plain constants, in each
+    `surveys.py`, see `install_modules`.
+
+    Dates a `surveys.py` computes from `get_utcnow()` are frozen at
+    compile time. The source hash does not detect that they are
+    stale, so compile again when they should move, e.g. on deploy.
+
+    The artifact is a pickle; only read artifacts you wrote.
+    """
+
+    version = 4
+    default_filename = 'survey_registry.pickle'
+
+    def __init__(self, path=None, module_name=None):
+        self.module_name = module_name or 'surveys'
+        self.compiled_names = {}
+        self.compiled_constants = {}
+        self.path = path or getattr(settings, 'SURVEY_REGISTRY_ARTIFACT', None)
+        if not self.path:
+            self.path = os.path.join(
+                getattr(settings, 'BASE_DIR', os.getcwd()), self.default_filename)
+
+    def __repr__(self):
+        return f'{self.__class__.__name__}(path=\'{self.path}\')'
+
+    @property
+    def sources(self):
+        """Returns a list of (module name, filename) of the
+        INSTALLED_APPS `surveys.py` modules, without importing them.
+        """
+        sources = []
+        for app_config in django_apps.get_app_configs():
+            module_name = f'{app_config.name}.{self.module_name}'
+            try:
+                spec = find_spec(module_name)
+            except (ImportError, AttributeError, ValueError):
+                spec = None
+            if spec and spec.origin and os.path.isfile(spec.origin):
+                sources.append((module_name, spec.origin))
+        return sorted(sources)
+
+    @property
+    def source_hash(self):
+        """Returns a hash of the content of the `surveys.py` modules.
+        """
+        source_hash = hashlib.sha256()
+        for module_name, filename in self.sources:
+            source_hash.update(module_name.encode())
+            with open(filename, 'rb') as f:
+                source_hash.update(f.read())
+        return source_hash.hexdigest()
+
+    def get_compiled_names(self, survey_schedules):
+        """Returns {module name: {name: field_value}} of the survey
+        schedules and surveys bound to module-level names in the
+        imported `surveys.py` modules.
+        """
+        field_values = set()
+        for survey_schedule in survey_schedules:
+            field_values.add(survey_schedule.field_value)
+            field_values.update(survey.field_value for survey in survey_schedule.registry)
+        compiled_names = {}
+        for module_name, _ in self.sources:
+            module = sys.modules.get(module_name)
+            if module is None:
+                continue
+            compiled_names[module_name] = {
+                name: value.field_value for name, value in vars(module).items()
+                if isinstance(value, (BaseSurvey, BaseSurveySchedule))
+                and value.field_value in field_values}
+        return compiled_names
+
+    def get_compiled_constants(self):
+        """Returns {module name: {name: value}} of the plain constants,
+        see `is_constant`, bound to module-level names in the imported
+        `surveys.py` modules.
+        """
+        compiled_constants = {}
+        for module_name, _ in self.sources:
+            module = sys.modules.get(module_name)
+            if module is None:
+                continue
+            compiled_constants[module_name] = {
+                name: value for name, value in vars(module).items()
+                if not name.startswith('__') and is_constant(value)}
+        return compiled_constants
+
+    def write(self, survey_schedules):
+        """Writes the survey schedules to the artifact.
+
+        Writes to a temporary file first so a running process does
+        not read a partial artifact.
+        """
+        data = {
+            'version': self.version,
+            'source_hash': self.source_hash,
+            'compiled_names': self.get_compiled_names(survey_schedules),
+            'compiled_constants': self.get_compiled_constants(),
+            'survey_schedules': list(survey_schedules)}
+        tmp_path = f'{self.path}.tmp'
+        with open(tmp_path, 'wb') as f:
+            pickle.dump(data, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, self.path)
+
+    def read(self):
+        """Returns a list of survey schedules or raises
+        RegistryArtifactError if the artifact is missing or invalid.
+        """
+        try:
+            with open(self.path, 'rb') as f:
+                data = pickle.load(f)
+        except FileNotFoundError:
+            raise RegistryArtifactError(
+                f'Survey registry artifact not found. Got {self.path}.')
+        except (pickle.UnpicklingError, EOFError, AttributeError,
+                ImportError) as e:
+            raise RegistryArtifactError(
+                f'Survey registry artifact is invalid. Got {e}. See {self.path}.')
+        if data.get('version') != self.version:
+            raise RegistryArtifactError(
+                f'Survey registry artifact version is invalid. Expected '
+                f'{self.version}. Got {data.get("version")}. See {self.path}.')
+        if data.get('source_hash') != self.source_hash:
+            raise RegistryArtifactError(
+                f'Survey registry artifact is out of date. A {self.module_name}.py '
+                f'has changed. See {self.path}.')
+        self.compiled_names = data.get('compiled_names') or {}
+        self.compiled_constants = data.get('compiled_constants') or {}
+        return data.get('survey_schedules')
+
+    def install_modules(self, compiled_names=None, compiled_constants=None):
+        """Installs a CompiledSurveysModule in sys.modules for each
+        `surveys.py` module read from the artifact, or given in
+        compiled_names and compiled_constants, and not imported.
+
+        Call once the survey schedules read are registered. A later
+        import of the module then does not register them again.
+        """
+        if compiled_names is None:
+            compiled_names = self.compiled_names
+            compiled_constants = self.compiled_constants
+        compiled_constants = compiled_constants or {}
+        for module_name, names in compiled_names.items():
+            if module_name in sys.modules:
+                continue
+            spec = find_spec(module_name)
+            if not spec:
+                continue
+            module = CompiledSurveysModule(
+                module_name, spec, names, compiled_constants.get(module_name))
+            sys.modules[module_name] = module
+            package_name, _, name = module_name.rpartition('.')
+            if package_name in sys.modules:
+                setattr(sys.modules[package_name], name, module)
+
+    @staticmethod
+    def uninstall_modules():
+        """Removes any CompiledSurveysModule from sys.modules so that
+        the `surveys.py` modules are imported again.
+        """
+        for module_name, module in list(sys.modules.items()):
+            if isinstance(module, CompiledSurveysModule):
+                del sys.modules[module_name]
+                package_name, _, name = module_name.rpartition('.')
+                package = sys.modules.get(package_name)
+                if getattr(package, name, None) is module:
+                    delattr(package, name)
@@ -0,0 +1,794 @@
+import json
+import mmap
+import os
+import struct
+
+from datetime import datetime, timedelta, timezone
+from django.conf import settings
+
+from .helpers.date_helper import to_arrow
+from .interval_index import IntervalIndex
+from .registry_snapshot import OrderedLinks
+from .sparser import parse, SurveyParserError
+from .survey import BaseSurvey
+from .survey_schedule import BaseSurveySchedule
+
+EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+MICROSECOND = timedelta(microseconds=1)
+NULL = 0xFFFFFFFF  # string id for None
+NO_CODE = -1  # code for None, see SurveyCodes
+
+# magic, version, reserved, source hash, string, schedule, survey and
+# map area id counts, the offset of each section, then the size of
+# the compiled names and constants section.
+HEADER = struct.Struct('<4sHH32sIIIIIIIIIIIII')
+# group_name, name, map_area, start, end, first survey,
+# survey count, first map area, map area count, code
+SCHEDULE = struct.Struct('<IIIqqIIIIi')
+# schedule index, name, map_area, position, start, end,
+# full_enrollment_datetime, first map area, map area count, code
+SURVEY = struct.Struct('<IIIiqqqIIi')
+OFFSET = struct.Struct('<I')
+
+
+class RegistryEncodingError(Exception):
+    pass
+
+
+def to_epoch(dt):
+    """Returns microseconds since the epoch for an aware datetime.
+    """
+    return (dt - EPOCH) // MICROSECOND
+
+
+def from_epoch(value):
+    return EPOCH + timedelta(microseconds=value)
+
+
+def to_code(code):
+    return NO_CODE if code is None else code
+
+
+def from_code(value):
+    return None if value == NO_CODE else value
+
+
+class RegistryEncoding:
+    """A compact, read-only encoding of the registered survey
+    schedules that can be memory mapped.
+
+    Holds fixed-width records for survey schedules and surveys,
+    epoch start and end columns and a sorted table of the names and
+    map areas. Forked workers that map the same file share its pages.
+
+    Survey schedule records are ordered by start and survey records
+    by survey schedule and position, as in the registry. Two index
+    sections order them by (group_name, name) and (name, map_area),
+    so lookups are binary searches. Lookups return
+    EncodedSurveySchedule and EncodedSurvey objects that read from
+    the encoding.
+
+    The objects are made once per process, on first use, and kept
+    with the results of the lookups that returned them. Navigation
+    and interval queries are indexed over the same objects on first
+    use, so a process serving from the encoding never compiles a
+    RegistrySnapshot.
+
+    The encoding also records the module-level names of the survey
+    schedules and surveys in each `surveys.py`, see
+    `RegistryArtifact.install_modules`.
+
+    See `site_surveys.load_encoding`.
+    """
+
+    magic = b'SVYR'
+    version = 4
+    default_filename = 'survey_registry.bin'
+
+    def __init__(self, buffer=None):
+        self.buffer = buffer
+        try:
+            header = HEADER.unpack_from(buffer, 0)
+        except struct.error as e:
+            raise RegistryEncodingError(f'Invalid survey registry encoding. Got {e}.')
+        (magic, version, _, source_hash, self.string_count,
+         self.schedule_count, self.survey_count, self.map_area_count,
+         self.offsets_offset, self.strings_offset, self.schedules_offset,
+         self.surveys_offset, self.map_areas_offset, self.schedule_lookup_offset,
+         self.survey_lookup_offset, self.compiled_offset,
+         self.compiled_size) = header
+        if magic != self.magic:
+            raise RegistryEncodingError(
+                'Invalid survey registry encoding. Bad magic number.')
+        if version != self.version:
+            raise RegistryEncodingError(
+                f'Invalid survey registry encoding version. Expected '
+                f'{self.version}. Got {version}.')
+        self.source_hash = source_hash.hex()
+        self._strings = None
+        self._string_ids = None
+        self._survey_schedule_objects = {}
+        self._survey_objects = {}
+        self._surveys_by_field_value = {}
+        self._surveys_by_map_area = {}
+        self._surveys_by_name = {}
+        self._survey_schedules = None
+        self._survey_schedules_by_group = None
+        self._survey_schedule_links = None
+        self._survey_schedule_intervals = None
+        self._surveys = None
+        self._survey_intervals = None
+        self._survey_intervals_by_map_area = None
+
+    def __repr__(self):
+        return (f'{self.__class__.__name__}(survey_schedules='
+                f'{self.schedule_count}, surveys={self.survey_count})')
+
+    @classmethod
+    def default_path(cls):
+        path = getattr(settings, 'SURVEY_REGISTRY_ENCODING', None)
+        if not path:
+            path = os.path.join(
+                getattr(settings, 'BASE_DIR', os.getcwd()), cls.default_filename)
+        return path
+
+    @classmethod
+    def encode(cls, survey_schedules, source_hash=None, compiled_names=None,
+               compiled_constants=None):
+        """Returns the encoding of the survey schedules as bytes.
+
+        compiled_names is {module name: {name: field_value}} and
+        compiled_constants {module name: {name: value}}, see
+        `RegistryArtifact.get_compiled_names`.
+        """
+        survey_schedules = list(survey_schedules)
+        strings = set()
+        for survey_schedule in survey_schedules:
+            strings.update([
+                survey_schedule.group_name, survey_schedule.name,
+                survey_schedule.map_area])
+            strings.update(survey_schedule.map_areas or [])
+            for survey in survey_schedule.surveys:
+                strings.update([survey.name, survey.map_area])
+                strings.update(survey.map_areas or [])
+        strings.discard(None)
+        strings = sorted(string.encode('utf-8') for string in strings)
+        string_ids = {string.decode('utf-8'): index
+                      for index, string in enumerate(strings)}
+
+        def string_id(string):
+            return NULL if string is None else string_ids[string]
+
+        offsets = [0]
+        for string in strings:
+            offsets.append(offsets[-1] + len(string))
+
+        map_area_ids = []
+
+        def add_map_areas(map_areas):
+            first = len(map_area_ids)
+            map_area_ids.extend(string_id(map_area) for map_area in map_areas or [])
+            return first, len(map_area_ids) - first
+
+        schedule_records = []
+        survey_records = []
+        survey_lookup = []
+        survey_schedules.sort(key=lambda x: x.start)
+        schedule_lookup = sorted(
+            range(0, len(survey_schedules)),
+            key=lambda x: (string_id(survey_schedules[x].group_name),
+                           string_id(survey_schedules[x].name)))
+        for index, survey_schedule in enumerate(survey_schedules):
+            surveys = survey_schedule.surveys
+            first = len(survey_records)
+            survey_lookup.extend(first + x for x in sorted(
+                range(0, len(surveys)),
+                key=lambda x: (string_id(surveys[x].name),
+                               string_id(surveys[x].map_area))))
+            schedule_records.append(SCHEDULE.pack(
+                string_id(survey_schedule.group_name),
+                string_id(survey_schedule.name),
+                string_id(survey_schedule.map_area),
+                to_epoch(survey_schedule.start),
+                to_epoch(survey_schedule.end),
+                len(survey_records), len(surveys),
+                *add_map_areas(survey_schedule.map_areas),
+                to_code(survey_schedule.code)))
+            for survey in surveys:
+                survey_records.append(SURVEY.pack(
+                    index,
+                    string_id(survey.name),
+                    string_id(survey.map_area),
+                    survey.position,
+                    to_epoch(survey.start),
+                    to_epoch(survey.end),
+                    to_epoch(survey.full_enrollment_datetime),
+                    *add_map_areas(survey.map_areas),
+                    to_code(survey.code)))
+
+        compiled = json.dumps(
+            dict(compiled_names=compiled_names or {},
+                 compiled_constants=compiled_constants or {}),
+            sort_keys=True).encode('utf-8')
+        sections = [
+            b''.join(OFFSET.pack(offset) for offset in offsets),
+            b''.join(strings),
+            b''.join(schedule_records),
+            b''.join(survey_records),
+            b''.join(OFFSET.pack(map_area_id) for map_area_id in map_area_ids),
+            b''.join(OFFSET.pack(index) for index in schedule_lookup),
+            b''.join(OFFSET.pack(index) for index in survey_lookup),
+            compiled]
+        section_offsets = []
+        position = HEADER.size
+        for index, section in enumerate(sections):
+            # align the sections to 8 bytes
+            padding = -position % 8
+            sections[index] = b'\0' * padding + section
+            section_offsets.append(position + padding)
+            position += padding + len(section)
+        header = HEADER.pack(
+            cls.magic, cls.version, 0,
+            bytes.fromhex(source_hash) if source_hash else b'\0' * 32,
+            len(strings), len(schedule_records), len(survey_records),
+            len(map_area_ids), *section_offsets, len(compiled))
+        return header + b''.join(sections)
+
+    @classmethod
+    def write(cls, path, survey_schedules, source_hash=None, compiled_names=None,
+              compiled_constants=None):
+        """Writes the encoding of the survey schedules to path.
+        """
+        path = path or cls.default_path()
+        tmp_path = f'{path}.tmp'
+        with open(tmp_path, 'wb') as f:
+            f.write(cls.encode(
+                survey_schedules, source_hash=source_hash,
+                compiled_names=compiled_names,
+                compiled_constants=compiled_constants))
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def open(cls, path=None):
+        """Returns a RegistryEncoding that memory maps the file
+        read-only.
+        """
+        path = path or cls.default_path()
+        try:
+            with open(path, 'rb') as f:
+                buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (FileNotFoundError, ValueError) as e:
+            raise RegistryEncodingError(
+                f'Unable to open survey registry encoding. Got {e}.')
+        return cls(buffer)
+
+    def string_bytes(self, string_id):
+        start, end = struct.unpack_from(
+            '<II', self.buffer, self.offsets_offset + OFFSET.size * string_id)
+        return self.buffer[self.strings_offset + start:self.strings_offset + end]
+
+    @property
+    def strings(self):
+        """Returns the decoded string table.
+
+        The table holds only names and map areas, so it is decoded
+        once per process. The records are read from the buffer.
+        """
+        if self._strings is None:
+            self._strings = [
+                self.string_bytes(string_id).decode('utf-8')
+                for string_id in range(0, self.string_count)]
+            self._string_ids = {
+                string: string_id for string_id, string in enumerate(self._strings)}
+        return self._strings
+
+    def string(self, string_id):
+        if string_id == NULL:
+            return None
+        return self.strings[string_id]
+
+    def string_id(self, string):
+        """Returns the id of a string or None if not in the table.
+        """
+        if string is None:
+            return NULL
+        self.strings
+        return self._string_ids.get(string)
+
+    def map_area_list(self, first, count):
+        return [self.string(OFFSET.unpack_from(
+            self.buffer, self.map_areas_offset + OFFSET.size * index)[0])
+            for index in range(first, first + count)]
+
+    def schedule_record(self, index):
+        return SCHEDULE.unpack_from(
+            self.buffer, self.schedules_offset + SCHEDULE.size * index)
+
+    def survey_record(self, index):
+        return SURVEY.unpack_from(
+            self.buffer, self.surveys_offset + SURVEY.size * index)
+
+    def schedule_lookup(self, position):
+        return OFFSET.unpack_from(
+            self.buffer, self.schedule_lookup_offset + OFFSET.size * position)[0]
+
+    def survey_lookup(self, position):
+        return OFFSET.unpack_from(
+            self.buffer, self.survey_lookup_offset + OFFSET.size * position)[0]
+
+    def schedule_index(self, group_name, name):
+        """Returns the index of the survey schedule or None.
+        """
+        key = (self.string_id(group_name), self.string_id(name))
+        if None in key:
+            return None
+        low, high = 0, self.schedule_count
+        while low < high:
+            middle = (low + high) // 2
+            if self.schedule_record(self.schedule_lookup(middle))[:2] < key:
+                low = middle + 1
+            else:
+                high = middle
+        if low < self.schedule_count:
+            index = self.schedule_lookup(low)
+            if self.schedule_record(index)[:2] == key:
+                return index
+        return None
+
+    def survey_indexes(self, schedule_index, name, map_area=None):
+        """Returns a list of indexes of the surveys in the survey
+        schedule with this name and, if given, map_area.
+        """
+        key = (self.string_id(name),)
+        if map_area is not None:
+            key += (self.string_id(map_area),)
+        if None in key:
+            return []
+        first, count = self.schedule_record(schedule_index)[5:7]
+        low, high = first, first + count
+        while low < high:
+            middle = (low + high) // 2
+            if self.survey_record(self.survey_lookup(middle))[1:1 + len(key)] < key:
+                low = middle + 1
+            else:
+                high = middle
+        indexes = []
+        while low < first + count:
+            index = self.survey_lookup(low)
+            if self.survey_record(index)[1:1 + len(key)] != key:
+                break
+            indexes.append(index)
+            low += 1
+        return indexes
+
+    @property
+    def compiled_names(self):
+        """Returns {module name: {name: field_value}}.
+        """
+        return self.compiled['compiled_names']
+
+    @property
+    def compiled_constants(self):
+        """Returns {module name: {name: value}}.
+        """
+        return self.compiled['compiled_constants']
+
+    @property
+    def compiled(self):
+        start = self.compiled_offset
+        return json.loads(self.buffer[start:start + self.compiled_size].decode('utf-8'))
+
+    def survey_schedule_object(self, index):
+        """Returns the EncodedSurveySchedule at index, made once.
+        """
+        try:
+            return self._survey_schedule_objects[index]
+        except KeyError:
+            survey_schedule = EncodedSurveySchedule(self, index)
+            self._survey_schedule_objects[index] = survey_schedule
+            return survey_schedule
+
+    def survey_object(self, index):
+        """Returns the EncodedSurvey at index, made once.
+        """
+        try:
+            return self._survey_objects[index]
+        except KeyError:
+            survey = EncodedSurvey(self, index)
+            self._survey_objects[index] = survey
+            return survey
+
+    def get_survey_schedule(self, group_name, name):
+        index = self.schedule_index(group_name, name)
+        return None if index is None else self.survey_schedule_object(index)
+
+    @property
+    def survey_schedules(self):
+        """Returns a tuple of all survey schedules ordered by start.
+        """
+        if self._survey_schedules is None:
+            self._survey_schedules = tuple(
+                self.survey_schedule_object(index)
+                for index in range(0, self.schedule_count))
+        return self._survey_schedules
+
+    @property
+    def surveys(self):
+        """Returns a tuple of all surveys ordered by start.
+        """
+        if self._surveys is None:
+            surveys = [
+                self.survey_object(index) for index in range(0, self.survey_count)]
+            surveys.sort(key=lambda x: x.start)
+            self._surveys = tuple(surveys)
+        return self._surveys
+
+    @property
+    def survey_schedule_field_values(self):
+        return sorted(s.field_value for s in self.survey_schedules)
+
+    @property
+    def map_areas(self):
+        return frozenset(
+            self.string(self.survey_record(index)[2])
+            for index in range(0, self.survey_count))
+
+    def get_survey_schedules(self, group_name=None):
+        """Returns a tuple of survey schedules ordered by start.
+        """
+        if not group_name:
+            return self.survey_schedules
+        return self.survey_schedules_by_group.get(group_name, ())
+
+    @property
+    def survey_schedules_by_group(self):
+        """Returns {group_name: tuple of survey schedules ordered by
+        start}, made once.
+        """
+        if self._survey_schedules_by_group is None:
+            groups = {}
+            for survey_schedule in self.survey_schedules:
+                groups.setdefault(survey_schedule.group_name, []).append(
+                    survey_schedule)
+            self._survey_schedules_by_group = {
+                group_name: tuple(survey_schedules)
+                for group_name, survey_schedules in groups.items()}
+        return self._survey_schedules_by_group
+
+    def get_survey(self, field_value):
+        """Returns a survey or None using the survey field_value.
+        """
+        try:
+            return self._surveys_by_field_value[field_value]
+        except (KeyError, TypeError):
+            pass
+        try:
+            parsed = parse(field_value)
+        except (SurveyParserError, AttributeError):
+            return None
+        survey = self.find_survey(
+            parsed.group_name, parsed.survey_schedule_name, parsed.survey_name,
+            map_area=parsed.map_area)
+        if survey is not None:
+            self._surveys_by_field_value[field_value] = survey
+        return survey
+
+    def get_survey_by_map_area(self, survey_schedule, name, map_area):
+        """Returns the survey in the survey schedule with this name
+        and map_area or None.
+        """
+        return self.find_survey(
+            survey_schedule.group_name, survey_schedule.name, name, map_area=map_area)
+
+    def get_survey_by_name(self, survey_schedule, name):
+        """Returns the first survey in the survey schedule with this
+        name or None.
+        """
+        key = (survey_schedule.group_name, survey_schedule.name, name)
+        try:
+            return self._surveys_by_name[key]
+        except KeyError:
+            pass
+        index = self.schedule_index(survey_schedule.group_name, survey_schedule.name)
+        if index is None:
+            return None
+        indexes = self.survey_indexes(index, name)
+        if not indexes:
+            return None
+        survey = self.survey_object(min(indexes))
+        self._surveys_by_name[key] = survey
+        return survey
+
+    def find_survey(self, group_name, survey_schedule_name, name, map_area=None):
+        """Returns the survey with this name and map_area in the
+        survey schedule or None.
+
+        Found surveys are kept by the arguments.
+        """
+        key = (group_name, survey_schedule_name, name, map_area)
+        try:
+            return self._surveys_by_map_area[key]
+        except KeyError:
+            pass
+        index = self.schedule_index(group_name, survey_schedule_name)
+        if index is None:
+            return None
+        indexes = self.survey_indexes(index, name, map_area=map_area)
+        if not indexes:
+            return None
+        survey = self.survey_object(indexes[0])
+        self._surveys_by_map_area[key] = survey
+        return survey
+
+    def surveys_at(self, reference_datetime, map_area=None):
+        """Returns a list of surveys, ordered by start, where
+        start <= reference_datetime <= end.
+        """
+        if self._survey_intervals is None:
+            surveys_by_map_area = {}
+            for survey in self.surveys:
+                surveys_by_map_area.setdefault(survey.map_area, []).append(survey)
+            self._survey_intervals_by_map_area = {
+                map_area: IntervalIndex(surveys)
+                for map_area, surveys in surveys_by_map_area.items()}
+            self._survey_intervals = IntervalIndex(self.surveys)
+        if map_area:
+            intervals = self._survey_intervals_by_map_area.get(map_area)
+        else:
+            intervals = self._survey_intervals
+        surveys = intervals.at(reference_datetime) if intervals else []
+        surveys.sort(key=lambda x: x.start)
+        return surveys
+
+    def survey_schedules_at(self, reference_datetime, group_name=None):
+        """Returns a list of survey schedules, ordered by start,
+        where start <= reference_datetime <= end.
+        """
+        if self._survey_schedule_intervals is None:
+            self._survey_schedule_intervals = IntervalIndex(self.survey_schedules)
+        survey_schedules = self._survey_schedule_intervals.at(reference_datetime)
+        if group_name:
+            survey_schedules = [
+                s for s in survey_schedules if s.group_name == group_name]
+        survey_schedules.sort(key=lambda x: x.start)
+        return survey_schedules
+
+    def nth_survey_schedule(self, survey_schedule, k):
+        """Returns the survey schedule k steps from the given survey
+        schedule within its group or None.
+        """
+        if self._survey_schedule_links is None:
+            self._survey_schedule_links = {
+                group_name: OrderedLinks(survey_schedules)
+                for group_name, survey_schedules
+                in self.survey_schedules_by_group.items()}
+        links = self._survey_schedule_links.get(survey_schedule.group_name)
+        return links.nth(survey_schedule, k) if links else None
+
+
+class EncodedSurveySchedule(BaseSurveySchedule):
+    """A read-only survey schedule that reads its attributes from
+    a RegistryEncoding.
+
+    Get instances from the encoding, see
+    `RegistryEncoding.survey_schedule_object`.
+    """
+
+    __slots__ = (
+        'encoding', 'index', '_record', '_start', '_end', '_rstart', '_rend',
+        '_field_value', '_registry')
+
+    def __init__(self, encoding=None, index=None):
+        self.encoding = encoding
+        self.index = index
+        self._record = None
+        self._start = None
+        self._end = None
+        self._rstart = None
+        self._rend = None
+        self._field_value = None
+        self._registry = None
+
+    def reset_identity(self):
+        pass
+
+    @property
+    def record(self):
+        if self._record is None:
+            self._record = self.encoding.schedule_record(self.index)
+        return self._record
+
+    @property
+    def name(self):
+        return self.encoding.string(self.record[1])
+
+    @property
+    def group_name(self):
+        return self.encoding.string(self.record[0])
+
+    @property
+    def map_area(self):
+        return self.encoding.string(self.record[2])
+
+    @property
+    def map_areas(self):
+        return self.encoding.map_area_list(*self.record[7:9])
+
+    @property
+    def map_area_display(self):
+        return self.map_area_helper_cls(map_area=self.map_area).map_area_display
+
+    @property
+    def code(self):
+        return from_code(self.record[9])
+
+    @property
+    def start(self):
+        if self._start is None:
+            self._start = from_epoch(self.record[3])
+        return self._start
+
+    @property
+    def end(self):
+        if self._end is None:
+            self._end = from_epoch(self.record[4])
+        return self._end
+
+    @property
+    def rstart(self):
+        if self._rstart is None:
+            self._rstart = to_arrow(self.start)
+        return self._rstart
+
+    @property
+    def rend(self):
+        if self._rend is None:
+            self._rend = to_arrow(self.end)
+        return self._rend
+
+    @property
+    def registry(self):
+        """Returns the surveys ordered by position.
+        """
+        if self._registry is None:
+            first, count = self.record[5:7]
+            self._registry = [self.encoding.survey_object(index)
+                              for index in range(first, first + count)]
+        return list(self._registry)
+
+    @property
+    def survey_groups(self):
+        return []
+
+    @property
+    def survey_templates(self):
+        return []
+
+    @property
+    def field_value(self):
+        if self._field_value is None:
+            group_id, name_id, map_area_id = self.record[:3]
+            self._field_value = (
+                f'{self.encoding.string(group_id)}.{self.encoding.string(name_id)}.'
+                f'{self.encoding.string(map_area_id)}')
+        return self._field_value
+
+    @property
+    def short_name(self):
+        return f'{self.group_name}.{self.name}'
+
+    def add_survey(self, *surveys):
+        raise RegistryEncodingError(
+            f'Unable to add survey. Survey schedule is read-only. Got {repr(self)}.')
+
+
+class EncodedSurvey(BaseSurvey):
+    """A read-only survey that reads its attributes from
+    a RegistryEncoding.
+
+    Get instances from the encoding, see
+    `RegistryEncoding.survey_object`.
+    """
+
+    __slots__ = (
+        'encoding', 'index', '_record', '_start', '_end', '_rstart', '_rend',
+        '_field_value')
+
+    def __init__(self, encoding=None, index=None):
+        self.encoding = encoding
+        self.index = index
+        self._record = None
+        self._start = None
+        self._end = None
+        self._rstart = None
+        self._rend = None
+        self._field_value = None
+
+    def reset_identity(self):
+        pass
+
+    @property
+    def record(self):
+        if self._record is None:
+            self._record = self.encoding.survey_record(self.index)
+        return self._record
+
+    @property
+    def survey_schedule(self):
+        return self.encoding.survey_schedule_object(self.record[0])
+
+    @property
+    def name(self):
+        return self.encoding.string(self.record[1])
+
+    @property
+    def survey_name(self):
+        return self.name
+
+    @property
+    def map_area(self):
+        return self.encoding.string(self.record[2])
+
+    @property
+    def map_areas(self):
+        return self.encoding.map_area_list(*self.record[7:9])
+
+    @property
+    def map_area_display(self):
+        return self.map_area_helper_cls(map_area=self.map_area).map_area_display
+
+    @property
+    def position(self):
+        return self.record[3]
+
+    @property
+    def code(self):
+        return from_code(self.record[9])
+
+    @property
+    def start(self):
+        if self._start is None:
+            self._start = from_epoch(self.record[4])
+        return self._start
+
+    @property
+    def end(self):
+        if self._end is None:
+            self._end = from_epoch(self.record[5])
+        return self._end
+
+    @property
+    def full_enrollment_datetime(self):
+        return from_epoch(self.record[6])
+
+    @property
+    def rstart(self):
+        if self._rstart is None:
+            self._rstart = to_arrow(self.start)
+        return self._rstart
+
+    @property
+    def rend(self):
+        if self._rend is None:
+            self._rend = to_arrow(self.end)
+        return self._rend
+
+    @property
+    def field_value(self):
+        if self._field_value is None:
+            schedule_index, name_id, map_area_id = self.record[:3]
+            group_id, schedule_name_id = self.encoding.schedule_record(
+                schedule_index)[:2]
+            string = self.encoding.string
+            self._field_value = (
+                f'{string(group_id)}.{string(schedule_name_id)}.'
+                f'{string(name_id)}.{string(map_area_id)}')
+        return self._field_value
+
+    @property
+    def short_name(self):
+        return f'{self.schedule_name}.{self.name}'
+
+    @property
+    def breadcrumbs(self):
+        return [self.group_name, self.schedule_name, self.name]
@@ -0,0 +1,229 @@
+from bisect import bisect_left, bisect_right
+
+from .interval_index import IntervalIndex
+from .sparser import parse, SurveyParserError
+
+
+class OrderedLinks:
+    """Precomputed next/previous links over items with a start.
+
+    As with the original `next_survey` and `previous_survey` filters,
+    the next item is the first item, in the given order, that starts
+    after the item and the previous item is the last item, in the
+    given order, that starts before it. Items sharing a start are
+    not linked to each other.
+    """
+
+    def __init__(self, items=None):
+        self.items = tuple(items or [])
+        groups = {}
+        for index, item in enumerate(self.items):
+            groups[item.start] = (groups.get(item.start, (index, ))[0], index)
+        self.starts = sorted(groups)
+        # index of the first item starting at or after starts[j]
+        self.first_from = [None] * (len(self.starts) + 1)
+        for j in range(len(self.starts) - 1, -1, -1):
+            first = groups[self.starts[j]][0]
+            following = self.first_from[j + 1]
+            self.first_from[j] = first if following is None else min(first, following)
+        # index of the last item starting before starts[j]
+        self.last_before = [None] * (len(self.starts) + 1)
+        for j, start in enumerate(self.starts):
+            last = groups[start][1]
+            preceding = self.last_before[j]
+            self.last_before[j + 1] = last if preceding is None else max(last, preceding)
+        self.nexts = {item: self.find_next(item) for item in self.items}
+        self.previouses = {item: self.find_previous(item) for item in self.items}
+
+    def find_next(self, item):
+        index = self.first_from[bisect_right(self.starts, item.start)]
+        return None if index is None else self.items[index]
+
+    def find_previous(self, item):
+        index = self.last_before[bisect_left(self.starts, item.start)]
+        return None if index is None else self.items[index]
+
+    def nth(self, item, k):
+        """Returns the item k steps after (or before, if negative)
+        the given item or None.
+        """
+        for _ in range(0, abs(k)):
+            if item is None:
+                break
+            item = self.next(item) if k > 0 else self.previous(item)
+        return item
+
+    def next(self, item):
+        try:
+            return self.nexts[item]
+        except KeyError:
+            return self.find_next(item)
+
+    def previous(self, item):
+        try:
+            return self.previouses[item]
+        except KeyError:
+            return self.find_previous(item)
+
+
+class RegistrySnapshot:
+    """An immutable, precompiled view of the survey schedules
+    registered with `site_surveys`.
+
+    Built once from the registry. Anything that changes the registry
+    should build a new snapshot. The current surveys are held
+    separately, see CurrentSurveys.
+
+    Surveys of survey templates are not indexed. The lookups ask the
+    survey schedule for them and the views over all surveys, e.g.
+    `surveys`, are compiled on first use.
+    """
+
+    def __init__(self, survey_schedules=None):
+        survey_schedules = sorted(survey_schedules or [], key=lambda x: x.start)
+        self.survey_schedules = tuple(survey_schedules)
+        groups = {}
+        for survey_schedule in self.survey_schedules:
+            groups.setdefault(survey_schedule.group_name, []).append(
+                survey_schedule)
+        self.survey_schedules_by_group = {
+            group_name: tuple(schedules) for group_name, schedules in groups.items()}
+        self.survey_schedule_links = {
+            group_name: OrderedLinks(schedules)
+            for group_name, schedules in self.survey_schedules_by_group.items()}
+        self.survey_schedule_field_values = tuple(
+            sorted(s.field_value for s in self.survey_schedules))
+
+        self.surveys_by_field_value = {}
+        self.surveys_by_map_area = {}
+        self.surveys_by_name = {}
+        self.templated_survey_schedules = {}
+        for survey_schedule in self.survey_schedules:
+            if survey_schedule.survey_templates:
+                self.templated_survey_schedules[
+                    (survey_schedule.group_name, survey_schedule.name)] = survey_schedule
+            for survey in survey_schedule.registry:
+                self.surveys_by_field_value.setdefault(survey.field_value, survey)
+                self.surveys_by_map_area.setdefault(
+                    (survey_schedule, survey.name, survey.map_area), survey)
+                self.surveys_by_name.setdefault(
+                    (survey_schedule, survey.name), survey)
+        self.survey_schedule_intervals = IntervalIndex(self.survey_schedules)
+        self._surveys = None
+
+    def compile_surveys(self):
+        """Compiles the views over all surveys, making any surveys
+        of survey templates not yet made.
+        """
+        surveys = []
+        for survey_schedule in self.survey_schedules:
+            surveys.extend(survey_schedule.surveys)
+        surveys.sort(key=lambda x: x.start)
+        self._map_areas = frozenset(survey.map_area for survey in surveys)
+        self._survey_intervals = IntervalIndex(surveys)
+        surveys_by_map_area = {}
+        for survey in surveys:
+            surveys_by_map_area.setdefault(survey.map_area, []).append(survey)
+        self._survey_intervals_by_map_area = {
+            map_area: IntervalIndex(surveys)
+            for map_area, surveys in surveys_by_map_area.items()}
+        self._surveys = tuple(surveys)
+
+    @property
+    def surveys(self):
+        if self._surveys is None:
+            self.compile_surveys()
+        return self._surveys
+
+    @property
+    def map_areas(self):
+        if self._surveys is None:
+            self.compile_surveys()
+        return self._map_areas
+
+    @property
+    def survey_intervals(self):
+        if self._surveys is None:
+            self.compile_surveys()
+        return self._survey_intervals
+
+    @property
+    def survey_intervals_by_map_area(self):
+        if self._surveys is None:
+            self.compile_surveys()
+        return self._survey_intervals_by_map_area
+
+    def __repr__(self):
+        return (f'{self.__class__.__name__}(survey_schedules='
+                f'{len(self.survey_schedules)}, surveys={len(self.surveys)})')
+
+    def get_survey_schedules(self, group_name=None):
+        """Returns a tuple of survey schedules ordered by start.
+        """
+        if group_name:
+            return self.survey_schedules_by_group.get(group_name, ())
+        return self.survey_schedules
+
+    def get_survey(self, field_value):
+        """Returns a survey or None using the survey field_value.
+        """
+        survey = self.surveys_by_field_value.get(field_value)
+        if survey is None and self.templated_survey_schedules:
+            try:
+                parsed = parse(field_value)
+            except SurveyParserError:
+                return None
+            survey_schedule = self.templated_survey_schedules.get(
+                (parsed.group_name, parsed.survey_schedule_name))
+            if survey_schedule and parsed.survey_name:
+                survey = survey_schedule.get_template_survey(
+                    parsed.survey_name, parsed.map_area)
+        return survey
+
+    def get_survey_by_map_area(self, survey_schedule, name, map_area):
+        """Returns the survey in the survey schedule with this name
+        and map_area or None.
+        """
+        survey = self.surveys_by_map_area.get((survey_schedule, name, map_area))
+        if survey is None and survey_schedule.survey_templates:
+            survey = survey_schedule.get_template_survey(name, map_area)
+        return survey
+
+    def get_survey_by_name(self, survey_schedule, name):
+        """Returns the first survey in the survey schedule with this
+        name or None.
+        """
+        survey = self.surveys_by_name.get((survey_schedule, name))
+        if survey is None and survey_schedule.survey_templates:
+            survey = survey_schedule.get_survey(name)
+        return survey
+
+    def surveys_at(self, reference_datetime, map_area=None):
+        """Returns a list of surveys, ordered by start, where
+        start <= reference_datetime <= end.
+        """
+        if map_area:
+            intervals = self.survey_intervals_by_map_area.get(map_area)
+        else:
+            intervals = self.survey_intervals
+        surveys = intervals.at(reference_datetime) if intervals else []
+        surveys.sort(key=lambda x: x.start)
+        return surveys
+
+    def survey_schedules_at(self, reference_datetime, group_name=None):
+        """Returns a list of survey schedules, ordered by start,
+        where start <= reference_datetime <= end.
+        """
+        survey_schedules = self.survey_schedule_intervals.at(reference_datetime)
+        if group_name:
+            survey_schedules = [
+                s for s in survey_schedules if s.group_name == group_name]
+        survey_schedules.sort(key=lambda x: x.start)
+        return survey_schedules
+
+    def nth_survey_schedule(self, survey_schedule, k):
+        """Returns the survey schedule k steps from the given survey
+        schedule within its group or None.
+        """
+        links = self.survey_schedule_links.get(survey_schedule.group_name)
+        return links.nth(survey_schedule, k) if links else None
@@ -3,12 +3,17 @@
 import sys
 import copy
 
+from contextlib import contextmanager
+from contextvars import ContextVar
 from django.apps import apps as django_apps
 from django.utils.module_loading import import_module, module_has_submodule
 
 from .exceptions import AddSurveyDateError, AddSurveyMapAreaError
 from .exceptions import AddSurveyOverlapError, AddSurveyNameError
-from .helpers import CurrentSurveysHelper
+from .helpers import CurrentSurveys, CurrentSurveysHelper, SurveyOverlapHelper
+from .helpers import map_area_table
+from .registry_snapshot import RegistrySnapshot
+from .survey_codes import SurveyCodes
 from .sparser import S
 from survey.sparser import SurveyParserError
 
@@ -29,22 +34,60 @@ class SiteSurveysAlreadyRegistered(Exception):
     pass
 
 
+# name of the current surveys configuration selected for this
+# request or task, None for the default. See `site_surveys.using_current`.
+current_surveys_name = ContextVar('current_surveys_name', default=None)
+
+
 class SiteSurveys:
     """Main controller of :class:`SurveySchedule` objects.
 
     A survey_schedule contains surveys.
     """
 
+    current_surveys_cls = CurrentSurveys
     current_surveys_helper = CurrentSurveysHelper
+    registry_snapshot_cls = RegistrySnapshot
+    survey_codes_cls = SurveyCodes
+    survey_overlap_helper_cls = SurveyOverlapHelper
 
     def __init__(self):
+        self._snapshot = None
+        self._survey_codes = None
+        self.registry_encoding = None
+        self.frozen = False
+        self.ignore_registered = False
         self._registry = []
         self.loaded = False
         self.loaded_current = False
-        self.current_survey_schedules = []
-        self.current_surveys = []
+        self._current = self.current_surveys_cls()
+        self._current_by_name = {}
         self.constants = {}
 
+    @property
+    def _registry(self):
+        return self._survey_schedule_list
+
+    @_registry.setter
+    def _registry(self, survey_schedules):
+        """Sets the registry list and rebuilds the lookup indexes.
+
+        The registry list is reassigned by `autodiscover` and by
+        the test helpers. The current map area is read again from
+        site_mappers for the surveys of the new registry.
+        """
+        self._survey_schedule_list = survey_schedules
+        self._survey_schedules_by_name = {}
+        self._survey_schedule_names = set()
+        self._survey_schedules_by_start = {}
+        for survey_schedule in survey_schedules:
+            self._index_survey_schedule(survey_schedule)
+        self.frozen = False
+        self._snapshot = None
+        self._survey_codes = None
+        self.registry_encoding = None
+        map_area_table.invalidate()
+
     @property
     def registry(self):
         if not self.loaded:
@@ -53,41 +96,262 @@ class SiteSurveys:
                 'declared in settings?.')
         return self._registry
 
+    @property
+    def current_configuration(self):
+        """Returns the CurrentSurveys configuration in use.
+
+        This is the named configuration selected with `using_current`
+        or, if none is selected, the default configuration.
+
+        Hold on to the returned object for a consistent view of the
+        current surveys across calls, see `reload_current`.
+        """
+        name = current_surveys_name.get()
+        if name is None:
+            return self._current
+        return self.get_current_configuration(name)
+
+    def get_current_configuration(self, name=None):
+        """Returns the named CurrentSurveys configuration or raises.
+
+        None returns the default configuration.
+        """
+        if name is None:
+            return self._current
+        try:
+            return self._current_by_name[name]
+        except KeyError:
+            raise SiteSurveysError(
+                f'Unknown current surveys configuration. Got name=\'{name}\'. '
+                f'Expected one of {self.current_configuration_names}.')
+
+    @property
+    def current_configuration_names(self):
+        return sorted(self._current_by_name)
+
+    @contextmanager
+    def using_current(self, name=None):
+        """Selects the named current surveys configuration for the
+        code run within the block, e.g. a request or a task.
+
+        The selection is context-local (see contextvars) so threads
+        and asyncio tasks each keep their own. None selects the
+        default configuration.
+
+            with site_surveys.using_current('otse'):
+                survey.next
+        """
+        self.get_current_configuration(name)
+        token = current_surveys_name.set(name)
+        try:
+            yield self
+        finally:
+            current_surveys_name.reset(token)
+
+    @property
+    def current_survey_schedules(self):
+        return list(self.current_configuration.survey_schedules)
+
+    @property
+    def current_surveys(self):
+        return list(self.current_configuration.surveys)
+
+    @property
+    def snapshot(self):
+        """Returns the compiled RegistrySnapshot, compiling it
+        first if the registry has changed.
+        """
+        if self._snapshot is None:
+            self._snapshot = self.registry_snapshot_cls(
+                survey_schedules=self.registry)
+        return self._snapshot
+
+    @property
+    def survey_codes(self):
+        """Returns the SurveyCodes table of the registered survey
+        schedules and surveys, built on first access.
+
+        See SurveyCodeModelMixin.
+        """
+        if self._survey_codes is None:
+            self._survey_codes = self.survey_codes_cls(self.registry)
+        return self._survey_codes
+
+    @property
+    def lookups(self):
+        """Returns the RegistryEncoding, if loaded, otherwise the
+        RegistrySnapshot.
+
+        Both answer the survey and survey schedule lookups, the
+        interval queries and navigation.
+        """
+        if self.registry_encoding is not None:
+            return self.registry_encoding
+        return self.snapshot
+
+    def load_encoding(self, registry_encoding):
+        """Replaces the registry with the survey schedules of a
+        RegistryEncoding and serves lookups from the encoding.
+
+        Registering another survey schedule stops serving from the
+        encoding.
+        """
+        self._registry = list(registry_encoding.survey_schedules)
+        self.registry_encoding = registry_encoding
+        self.loaded = True
+
+    def freeze(self):
+        """Compiles the registry snapshot.
+
+        Called once the registry and current surveys are loaded,
+        see AppConfig. A later call to `register` recompiles the
+        snapshot immediately.
+
+        If serving from a RegistryEncoding, no snapshot is compiled.
+        """
+        self._snapshot = None
+        if self.registry_encoding is None:
+            self.snapshot
+        self.frozen = True
+
+    def _invalidate(self):
+        self._snapshot = None
+        self._survey_codes = None
+        if self.frozen:
+            self.snapshot
+
+    def _index_survey_schedule(self, survey_schedule):
+        self._survey_schedules_by_name.update(
+            {(survey_schedule.group_name, survey_schedule.name): survey_schedule})
+        self._survey_schedule_names.add(survey_schedule.name)
+        self._survey_schedules_by_start.update(
+            {(survey_schedule.group_name, survey_schedule.start): survey_schedule})
+
     def register(self, survey_schedule):
+        self.register_many([survey_schedule])
+
+    def register_many(self, survey_schedules):
+        """Registers survey schedules in one pass.
+
+        All survey schedules are validated, against the registry and
+        each other, before any is registered. The registry snapshot
+        is compiled once.
+
+        Surveys for the same map_area in a survey schedule may not
+        overlap. All overlaps in the batch are reported together.
+
+        Raises SurveyCodeError if a survey schedule or survey code is
+        already used, see SurveyCodes.
+        """
         self.loaded = True
-        if not survey_schedule.surveys:
-            raise SiteSurveysError(
-                f'Not registering survey schedule. Survey schedule has no surveys. '
-                f'Got {repr(survey_schedule)}')
-        elif survey_schedule.name in [
-                survey_schedule.name for survey_schedule in self.registry]:
-            raise SiteSurveysAlreadyRegistered(
-                f'Survey Schedule {repr(survey_schedule)} is already registered.')
-        for schedule in self.get_survey_schedules(
-                group_name=survey_schedule.group_name):
-            if survey_schedule.start == schedule.start:
+        survey_schedules = [
+            survey_schedule for survey_schedule in survey_schedules
+            if not (self.ignore_registered and (
+                survey_schedule.group_name, survey_schedule.name)
+                in self._survey_schedules_by_name)]
+        names = set()
+        starts = {}
+        for survey_schedule in survey_schedules:
+            if not survey_schedule.registry and not survey_schedule.survey_templates:
+                raise SiteSurveysError(
+                    f'Not registering survey schedule. Survey schedule has no surveys. '
+                    f'Got {repr(survey_schedule)}')
+            elif (survey_schedule.name in self._survey_schedule_names
+                    or survey_schedule.name in names):
+                raise SiteSurveysAlreadyRegistered(
+                    f'Survey Schedule {repr(survey_schedule)} is already registered.')
+            key = (survey_schedule.group_name, survey_schedule.start)
+            schedule = self._survey_schedules_by_start.get(key) or starts.get(key)
+            if schedule:
                 raise SiteSurveysAlreadyRegistered(
                     'Survey Schedule {} is already registered using '
                     'start date {}. Unable to registered {}.'.format(
                         schedule.name,
                         survey_schedule.start.strftime('%Y-%m-%d'),
                         survey_schedule.name))
-        self.registry.append(survey_schedule)
+            names.add(survey_schedule.name)
+            starts.update({key: survey_schedule})
+        overlaps = []
+        for survey_schedule in survey_schedules:
+            overlap_helper = self.survey_overlap_helper_cls(
+                surveys=survey_schedule.registry,
+                survey_templates=survey_schedule.survey_templates)
+            overlaps.extend(
+                f'{survey_schedule.name}: {message}'
+                for message in overlap_helper.messages)
+        if overlaps:
+            raise AddSurveyOverlapError(
+                f'Not registering survey schedules. Surveys may not overlap. '
+                f'Got {"; ".join(overlaps)}.')
+        survey_codes = self.survey_codes.copy()
+        survey_codes.add(*survey_schedules)
+        self.registry_encoding = None
+        self.registry.extend(survey_schedules)
+        for survey_schedule in survey_schedules:
+            self._index_survey_schedule(survey_schedule)
+        self._invalidate()
+        self._survey_codes = survey_codes
+
+    @contextmanager
+    def ignoring_registered(self):
+        """Registering a survey schedule with the group_name and name
+        of a registered one is a no-op within the block, e.g. while
+        running a surveys.py module whose survey schedules were loaded
+        from a RegistryArtifact.
+
+        Matched by name, not by dates, as dates relative to
+        `get_utcnow()` move on after the artifact is compiled.
+        """
+        ignore_registered = self.ignore_registered
+        self.ignore_registered = True
+        try:
+            yield self
+        finally:
+            self.ignore_registered = ignore_registered
 
-    def register_current(self, *survey_schedules):
+    def register_current(self, *survey_schedules, name=None):
         """Registers the current surveys from survey_schedule(s)
         or sparser.S objects.
+
+        If name is given, registers a named configuration, e.g. one
+        per map_area, instead of the default. See `using_current`.
         """
-        if self.loaded_current:
+        if name is None and self.loaded_current:
             raise CurrentSurveySchedulesAlreadyLoaded(
                 'Current survey schedules are already loaded.')
+        elif name is not None and name in self._current_by_name:
+            raise CurrentSurveySchedulesAlreadyLoaded(
+                f'Current survey schedules are already loaded. Got name=\'{name}\'.')
         else:
-            helper = self.current_surveys_helper(
-                current_survey_schedules=survey_schedules,
-                registered_survey_schedules=self.get_survey_schedules())
-            self.current_survey_schedules = helper.current_survey_schedules
-            self.current_surveys = helper.current_surveys
+            self.reload_current(*survey_schedules, name=name)
+
+    def reload_current(self, *survey_schedules, name=None):
+        """Replaces the current surveys from survey_schedule(s)
+        or sparser.S objects without a restart.
+
+        The new configuration is built and validated before it is
+        swapped in with a single assignment. Lookups do not lock;
+        a caller holding `current_configuration` keeps its view.
+        """
+        helper = self.current_surveys_helper(
+            current_survey_schedules=survey_schedules,
+            registered_survey_schedules=self.get_survey_schedules(),
+            name=name)
+        if name is None:
+            self._current = helper.configuration
             self.loaded_current = True
+        else:
+            current_by_name = dict(self._current_by_name)
+            current_by_name[name] = helper.configuration
+            self._current_by_name = current_by_name
+
+    def reset_current(self):
+        """Clears the current surveys, including any named
+        configurations.
+        """
+        self._current = self.current_surveys_cls()
+        self._current_by_name = {}
+        self.loaded_current = False
 
     def get_survey_schedule(self, value):
         """Returns a survey schedule object or raises and exception.
@@ -97,11 +361,9 @@ class SiteSurveys:
         except ValueError:
             group_name, survey_schedule_name = value.split('.')
         survey_schedule = None
-        for item in self.registry:
-            if (item.name == survey_schedule_name
-                    and item.group_name == group_name):
-                survey_schedule = item
-                break
+        if self.registry:
+            survey_schedule = self._survey_schedules_by_name.get(
+                (group_name, survey_schedule_name))
         if not survey_schedule:
             raise SiteSurveysError(
                 f'Unable to find a registered survey schedule matching '
@@ -120,33 +382,30 @@ class SiteSurveys:
 
         None is a valid group_name that returns all survey_schedules.
         """
-        schedules = []
-        if group_name:
-            for survey_schedule in self.registry:
-                if survey_schedule.group_name == group_name:
-                    schedules.append(survey_schedule)
-        else:
-            schedules = self.registry
+        schedules = self.lookups.get_survey_schedules(group_name=group_name)
         if current:
-            schedules = [
-                s for s in schedules if s in self.current_survey_schedules]
-        schedules.sort(key=lambda o: o.start)
-        return schedules
+            current_survey_schedules = self.current_configuration.survey_schedule_set
+            return [s for s in schedules if s in current_survey_schedules]
+        return list(schedules)
 
     def get_survey(self, field_value, current=None):
         """Returns a survey object using the long name.
         """
-        try:
-            surveys = [
-                survey for survey in self.surveys
-                if survey.field_value == field_value]
-            if current:
-                return [survey for survey in surveys
-                        if survey in self.current_surveys][0]
-            else:
-                return surveys[0]
-        except IndexError:
+        survey = self.lookups.get_survey(field_value)
+        if current and survey not in self.current_configuration.survey_set:
             return None
+        return survey
+
+    def is_current_survey(self, survey):
+        """Returns True if a survey with this field_value is current.
+        """
+        return survey in self.current_configuration.survey_set
+
+    def is_current_survey_schedule(self, survey_schedule):
+        """Returns True if a survey schedule with this field_value
+        is current.
+        """
+        return survey_schedule in self.current_configuration.survey_schedule_set
 
     @property
     def surveys(self):
@@ -154,33 +413,20 @@ class SiteSurveys:
 
         See also `current_surveys`.
         """
-        surveys = []
-        for survey_schedule in self.get_survey_schedules():
-            for survey in survey_schedule.surveys:
-                surveys.append(survey)
-        surveys.sort(key=lambda x: x.start)
-        return surveys
+        return list(self.lookups.surveys)
 
     def get_survey_names(self, *group_names):
         survey_names = []
-        if group_names:
-            for group_name in group_names:
-                for survey_schedule in self.get_survey_schedules(
-                        group_name=group_name):
-                    for survey in survey_schedule.surveys:
-                        survey_names.append(survey.field_value)
-        else:
-            for survey_schedule in self.get_survey_schedules():
+        lookups = self.lookups
+        for group_name in group_names or [None]:
+            for survey_schedule in lookups.get_survey_schedules(
+                    group_name=group_name):
                 for survey in survey_schedule.surveys:
                     survey_names.append(survey.field_value)
         return survey_names
 
     def get_survey_schedule_field_values(self):
-        field_values = []
-        for survey_schedule in self.get_survey_schedules():
-            field_values.append(survey_schedule.field_value)
-        field_values.sort()
-        return field_values
+        return list(self.lookups.survey_schedule_field_values)
 
     def get_survey_from_field_value(self, field_value):
         try:
@@ -188,19 +434,15 @@ class SiteSurveys:
         except SurveyParserError:
             found = None
         else:
-            found = None
             survey_schedule = self.get_survey_schedule(
                 '.'.join([s.group_name, s.survey_schedule_name]))
-            for survey in survey_schedule.surveys:
-                if survey.name == s.survey_name and survey.map_area == s.map_area:
-                    found = survey
-                    break
+            lookups = self.lookups
+            found = lookups.get_survey_by_map_area(
+                survey_schedule, s.survey_name, s.map_area)
             if not found:
                 if not django_apps.get_app_config('edc_device').is_client:
-                    for survey in survey_schedule.surveys:
-                        if survey.name == s.survey_name:
-                            found = survey
-                            break
+                    found = lookups.get_survey_by_name(
+                        survey_schedule, s.survey_name)
                 else:
                     raise SiteSurveysError(
                         f'Invalid survey for {repr(survey_schedule)}. '
@@ -209,67 +451,95 @@ class SiteSurveys:
                         f'{[s.field_value for s in survey_schedule.surveys]}')
         return found
 
+    def resolve_many(self, field_values):
+        """Returns a dictionary of {field_value: survey} for the
+        distinct survey field values given.
+
+        Each distinct field_value is parsed once.
+        """
+        return {
+            field_value: self.get_survey_from_field_value(field_value)
+            for field_value in dict.fromkeys(field_values)}
+
+    def resolve_schedules_many(self, field_values):
+        """Returns a dictionary of {field_value: survey_schedule} for the
+        distinct survey schedule field values given.
+        """
+        return {
+            field_value: self.get_survey_schedule_from_field_value(field_value)
+            for field_value in dict.fromkeys(field_values)}
+
     @property
     def map_areas(self):
         """Extracts ALL map_areas listed in surveys registered
         to the system.
         """
-        map_areas = []
-        for survey in self.surveys:
-            map_areas.append(survey.map_area)
-        return list(set(map_areas))
+        return list(self.lookups.map_areas)
 
     @property
     def current_map_areas(self):
         """Extracts map_areas listed in current surveys.
         """
-        map_areas = []
-        for survey in self.current_surveys:
-            map_areas.append(survey.map_area)
-        return list(set(map_areas))
+        return list(self.current_configuration.map_areas)
+
+    def surveys_at(self, reference_datetime, map_area=None, current=None):
+        """Returns a list of registered surveys, ordered by start,
+        active at the given datetime.
+
+        Optionally filter on map_area and current surveys.
+        """
+        surveys = self.lookups.surveys_at(reference_datetime, map_area=map_area)
+        if current:
+            current_surveys = self.current_configuration.survey_set
+            surveys = [s for s in surveys if s in current_surveys]
+        return surveys
+
+    def survey_schedules_at(self, reference_datetime, group_name=None,
+                            current=None):
+        """Returns a list of registered survey schedules, ordered by
+        start, active at the given datetime.
+        """
+        survey_schedules = self.lookups.survey_schedules_at(
+            reference_datetime, group_name=group_name)
+        if current:
+            current_survey_schedules = self.current_configuration.survey_schedule_set
+            survey_schedules = [
+                s for s in survey_schedules if s in current_survey_schedules]
+        return survey_schedules
 
     def previous_survey_schedule(self, survey_schedule):
         """Returns the previous survey schedule or None.
         """
-        previous_survey_schedules = [
-            s for s in self.get_survey_schedules(
-                group_name=survey_schedule.group_name)
-            if s.start < survey_schedule.start]
-        try:
-            return previous_survey_schedules[-1:][0]
-        except IndexError:
-            return None
+        return self.lookups.nth_survey_schedule(survey_schedule, -1)
 
     def next_survey_schedule(self, survey_schedule):
         """Returns the next survey schedule in this group or None.
 
         Ordered by start (date).
         """
-        next_survey_schedules = [s for s in self.get_survey_schedules(
-            group_name=survey_schedule.group_name)
-            if s.start > survey_schedule.start]
-        try:
-            return next_survey_schedules[0]
-        except IndexError:
-            return None
+        return self.lookups.nth_survey_schedule(survey_schedule, 1)
+
+    def nth_survey_schedule(self, survey_schedule, k):
+        """Returns the survey schedule k steps after (or before, if
+        negative) survey_schedule in this group or None.
+        """
+        return self.lookups.nth_survey_schedule(survey_schedule, k)
 
     def previous_survey(self, survey):
-        previous_surveys = [
-            s for s in self.current_surveys if s.start < survey.start]
-        try:
-            return previous_surveys[-1:][0]
-        except IndexError:
-            return None
+        """Returns the previous current survey or None.
+        """
+        return self.current_configuration.links.previous(survey)
 
     def next_survey(self, survey):
         """Returns the next current survey or None.
         """
-        next_surveys = [
-            s for s in self.current_surveys if s.start > survey.start]
-        try:
-            return next_surveys[0]
-        except IndexError:
-            return None
+        return self.current_configuration.links.next(survey)
+
+    def nth_survey(self, survey, k):
+        """Returns the current survey k steps after (or before, if
+        negative) survey or None.
+        """
+        return self.current_configuration.links.nth(survey, k)
 
     def autodiscover(self, module_name=None):
         """Autodiscovers classes in the surveys.py file of any
@@ -1,38 +1,70 @@
 import re
 
+from collections import namedtuple
+from functools import lru_cache
+
 from .patterns import survey as survey_pattern
 from .patterns import survey_schedule as survey_schedule_pattern
 
+PARSER_CACHE_SIZE = 1024
+
+survey_regex = re.compile(survey_pattern)
+survey_schedule_regex = re.compile(survey_schedule_pattern)
+
+ParsedSurvey = namedtuple(
+    'ParsedSurvey', 'group_name survey_schedule_name survey_name map_area')
+
 
 class SurveyParserError(Exception):
     pass
 
 
-class S:
-    """A simple class to parse survey / survey schedule name.
+def parse(s, survey_name=None):
+    """Returns a ParsedSurvey for a survey or survey schedule string.
 
-    Makes no attempt to validate the values.
+    Results are cached (LRU) and shared between callers. See
+    `parser_cache_info`.
 
-    format is S('group.survey_schedule.survey.map_area', **kwargs)
+    survey_name is ignored if `s` is a survey string, so that the
+    same parse is cached once.
     """
+    if s and s.count('.') == 3:
+        survey_name = None
+    return cached_parse(s, survey_name)
+
+
+@lru_cache(maxsize=PARSER_CACHE_SIZE)
+def cached_parse(s, survey_name):
+    if survey_regex.match(s or ''):
+        return ParsedSurvey(*s.split('.'))
+    elif survey_schedule_regex.match(s or ''):
+        if not survey_name:
+            raise SurveyParserError('Missing required survey_name.')
+        group_name, survey_schedule_name, map_area = s.split('.')
+        return ParsedSurvey(
+            group_name, survey_schedule_name, survey_name, map_area)
+    raise SurveyParserError('Invalid format.')
 
-    def __init__(self, s, survey_name=None, inactive=None, ):
-        self._s = s
-        self.survey_name = None
-        if re.match(survey_pattern, s or ''):
-            (self.group_name, self.survey_schedule_name,
-             self.survey_name, self.map_area) = s.split('.')
-        elif re.match(survey_schedule_pattern, s or ''):
-            (self.group_name, self.survey_schedule_name,
-             self.map_area) = s.split('.')
-            self.survey_name = survey_name
-            if not self.survey_name:
-                raise SurveyParserError(
-                    f'Missing required survey_name. Got {repr(self)}.')
-        else:
-            raise SurveyParserError(f'Invalid format. Got {repr(self)}.')
-        self.field_value = s
-        self.inactive = inactive
+
+def parser_cache_info():
+    """Returns the hits, misses, maxsize and currsize of the
+    parser cache.
+    """
+    return cached_parse.cache_info()
+
+
+def parser_cache_clear():
+    cached_parse.cache_clear()
+
+
+class BaseS:
+    """Base class with the behaviour of a parsed survey / survey
+    schedule name.
+
+    See S and CompactS.
+    """
+
+    __slots__ = ()
 
     def __repr__(self):
         return f'{self.__class__.__name__}(\'{self._s}\', survey_name={self.survey_name})'
@@ -53,3 +85,61 @@ class S:
     @property
     def survey_schedule_field_value(self):
         return f'{self.group_name}.{self.survey_schedule_name}.{self.map_area}'
+
+
+class S(BaseS):
+    """A simple class to parse survey / survey schedule name.
+
+    Makes no attempt to validate the values.
+
+    format is S('group.survey_schedule.survey.map_area', **kwargs)
+    """
+
+    def __init__(self, s, survey_name=None, inactive=None, ):
+        self._s = s
+        self.survey_name = None
+        try:
+            self.parsed = parse(s, survey_name)
+        except SurveyParserError as e:
+            raise SurveyParserError(f'{e} Got {repr(self)}.')
+        (self.group_name, self.survey_schedule_name,
+         self.survey_name, self.map_area) = self.parsed
+        self.field_value = s
+        self.inactive = inactive
+
+
+class CompactS(BaseS):
+    """An S that stores only the string, the shared parse result
+    and `inactive` in slots.
+    """
+
+    __slots__ = ('_s', 'parsed', 'inactive')
+
+    def __init__(self, s, survey_name=None, inactive=None, ):
+        self._s = s
+        self.parsed = None
+        try:
+            self.parsed = parse(s, survey_name)
+        except SurveyParserError as e:
+            raise SurveyParserError(f'{e} Got {repr(self)}.')
+        self.inactive = inactive
+
+    @property
+    def group_name(self):
+        return self.parsed.group_name
+
+    @property
+    def survey_schedule_name(self):
+        return self.parsed.survey_schedule_name
+
+    @property
+    def survey_name(self):
+        return self.parsed.survey_name if self.parsed else None
+
+    @property
+    def map_area(self):
+        return self.parsed.map_area
+
+    @property
+    def field_value(self):
+        return self._s
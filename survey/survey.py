@@ -1,11 +1,10 @@
 # coding=utf-8
 
-import arrow
-
 from .exceptions import SurveyError
 from .helpers import DateHelper, MapAreaHelper
+from .site_surveys import site_surveys
 from .sparser import S
-from survey.helpers.date_helper import DateError
+from survey.helpers.date_helper import DateError, ceil_hour, to_arrow
 
 
 class DummySurvey:
@@ -15,38 +14,41 @@ class DummySurvey:
     field_value = None
 
 
-class Survey:
+class BaseSurvey:
+    """Base class with the attributes and behaviour of a survey.
+
+    See Survey and CompactSurvey.
+    """
+
+    __slots__ = ()
 
     date_helper_cls = DateHelper
     map_area_helper_cls = MapAreaHelper
 
     def __init__(self, name=None, start=None, end=None,
                  full_enrollment_datetime=None, position=None,
-                 map_area=None, map_areas=None):
+                 map_area=None, map_areas=None, code=None):
         self.name = name
         self.survey_name = name
-        self.current = None
         self.survey_schedule = None  # set when registered to a survey_schedule
         self.position = position
+        self.code = code  # see SurveyCodes
 
         try:
-            self.date_helper = self.date_helper_cls(start=start, end=end)
+            date_helper = self.date_helper_cls(start=start, end=end)
         except DateError as e:
             raise SurveyError(e)
-        self.start = self.date_helper.start
-        self.end = self.date_helper.end
-        self.rstart = self.date_helper.rstart
-        self.rend = self.date_helper.rend
+        self.start = date_helper.start
+        self.end = date_helper.end
 
-        self.map_area_helper = self.map_area_helper_cls(
+        map_area_helper = self.map_area_helper_cls(
             map_area=map_area, map_areas=map_areas)
-        self.map_area = self.map_area_helper.map_area
-        self.map_areas = self.map_area_helper.map_areas
-        self.map_area_display = self.map_area_helper.map_area_display
+        self.map_area = map_area_helper.map_area
+        self.map_areas = map_area_helper.map_areas
+
+        self.bind_helpers(date_helper, map_area_helper)
 
-        self.full_enrollment_datetime = arrow.Arrow.fromdatetime(
-            full_enrollment_datetime, full_enrollment_datetime.tzinfo).to(
-                'utc').ceil('hour').datetime
+        self.full_enrollment_datetime = ceil_hour(full_enrollment_datetime)
         if full_enrollment_datetime:
             if not (self.start < self.full_enrollment_datetime <= self.end):
                 start = self.start.strftime('%Y-%m-%d %Z')
@@ -57,6 +59,55 @@ class Survey:
                     f'start and end dates. Got {start} < {full} <= {end} for '
                     f'survey \'{self.map_areas}\'.')
 
+    def bind_helpers(self, date_helper, map_area_helper):
+        """Hook to keep the helper instances used by __init__.
+        """
+        pass
+
+    def reset_identity(self):
+        """Clears the cached field_value, short_name, breadcrumbs
+        and map_area_display.
+
+        Called when the survey schedule, its group_name or the
+        map_area is reassigned.
+        """
+        self._field_value = None
+        self._short_name = None
+        self._breadcrumbs = None
+        self._map_area_display = None
+
+    @property
+    def current(self):
+        """Returns True if the survey is in the current configuration,
+        see `site_surveys.register_current`.
+        """
+        return site_surveys.is_current_survey(self)
+
+    @property
+    def survey_schedule(self):
+        return self._survey_schedule
+
+    @survey_schedule.setter
+    def survey_schedule(self, survey_schedule):
+        self._survey_schedule = survey_schedule
+        self.reset_identity()
+
+    @property
+    def map_area(self):
+        return self._map_area
+
+    @map_area.setter
+    def map_area(self, map_area):
+        self._map_area = self.map_area_helper_cls.map_area_table.intern(map_area)
+        self.reset_identity()
+
+    @property
+    def map_area_display(self):
+        if self._map_area_display is None:
+            self._map_area_display = self.map_area_helper_cls(
+                map_area=self.map_area).map_area_display
+        return self._map_area_display
+
     def __repr__(self):
         start = self.start.strftime('%Y-%m-%d %Z')
         end = self.end.strftime('%Y-%m-%d %Z')
@@ -66,11 +117,27 @@ class Survey:
     def __str__(self):
         return self.field_value
 
+    def __eq__(self, other):
+        if isinstance(other, BaseSurvey):
+            return self.identity_key == other.identity_key
+        return NotImplemented
+
+    def __hash__(self):
+        return hash(self.identity_key)
+
+    @property
+    def identity_key(self):
+        """Returns the field_value or, if the survey is not yet added
+        to a survey schedule, the object id.
+        """
+        if self.survey_schedule is None:
+            return id(self)
+        return self.field_value
+
     def __iter__(self):
         return self
 
     def __next__(self):
-        from .site_surveys import site_surveys
         survey = site_surveys.next_survey(self)
         if not survey:
             raise StopIteration
@@ -89,20 +156,30 @@ class Survey:
     def previous(self):
         """Returns the previous current survey or None.
         """
-        from .site_surveys import site_surveys
         return site_surveys.previous_survey(self)
 
+    def nth(self, k):
+        """Returns the current survey k steps after (or before, if
+        negative) this survey or None.
+        """
+        return site_surveys.nth_survey(self, k)
+
     @property
     def field_value(self):
         """Returns the survey string stored in model instances with
         the `survey` field, e.g. household_structure.
         """
-        return (f'{self.group_name}.{self.schedule_name}.'
+        if self._field_value is None:
+            self._field_value = (
+                f'{self.group_name}.{self.schedule_name}.'
                 f'{self.name}.{self.map_area}')
+        return self._field_value
 
     @property
     def short_name(self):
-        return f'{self.schedule_name}.{self.name}'
+        if self._short_name is None:
+            self._short_name = f'{self.schedule_name}.{self.name}'
+        return self._short_name
 
     @property
     def long_name(self):
@@ -129,4 +206,162 @@ class Survey:
 
     @property
     def breadcrumbs(self):
-        return [self.group_name, self.schedule_name, self.name]
+        if self._breadcrumbs is None:
+            self._breadcrumbs = (self.group_name, self.schedule_name, self.name)
+        return list(self._breadcrumbs)
+
+
+class Survey(BaseSurvey):
+
+    def bind_helpers(self, date_helper, map_area_helper):
+        self.date_helper = date_helper
+        self.map_area_helper = map_area_helper
+
+    @property
+    def rstart(self):
+        return self.date_helper.rstart
+
+    @property
+    def rend(self):
+        return self.date_helper.rend
+
+
+class CompactSurvey(BaseSurvey):
+    """A Survey that stores its attributes in slots and does not
+    keep the date and map area helpers after __init__.
+
+    `rstart` and `rend` are built on first access.
+    """
+
+    __slots__ = (
+        'name', 'survey_name', '_survey_schedule', 'position',
+        'start', 'end', '_map_area', 'map_areas', 'full_enrollment_datetime',
+        'code', '_field_value', '_short_name', '_breadcrumbs', '_map_area_display',
+        '_rstart', '_rend')
+
+    @property
+    def rstart(self):
+        try:
+            return self._rstart
+        except AttributeError:
+            self._rstart = to_arrow(self.start)
+            return self._rstart
+
+    @property
+    def rend(self):
+        try:
+            return self._rend
+        except AttributeError:
+            self._rend = to_arrow(self.end)
+            return self._rend
+
+
+class TemplateSurvey(BaseSurvey):
+    """A survey made from a SurveyTemplate for one map area.
+
+    Keeps only the template, the survey schedule and the map area.
+    The name, position and dates are read from the template.
+    """
+
+    __slots__ = (
+        'template', '_survey_schedule', '_map_area',
+        '_field_value', '_short_name', '_breadcrumbs', '_map_area_display')
+
+    def __init__(self, template=None, map_area=None, survey_schedule=None):
+        self.template = template
+        self.map_area = map_area
+        self.survey_schedule = survey_schedule
+
+    @property
+    def name(self):
+        return self.template.name
+
+    @property
+    def survey_name(self):
+        return self.template.name
+
+    @property
+    def position(self):
+        return self.template.position
+
+    @property
+    def start(self):
+        return self.template.start
+
+    @property
+    def end(self):
+        return self.template.end
+
+    @property
+    def full_enrollment_datetime(self):
+        return self.template.full_enrollment_datetime
+
+    @property
+    def map_areas(self):
+        return [self.map_area]
+
+    @property
+    def code(self):
+        """Returns the template's code for the map area or None.
+        """
+        return (self.template.codes or {}).get(self.map_area)
+
+    @property
+    def rstart(self):
+        return self.template.rstart
+
+    @property
+    def rend(self):
+        return self.template.rend
+
+
+class SurveyTemplate:
+    """A survey defined once for all map areas of a survey schedule.
+
+    Holds the name, position and dates. A TemplateSurvey is made for
+    a map area when first requested, see
+    `SurveySchedule.add_survey_template`.
+
+    If given codes, a dictionary of {map_area: code}, the survey of
+    each map area has its code, see SurveyCodes. Codes are stored in
+    rows, so assign a code to each map area explicitly and never
+    reassign one when map areas are added, removed or reordered.
+    """
+
+    date_helper_cls = DateHelper
+    survey_cls = TemplateSurvey
+    map_area = None  # applies to each map_area of the survey schedule
+
+    def __init__(self, name=None, start=None, end=None,
+                 full_enrollment_datetime=None, position=None, codes=None):
+        self.name = name
+        self.position = position
+        self.codes = codes
+        try:
+            self.date_helper = self.date_helper_cls(start=start, end=end)
+        except DateError as e:
+            raise SurveyError(e)
+        self.start = self.date_helper.start
+        self.end = self.date_helper.end
+        self.full_enrollment_datetime = ceil_hour(full_enrollment_datetime)
+        if not (self.start < self.full_enrollment_datetime <= self.end):
+            start = self.start.strftime('%Y-%m-%d %Z')
+            full = self.full_enrollment_datetime.strftime('%Y-%m-%d %Z')
+            end = self.end.strftime('%Y-%m-%d %Z')
+            raise SurveyError(
+                f'Invalid SurveyTemplate. Full enrollment date must be within '
+                f'start and end dates. Got {start} < {full} <= {end} for '
+                f'survey template \'{self.name}\'.')
+
+    def __repr__(self):
+        start = self.start.strftime('%Y-%m-%d %Z')
+        end = self.end.strftime('%Y-%m-%d %Z')
+        return f'{self.__class__.__name__}(\'{self.name}\', {start}, {end})'
+
+    @property
+    def rstart(self):
+        return self.date_helper.rstart
+
+    @property
+    def rend(self):
+        return self.date_helper.rend
@@ -0,0 +1,220 @@
+from django.core.exceptions import FieldDoesNotExist
+from django.db.models.constants import LOOKUP_SEP
+
+
+class SurveyCodeError(Exception):
+    pass
+
+
+class SurveyCodes:
+    """A code table of the survey and survey schedule field values
+    of the registry, see `site_surveys.survey_codes`.
+
+    Codes are assigned in the survey definitions, e.g.
+    `SurveySchedule(code=1)`, `Survey(code=1)` and
+    `SurveyTemplate(codes={'community': 1})`, and are stored in rows,
+    so never reassign a code. A survey schedule or survey without a code is
+    not in the table.
+
+    Survey schedule codes and survey codes are separate. Each must
+    be unique, see `site_surveys.register_many`.
+    """
+
+    def __init__(self, survey_schedules=None):
+        self.codes = {}
+        self.survey_schedule_field_values = {}
+        self.survey_field_values = {}
+        self.add(*(survey_schedules or []))
+
+    def __repr__(self):
+        return f'{self.__class__.__name__}(codes={len(self.codes)})'
+
+    def __len__(self):
+        return len(self.codes)
+
+    def copy(self):
+        survey_codes = self.__class__()
+        survey_codes.codes = dict(self.codes)
+        survey_codes.survey_schedule_field_values = dict(
+            self.survey_schedule_field_values)
+        survey_codes.survey_field_values = dict(self.survey_field_values)
+        return survey_codes
+
+    def add(self, *survey_schedules):
+        """Adds the codes of the survey schedules and their surveys.
+
+        Raises SurveyCodeError if a code is already used by another
+        field value or if a survey template with codes has no code
+        for a map_area of its survey schedule.
+        """
+        for survey_schedule in survey_schedules:
+            if getattr(survey_schedule, 'code', None) is not None:
+                self.add_code(
+                    self.survey_schedule_field_values, survey_schedule.field_value,
+                    survey_schedule.code, 'survey schedule')
+            for field_value, code in self.get_survey_codes(survey_schedule):
+                self.add_code(self.survey_field_values, field_value, code, 'survey')
+
+    @staticmethod
+    def get_survey_codes(survey_schedule):
+        """Returns a list of (field value, code) of the surveys of a
+        survey schedule that have a code, without making the surveys
+        of the survey templates.
+        """
+        survey_codes = [
+            (survey.field_value, survey.code) for survey in survey_schedule.registry
+            if getattr(survey, 'code', None) is not None]
+        for survey_template in survey_schedule.survey_templates:
+            if not survey_template.codes:
+                continue
+            for map_area in survey_schedule.map_areas:
+                field_value = (
+                    f'{survey_schedule.group_name}.{survey_schedule.name}.'
+                    f'{survey_template.name}.{map_area}')
+                try:
+                    survey_codes.append((field_value, survey_template.codes[map_area]))
+                except KeyError:
+                    raise SurveyCodeError(
+                        f'Survey template has no code for map_area \'{map_area}\'. '
+                        f'Assign a code to each map_area of the survey schedule. '
+                        f'Got \'{field_value}\'.')
+        return survey_codes
+
+    def add_code(self, field_values, field_value, code, label):
+        if not isinstance(code, int) or not 0 <= code < 2 ** 31:
+            raise SurveyCodeError(
+                f'Invalid {label} code. Expected an integer from 0 to {2 ** 31 - 1} '
+                f'to fit an IntegerField. Got {repr(code)} for \'{field_value}\'.')
+        other = field_values.setdefault(code, field_value)
+        if other != field_value:
+            raise SurveyCodeError(
+                f'Survey code is not unique. {label.capitalize()}s \'{other}\' '
+                f'and \'{field_value}\' have code {code}. Assign a {label} code '
+                f'not used before.')
+        self.codes[field_value] = code
+
+    def code(self, field_value):
+        """Returns the code of a registered field value or raises.
+
+        Returns None for None or a blank field value.
+        """
+        if not field_value:
+            return None
+        try:
+            return self.codes[str(field_value)]
+        except KeyError:
+            raise SurveyCodeError(
+                f'Unable to code survey. Survey or survey schedule is not '
+                f'registered or has no code. Got \'{field_value}\'.')
+
+    def survey_schedule_field_value(self, code):
+        """Returns the survey schedule field value of a code or None.
+        """
+        return self.survey_schedule_field_values.get(code)
+
+    def survey_field_value(self, code):
+        """Returns the survey field value of a code or None.
+        """
+        return self.survey_field_values.get(code)
+
+
+def translate_survey_lookups(model_cls, **kwargs):
+    """Returns filter keyword arguments with lookups on the survey
+    or survey_schedule field values of models declared with
+    SurveyCodeModelMixin or SurveyScheduleCodeModelMixin replaced
+    by lookups on their codes.
+
+    Translates exact and `in` lookups, including across relations,
+    e.g. `household_structure__survey_schedule`. A field value
+    without a code matches no rows.
+    """
+    from .site_surveys import site_surveys
+    codes = site_surveys.survey_codes.codes
+    translated = {}
+    for key, value in kwargs.items():
+        parts = key.split(LOOKUP_SEP)
+        lookup = parts.pop() if parts[-1] in ['exact', 'in'] else None
+        if (parts[-1] in ['survey', 'survey_schedule']
+                and has_survey_code(model_cls, parts)):
+            parts[-1] = f'{parts[-1]}_code'
+            if lookup == 'in':
+                value = [codes[str(v)] for v in value if v and str(v) in codes]
+            elif not value:
+                value = None
+            elif str(value) in codes:
+                value = codes[str(value)]
+            else:
+                lookup, value = 'in', []
+            if lookup:
+                parts.append(lookup)
+            key = LOOKUP_SEP.join(parts)
+        translated[key] = value
+    return translated
+
+
+def has_survey_code(model_cls, parts):
+    """Returns True if the model at the end of the lookup path stores
+    the survey or survey schedule as a code.
+    """
+    opts = model_cls._meta
+    for part in parts[:-1]:
+        try:
+            field = opts.get_field(part)
+        except FieldDoesNotExist:
+            return False
+        if not field.is_relation or not field.related_model:
+            return False
+        opts = field.related_model._meta
+    try:
+        opts.get_field(f'{parts[-1]}_code')
+    except FieldDoesNotExist:
+        return False
+    try:
+        opts.get_field(parts[-1])
+    except FieldDoesNotExist:
+        return True
+    return False  # still has the string field, e.g. while migrating
+
+
+def migrate_survey_codes(model_cls, chunk_size=1000, survey_codes=None):
+    """Sets survey_schedule_code and, if the model has a survey
+    field, survey_code from the string field values of existing rows.
+
+    For a data migration (RunPython) run after the code fields are
+    added and before the string fields are removed. `model_cls` may be
+    a historical model. Rows are read in chunks ordered by pk and
+    each chunk is updated with one query per distinct pair of values.
+    Raises SurveyCodeError for a value not in the registry.
+
+    Returns the number of rows read.
+    """
+    if survey_codes is None:
+        from .site_surveys import site_surveys
+        survey_codes = site_surveys.survey_codes
+    field_names = ['survey_schedule']
+    try:
+        model_cls._meta.get_field('survey')
+    except FieldDoesNotExist:
+        pass
+    else:
+        field_names.append('survey')
+    manager = model_cls._default_manager
+    count = 0
+    last_pk = None
+    while True:
+        queryset = manager.order_by('pk')
+        if last_pk is not None:
+            queryset = queryset.filter(pk__gt=last_pk)
+        rows = list(queryset.values_list('pk', *field_names)[:chunk_size])
+        if not rows:
+            break
+        pks = {}
+        for row in rows:
+            codes = tuple(survey_codes.code(value) for value in row[1:])
+            pks.setdefault(codes, []).append(row[0])
+        for codes, chunk_pks in pks.items():
+            manager.filter(pk__in=chunk_pks).update(
+                **{f'{name}_code': code for name, code in zip(field_names, codes)})
+        count += len(rows)
+        last_pk = rows[-1][0]
+    return count
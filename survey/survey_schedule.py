@@ -1,6 +1,9 @@
 # coding=utf-8
 from .exceptions import AddSurveyDateError, AddSurveyMapAreaError, AddSurveyNameError
-from .helpers import DateHelper, MapAreaHelper, DateError
+from .exceptions import AddSurveyOverlapError
+from .helpers import DateHelper, MapAreaHelper, DateError, SurveyOverlapHelper
+from .helpers.date_helper import to_arrow
+from .site_surveys import site_surveys
 from .sparser import S
 
 
@@ -16,37 +19,107 @@ class AddSurveyPositionError(Exception):
     pass
 
 
-class SurveySchedule:
+class BaseSurveySchedule:
+    """Base class with the attributes and behaviour of a survey
+    schedule.
+
+    See SurveySchedule and CompactSurveySchedule.
+    """
+
+    __slots__ = ()
 
     date_helper_cls = DateHelper
     map_area_helper_cls = MapAreaHelper
+    survey_overlap_helper_cls = SurveyOverlapHelper
 
     def __init__(self, name=None, group_name=None, start=None, end=None,
-                 map_area=None, map_areas=None):
+                 map_area=None, map_areas=None, code=None):
         self.name = name
+        self.code = code  # see SurveyCodes
         self.registry = []
+        self.survey_templates = []
+        self._template_surveys = {}
         self.group_name = group_name
         self.survey_groups = []
-        self.current = False
 
         try:
-            self.date_helper = self.date_helper_cls(start=start, end=end)
+            date_helper = self.date_helper_cls(start=start, end=end)
         except DateError as e:
             raise SurveyScheduleError(e)
-        self.start = self.date_helper.start
-        self.end = self.date_helper.end
-        self.rstart = self.date_helper.rstart
-        self.rend = self.date_helper.rend
+        self.start = date_helper.start
+        self.end = date_helper.end
 
-        self.map_area_helper = self.map_area_helper_cls(
+        map_area_helper = self.map_area_helper_cls(
             map_area=map_area, map_areas=map_areas)
-        self.map_area = self.map_area_helper.map_area
-        self.map_areas = self.map_area_helper.map_areas
-        self.map_area_display = self.map_area_helper.map_area_display
+        self.map_area = map_area_helper.map_area
+        self.map_areas = map_area_helper.map_areas
+
+        self.bind_helpers(date_helper, map_area_helper)
+
+    def bind_helpers(self, date_helper, map_area_helper):
+        """Hook to keep the helper instances used by __init__.
+        """
+        pass
+
+    def reset_identity(self):
+        """Clears the cached field_value, short_name and map_area_display
+        of the schedule and its surveys.
+
+        Called when group_name or map_area is reassigned, as in
+        `load_test_surveys`.
+        """
+        self._field_value = None
+        self._short_name = None
+        self._map_area_display = None
+        for survey in self.registry:
+            survey.reset_identity()
+        if self.survey_templates:
+            for survey in self._template_surveys.values():
+                survey.reset_identity()
+
+    @property
+    def current(self):
+        """Returns True if the survey schedule is in the current
+        configuration, see `site_surveys.register_current`.
+        """
+        return site_surveys.is_current_survey_schedule(self)
+
+    @property
+    def group_name(self):
+        return self._group_name
+
+    @group_name.setter
+    def group_name(self, group_name):
+        self._group_name = group_name
+        self.reset_identity()
+
+    @property
+    def map_area(self):
+        return self._map_area
+
+    @map_area.setter
+    def map_area(self, map_area):
+        self._map_area = self.map_area_helper_cls.map_area_table.intern(map_area)
+        self.reset_identity()
+
+    @property
+    def map_area_display(self):
+        if self._map_area_display is None:
+            self._map_area_display = self.map_area_helper_cls(
+                map_area=self.map_area).map_area_display
+        return self._map_area_display
 
     def __str__(self):
         return self.field_value
 
+    def __eq__(self, other):
+        if isinstance(other, BaseSurveySchedule):
+            return self.field_value == other.field_value
+        return NotImplemented
+
+    def __hash__(self):
+        return hash(self.field_value)
+
     def __repr__(self):
         start = self.start.strftime('%Y-%m-%d %Z')
         end = self.end.strftime('%Y-%m-%d %Z')
@@ -61,93 +134,231 @@ class SurveySchedule:
 
     @property
     def short_name(self):
-        return f'{self.group_name}.{self.name}'
+        if self._short_name is None:
+            self._short_name = f'{self.group_name}.{self.name}'
+        return self._short_name
 
     @property
     def surveys(self):
         """Returns all surveys in the schedule.
+
+        Includes a survey for each survey template and map_area.
         """
-        if not self.registry:
+        if not self.registry and not self.survey_templates:
             raise SurveyScheduleError(
                 f'SurveySchedule has no surveys!. Got {repr(self)}.')
-        return self.registry
+        if not self.survey_templates:
+            return self.registry
+        surveys = self.registry + self.get_template_surveys()
+        surveys.sort(key=lambda x: x.position)
+        return surveys
+
+    @property
+    def survey_names(self):
+        """Returns the set of names of the surveys and survey
+        templates in the schedule.
+        """
+        return (set(survey.survey_name for survey in self.registry)
+                | set(survey_template.name for survey_template in self.survey_templates))
 
     @property
     def field_value(self):
-        return f'{self.group_name}.{self.name}.{self.map_area}'
+        if self._field_value is None:
+            self._field_value = f'{self.group_name}.{self.name}.{self.map_area}'
+        return self._field_value
 
     @property
     def current_surveys(self):
         """Returns the surveys in the schedule that, according
         to app_config, are current.
         """
-        return [survey for survey in self.registry if survey.current]
+        surveys = [survey for survey in self.registry if survey.current]
+        if self.survey_templates:
+            # a current survey is in the current configuration, so
+            # has already been made from its template
+            surveys.extend(
+                survey for survey in self._template_surveys.values() if survey.current)
+            surveys.sort(key=lambda x: x.position)
+        return surveys
 
     def get_survey(self, name):
-        """Returns the surveys in the schedule that, according to
-        app_config, are current.
+        """Returns the first survey in the schedule with this name
+        or None.
+
+        A survey template is made for the schedule's map_area or,
+        if not one of its map_areas, the first of its map_areas.
         """
+        if self.survey_templates:
+            for survey in self.registry:
+                if survey.name == name:
+                    return survey
+            for map_area in [self.map_area] + list(self.map_areas):
+                survey = self.get_template_survey(name, map_area)
+                if survey:
+                    return survey
+            return None
         surveys = [survey for survey in self.surveys if survey.name == name]
         try:
             return surveys[0]
         except IndexError:
             return None
 
+    def get_template_survey(self, name, map_area):
+        """Returns the survey made from the survey template with
+        this name for map_area or None.
+
+        Made on first request and kept.
+        """
+        if not self.survey_templates:
+            return None
+        try:
+            return self._template_surveys[(name, map_area)]
+        except KeyError:
+            pass
+        if map_area not in self.map_areas:
+            return None
+        for survey_template in self.survey_templates:
+            if survey_template.name == name:
+                survey = survey_template.survey_cls(
+                    template=survey_template, map_area=map_area, survey_schedule=self)
+                self._template_surveys[(name, map_area)] = survey
+                return survey
+        return None
+
+    def get_survey_field_values(self):
+        """Returns the field values of all surveys in the schedule
+        without making the surveys of the survey templates.
+        """
+        field_values = [survey.field_value for survey in self.registry]
+        for map_area in self.map_areas if self.survey_templates else []:
+            for survey_template in self.survey_templates:
+                field_values.append(
+                    f'{self.group_name}.{self.name}.{survey_template.name}.{map_area}')
+        return field_values
+
+    def get_template_surveys(self, map_area=None):
+        """Returns a list of the surveys made from the survey
+        templates for map_area or, if None, for all map_areas.
+        """
+        surveys = []
+        for map_area in [map_area] if map_area else self.map_areas:
+            for survey_template in self.survey_templates:
+                survey = self.get_template_survey(survey_template.name, map_area)
+                if survey:
+                    surveys.append(survey)
+        return surveys
+
     @property
     def previous(self):
         """Returns the previous survey schedule or None.
         """
-        from .site_surveys import site_surveys
         return site_surveys.previous_survey_schedule(self)
 
     @property
     def next(self):
         """Returns the next survey schedule or None.
         """
-        from .site_surveys import site_surveys
         return site_surveys.next_survey_schedule(self)
 
+    def nth(self, k):
+        """Returns the survey schedule k steps after (or before, if
+        negative) this survey schedule or None.
+        """
+        return site_surveys.nth_survey_schedule(self, k)
+
     def add_survey(self, *surveys):
+        """Adds one or more surveys to the schedule.
+
+        All surveys are validated, against the schedule and each
+        other, before any is added. A survey name is unique per
+        map_area and surveys for the same map_area may not overlap.
+        """
+        names = set((survey.name, survey.map_area) for survey in self.registry)
+        template_names = set(
+            survey_template.name for survey_template in self.survey_templates)
+        map_areas = set(self.map_areas or [])
         for survey in surveys:
-            if survey.position is None:
-                raise AddSurveyPositionError(
-                    f'Unable to add survey to schedule \'{self.name}\'. Survey position '
-                    f'is invalid. Got {survey.position}. See survey \'{survey.name}\'')
-            if not (self.start <= survey.start <= self.end):
-                raise AddSurveyDateError(
-                    'Unable to add survey to schedule {}. Survey {}.start '
-                    'is invalid. Got {}.'.format(
-                        self.name, survey.name,
-                        self.start.strftime('%Y-%m-%d %Z')))
-            if not (self.start <= survey.end <= self.end):
-                raise AddSurveyDateError(
-                    'Unable to add survey to schedule {}. Survey {}.end '
-                    'is invalid. Got {}.'.format(
-                        self.name,
-                        survey.name,
-                        self.start.strftime('%Y-%m-%d %Z')))
-            if survey.name in self.registry:
-                raise AddSurveyNameError(
-                    'Unable to add survey to schedule {}. A Survey with '
-                    'for map_area has already been added. Got {}.'.format(
-                        self.name, survey.name))
-            if survey.map_area in self.registry:
-                raise AddSurveyMapAreaError(
-                    'Unable to add survey to schedule {}. A Survey with '
-                    'for map_area has already been added . Got {}.'.format(
-                        self.name, survey.name))
-            if self.map_areas:
-                if survey.map_area not in self.map_areas:
+            self.validate_position_and_dates(survey)
+            if survey.name is not None:
+                if ((survey.name, survey.map_area) in names
+                        or survey.name in template_names):
+                    raise AddSurveyNameError(
+                        'Unable to add survey to schedule {}. A Survey with '
+                        'this name for map_area has already been added. '
+                        'Got {}.{}.'.format(
+                            self.name, survey.name, survey.map_area))
+                names.add((survey.name, survey.map_area))
+            if map_areas:
+                if survey.map_area not in map_areas:
                     raise AddSurveyMapAreaError(
                         'Unable to add survey to schedule. Invalid '
                         'map_area for schedule \'{}\'. Got \'{}\'.'.format(
                             self.name, survey.map_area))
+        overlap_helper = self.survey_overlap_helper_cls(
+            surveys=self.registry + list(surveys),
+            survey_templates=self.survey_templates)
+        if overlap_helper.overlaps:
+            raise AddSurveyOverlapError(
+                f'Unable to add survey to schedule {self.name}. Surveys '
+                f'may not overlap. Got {"; ".join(overlap_helper.messages)}.')
+        for survey in surveys:
             survey.survey_schedule = self
-            self.registry.append(survey)
+        self.registry.extend(surveys)
 
         # keep the registry ordered
         self.registry.sort(key=lambda x: x.position)
 
+    def add_survey_template(self, *survey_templates):
+        """Adds one or more survey templates to the schedule.
+
+        A survey template applies to each map_area of the schedule.
+        Its surveys are made when first requested, see
+        `get_template_survey`. Validated as in `add_survey`. A
+        survey template name may not be used by any survey of the
+        schedule and survey templates may not overlap.
+        """
+        names = set(survey.name for survey in self.registry)
+        names.update(survey_template.name for survey_template in self.survey_templates)
+        for survey_template in survey_templates:
+            self.validate_position_and_dates(survey_template)
+            if survey_template.name in names:
+                raise AddSurveyNameError(
+                    f'Unable to add survey template to schedule {self.name}. '
+                    f'A survey or survey template with this name has already '
+                    f'been added. Got {survey_template.name}.')
+            names.add(survey_template.name)
+        overlap_helper = self.survey_overlap_helper_cls(
+            surveys=self.registry,
+            survey_templates=self.survey_templates + list(survey_templates))
+        if overlap_helper.overlaps:
+            raise AddSurveyOverlapError(
+                f'Unable to add survey template to schedule {self.name}. Surveys '
+                f'may not overlap. Got {"; ".join(overlap_helper.messages)}.')
+        self.survey_templates.extend(survey_templates)
+        self.survey_templates.sort(key=lambda x: x.position)
+
+    def validate_position_and_dates(self, survey):
+        """Raises if the survey has no position or its dates are
+        not within the schedule.
+        """
+        if survey.position is None:
+            raise AddSurveyPositionError(
+                f'Unable to add survey to schedule \'{self.name}\'. Survey position '
+                f'is invalid. Got {survey.position}. See survey \'{survey.name}\'')
+        if not (self.start <= survey.start <= self.end):
+            raise AddSurveyDateError(
+                'Unable to add survey to schedule {}. Survey {}.start '
+                'is invalid. Got {}.'.format(
+                    self.name, survey.name,
+                    self.start.strftime('%Y-%m-%d %Z')))
+        if not (self.start <= survey.end <= self.end):
+            raise AddSurveyDateError(
+                'Unable to add survey to schedule {}. Survey {}.end '
+                'is invalid. Got {}.'.format(
+                    self.name,
+                    survey.name,
+                    self.start.strftime('%Y-%m-%d %Z')))
+
     def get_surveys(self, map_area=None, reference_datetime=None):
         """Returns a list of surveys that meet the criteria.
         """
@@ -155,17 +366,65 @@ class SurveySchedule:
             if survey.start <= reference_datetime <= survey.end:
                 return True
             return False
+        registry = self.registry
+        if self.survey_templates:
+            registry = registry + self.get_template_surveys(map_area=map_area)
         surveys = []
         if reference_datetime and map_area:
             surveys = [
-                s for s in self.registry
+                s for s in registry
                 if s.map_area == map_area
                 and in_datetime_range(s, reference_datetime)]
         elif map_area:
-            surveys = [s for s in self.registry if s.map_area == map_area]
+            surveys = [s for s in registry if s.map_area == map_area]
         elif reference_datetime:
             surveys = [
-                s for s in self.registry
+                s for s in registry
                 if in_datetime_range(s, reference_datetime)]
         surveys.sort(key=lambda x: x.start)
         return surveys
+
+
+class SurveySchedule(BaseSurveySchedule):
+
+    def bind_helpers(self, date_helper, map_area_helper):
+        self.date_helper = date_helper
+        self.map_area_helper = map_area_helper
+
+    @property
+    def rstart(self):
+        return self.date_helper.rstart
+
+    @property
+    def rend(self):
+        return self.date_helper.rend
+
+
+class CompactSurveySchedule(BaseSurveySchedule):
+    """A SurveySchedule that stores its attributes in slots and does
+    not keep the date and map area helpers after __init__.
+
+    `rstart` and `rend` are built on first access.
+    """
+
+    __slots__ = (
+        'name', 'registry', 'survey_templates', '_template_surveys',
+        '_group_name', 'survey_groups', 'start', 'end', '_map_area',
+        'map_areas', 'code', '_field_value', '_short_name', '_map_area_display',
+        '_rstart', '_rend')
+
+    @property
+    def rstart(self):
+        try:
+            return self._rstart
+        except AttributeError:
+            self._rstart = to_arrow(self.start)
+            return self._rstart
+
+    @property
+    def rend(self):
+        try:
+            return self._rend
+        except AttributeError:
+            self._rend = to_arrow(self.end)
+            return self._rend
@@ -19,7 +19,8 @@ class DatesTestMixin:
             style.ERROR(f'{cls.__name__}. Overwriting survey dates.\n'))
         for survey_schedule in site_surveys.get_survey_schedules(
                 group_name=cls.site_survey_group_name):
-            for survey in survey_schedule.surveys:
+            # surveys made from a survey template read its dates
+            for survey in survey_schedule.registry + survey_schedule.survey_templates:
                 survey.start = survey.start - relativedelta(
                     days=cls.study_tdelta.days)
                 survey.end = survey.end - relativedelta(
@@ -31,6 +32,17 @@ class DatesTestMixin:
             survey_schedule.end = (
                 survey_schedule.end - relativedelta(
                     days=cls.study_tdelta.days))
+        # dates changed in place, recompile the registry snapshot
+        # and the current surveys
+        site_surveys._invalidate()
+        if site_surveys.loaded_current:
+            site_surveys.reload_current(
+                *[survey.to_sparser() for survey in site_surveys.current_surveys])
+        for name in site_surveys.current_configuration_names:
+            configuration = site_surveys.get_current_configuration(name)
+            site_surveys.reload_current(
+                *[survey.to_sparser() for survey in configuration.surveys],
+                name=name)
 
         for survey_schedule in site_surveys.get_survey_schedules(
                 group_name=cls.site_survey_group_name):
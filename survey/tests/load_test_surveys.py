@@ -11,8 +11,8 @@ def load_test_surveys(load_count=None, load_all=None,
                       survey_schedules=None, group_name=None, constants=None):
     """Loads survey_schedules into site_surveys manually.
     """
-    survey_schedules = (survey_schedules
-                        or [survey_one, survey_two, survey_three])
+    if survey_schedules is None:
+        survey_schedules = [survey_one, survey_two, survey_three]
     group_name = group_name or 'test_survey'
     if load_all:
         load_count = len(survey_schedules)
@@ -31,14 +31,9 @@ def load_test_surveys(load_count=None, load_all=None,
 
     for survey_schedule in survey_schedules:
         survey_schedule.group_name = group_name
-        survey_schedule.current = False
-        for survey in survey_schedule.surveys:
-            survey.current = False
     site_surveys._registry = []
-    site_surveys.loaded_current = False
+    site_surveys.reset_current()
     site_surveys.loaded = False
-    site_surveys.current_survey_schedules = []
-    site_surveys.current_surveys = []
     site_surveys.constants = constants or {}
 
     for index, survey_schedule in enumerate(survey_schedules):
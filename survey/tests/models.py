@@ -3,7 +3,9 @@ from django.db import models
 from edc_base.model_mixins import BaseUuidModel
 from edc_base.utils import get_utcnow
 
+from ..managers import SurveyManager, SurveyCodeManager
 from ..model_mixins import SurveyScheduleModelMixin, SurveyModelMixin
+from ..model_mixins import SurveyScheduleCodeModelMixin, SurveyCodeModelMixin
 
 
 class Household(models.Model):
@@ -17,6 +19,11 @@ class HouseholdStructure(SurveyScheduleModelMixin, BaseUuidModel):
 
     household = models.ForeignKey(Household)
 
+    objects = SurveyManager()
+
+    class Meta:
+        indexes = SurveyScheduleModelMixin.survey_schedule_indexes('household')
+
 
 class HouseholdMember(SurveyScheduleModelMixin, BaseUuidModel):
 
@@ -37,3 +44,38 @@ class HouseholdMember(SurveyScheduleModelMixin, BaseUuidModel):
 class SubjectVisit(SurveyModelMixin, BaseUuidModel):
 
     report_datetime = models.DateTimeField(default=get_utcnow)
+
+    objects = SurveyManager()
+
+    class Meta:
+        indexes = (SurveyModelMixin.survey_schedule_indexes('report_datetime')
+                   + SurveyModelMixin.survey_indexes())
+
+
+class HouseholdStructureCode(SurveyScheduleCodeModelMixin, BaseUuidModel):
+
+    report_datetime = models.DateTimeField(default=get_utcnow)
+
+    objects = SurveyCodeManager()
+
+
+class SubjectVisitCode(SurveyCodeModelMixin, BaseUuidModel):
+
+    report_datetime = models.DateTimeField(default=get_utcnow)
+
+    household_structure = models.ForeignKey(HouseholdStructureCode, null=True)
+
+    objects = SurveyCodeManager()
+
+    class Meta:
+        indexes = SurveyCodeModelMixin.survey_schedule_indexes('report_datetime')
+
+
+class SubjectVisitMigrating(SurveyModelMixin, BaseUuidModel):
+    """A SubjectVisit with the code fields added but the string
+    fields not yet removed.
+    """
+
+    survey_schedule_code = models.IntegerField(null=True)
+
+    survey_code = models.IntegerField(null=True)
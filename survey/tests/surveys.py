@@ -11,6 +11,7 @@ map_areas = ['test_community']
 survey_one = SurveySchedule(
     name='year-1',
     group_name='test_survey',
+    code=1,
     map_area=current_map_area,
     map_areas=map_areas,
     start=(get_utcnow() - relativedelta(years=3)),
@@ -19,6 +20,7 @@ survey_one = SurveySchedule(
 survey_two = SurveySchedule(
     name='year-2',
     group_name='test_survey',
+    code=2,
     map_area=current_map_area,
     map_areas=map_areas,
     start=(get_utcnow() - relativedelta(years=2)),
@@ -27,40 +29,44 @@ survey_two = SurveySchedule(
 survey_three = SurveySchedule(
     name='year-3',
     group_name='test_survey',
+    code=3,
     map_area=current_map_area,
     map_areas=map_areas,
     start=(get_utcnow() - relativedelta(years=1)),
     end=get_utcnow())
 
 for index, survey in [(3, survey_one), (2, survey_two), (1, survey_three)]:
+    # surveys in a schedule may not overlap, each takes four months
+    start = get_utcnow() - relativedelta(years=index)
+
     baseline = Survey(
         name='baseline',
         position=0,
+        code=survey.code * 10,
         map_area=current_map_area,
-        start=(get_utcnow() - relativedelta(years=index)),
-        end=(get_utcnow() - relativedelta(years=index - 1)),
-        full_enrollment_datetime=(
-            get_utcnow() - relativedelta(years=index - 1))
+        start=start,
+        end=start + relativedelta(months=4, days=-1),
+        full_enrollment_datetime=start + relativedelta(months=4, days=-1)
     )
 
     annual_1 = Survey(
         name='annual-1',
         position=1,
+        code=survey.code * 10 + 1,
         map_area=current_map_area,
-        start=(get_utcnow() - relativedelta(years=index)),
-        end=(get_utcnow() - relativedelta(years=index - 1)),
-        full_enrollment_datetime=(
-            get_utcnow() - relativedelta(years=index - 1))
+        start=start + relativedelta(months=4),
+        end=start + relativedelta(months=8, days=-1),
+        full_enrollment_datetime=start + relativedelta(months=8, days=-1)
     )
 
     annual_2 = Survey(
         name='annual-2',
         position=2,
+        code=survey.code * 10 + 2,
         map_area=current_map_area,
-        start=(get_utcnow() - relativedelta(years=index)),
-        end=(get_utcnow() - relativedelta(years=index - 1)),
-        full_enrollment_datetime=(
-            get_utcnow() - relativedelta(years=index - 1))
+        start=start + relativedelta(months=8),
+        end=start + relativedelta(months=12, days=-1),
+        full_enrollment_datetime=start + relativedelta(months=12, days=-1)
     )
 
     survey.add_survey(baseline, annual_1, annual_2)
@@ -0,0 +1,152 @@
+import arrow
+import pytz
+import random
+
+from datetime import datetime, timedelta, timezone
+from dateutil import tz
+from django.test import TestCase, tag
+
+from ..helpers import DateHelper, DateError
+from ..helpers.date_helper import ceil_hour, floor_hour, to_utc
+
+EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+HOUR = timedelta(hours=1)
+
+TIMEZONES = [
+    'UTC', 'Africa/Gaborone', 'America/New_York', 'America/Sao_Paulo',
+    'Asia/Kathmandu', 'Asia/Kolkata', 'Australia/Lord_Howe',
+    'Europe/London', 'Pacific/Chatham', 'Pacific/Apia']
+
+# local times at or near DST transitions, some ambiguous or non-existent,
+# with the expected floor in UTC if localized with pytz (None if
+# ambiguous) and if given a dateutil tzinfo with fold=0 and fold=1.
+DST_EDGES = [
+    ('America/New_York', datetime(2017, 3, 12, 2, 30),
+     datetime(2017, 3, 12, 7), datetime(2017, 3, 12, 6), datetime(2017, 3, 12, 6)),
+    ('America/New_York', datetime(2017, 11, 5, 1, 30),
+     None, datetime(2017, 11, 5, 5), datetime(2017, 11, 5, 6)),
+    ('Europe/London', datetime(2017, 3, 26, 1, 0),
+     datetime(2017, 3, 26, 1), datetime(2017, 3, 26, 0), datetime(2017, 3, 26, 0)),
+    ('Europe/London', datetime(2017, 10, 29, 1, 59, 59, 999999),
+     None, datetime(2017, 10, 29, 0), datetime(2017, 10, 29, 1)),
+    ('Australia/Lord_Howe', datetime(2017, 4, 2, 1, 45),
+     None, datetime(2017, 4, 1, 14), datetime(2017, 4, 1, 15)),
+    ('Australia/Lord_Howe', datetime(2017, 10, 1, 2, 15),
+     datetime(2017, 9, 30, 15), datetime(2017, 9, 30, 15), datetime(2017, 9, 30, 15)),
+    ('America/Sao_Paulo', datetime(2017, 10, 15, 0, 0),
+     datetime(2017, 10, 15, 3), datetime(2017, 10, 15, 2), datetime(2017, 10, 15, 2)),
+    ('America/Sao_Paulo', datetime(2018, 2, 17, 23, 30),
+     None, datetime(2018, 2, 18, 1), datetime(2018, 2, 18, 2)),
+    ('Pacific/Apia', datetime(2011, 12, 30, 0, 0),
+     datetime(2011, 12, 30, 10), datetime(2011, 12, 30, 10),
+     datetime(2011, 12, 30, 10))]
+
+
+def expected_floor_hour(dt):
+    """Returns the floor of dt in UTC from the whole hours since
+    the epoch.
+    """
+    return EPOCH + HOUR * ((dt - EPOCH) // HOUR)
+
+
+@tag('date_helper')
+class TestDateHelper(TestCase):
+
+    def datetimes(self):
+        """Yields aware datetimes from random local times using both
+        pytz and dateutil timezones.
+        """
+        rnd = random.Random(2017)
+        for _ in range(0, 500):
+            name = rnd.choice(TIMEZONES)
+            dt = datetime(2016, 1, 1) + timedelta(
+                seconds=rnd.randint(0, 3 * 365 * 86400),
+                microseconds=rnd.randint(0, 999999))
+            yield pytz.timezone(name).localize(dt)
+            for fold in [0, 1]:
+                yield dt.replace(tzinfo=tz.gettz(name), fold=fold)
+
+    def dst_edges(self):
+        """Yields (aware datetime, expected floor in UTC) at the
+        DST edges.
+        """
+        for name, dt, pytz_floor, fold_0_floor, fold_1_floor in DST_EDGES:
+            if pytz_floor:
+                yield (pytz.timezone(name).localize(dt),
+                       pytz_floor.replace(tzinfo=timezone.utc))
+            for fold, floor in [(0, fold_0_floor), (1, fold_1_floor)]:
+                yield (dt.replace(tzinfo=tz.gettz(name), fold=fold),
+                       floor.replace(tzinfo=timezone.utc))
+
+    def assertSameDatetime(self, dt, expected):
+        self.assertEqual(dt, expected)
+        self.assertEqual(dt.utcoffset(), timedelta(0))
+        self.assertEqual(dt.replace(tzinfo=None), expected.replace(tzinfo=None))
+
+    def test_floor_hour(self):
+        for dt in self.datetimes():
+            with self.subTest(dt=dt):
+                self.assertSameDatetime(floor_hour(dt), expected_floor_hour(dt))
+
+    def test_ceil_hour(self):
+        for dt in self.datetimes():
+            with self.subTest(dt=dt):
+                self.assertSameDatetime(
+                    ceil_hour(dt),
+                    expected_floor_hour(dt) + HOUR - timedelta(microseconds=1))
+
+    def test_dst_edges(self):
+        for dt, expected in self.dst_edges():
+            with self.subTest(dt=dt):
+                self.assertSameDatetime(floor_hour(dt), expected)
+                self.assertSameDatetime(
+                    ceil_hour(dt), expected + HOUR - timedelta(microseconds=1))
+
+    def test_naive_is_utc(self):
+        dt = datetime(2017, 3, 12, 2, 30)
+        self.assertEqual(to_utc(dt), pytz.utc.localize(dt))
+        self.assertSameDatetime(
+            floor_hour(dt), datetime(2017, 3, 12, 2, tzinfo=timezone.utc))
+        self.assertSameDatetime(
+            ceil_hour(dt),
+            datetime(2017, 3, 12, 2, 59, 59, 999999, tzinfo=timezone.utc))
+
+    def test_pytz_ambiguous_keeps_offset(self):
+        """Asserts the offset chosen by localize(is_dst=...) is kept,
+        as with the dateutil fold of the same offset.
+        """
+        for name, dt, pytz_floor, fold_0_floor, fold_1_floor in DST_EDGES:
+            if pytz_floor is None:
+                for is_dst, floor in [(True, fold_0_floor), (False, fold_1_floor)]:
+                    local = pytz.timezone(name).localize(dt, is_dst=is_dst)
+                    with self.subTest(dt=local):
+                        self.assertSameDatetime(
+                            floor_hour(local), floor.replace(tzinfo=timezone.utc))
+
+    def test_on_the_hour(self):
+        dt = pytz.utc.localize(datetime(2017, 1, 1, 10))
+        self.assertEqual(floor_hour(dt), dt)
+        self.assertEqual(
+            ceil_hour(dt), dt + timedelta(hours=1, microseconds=-1))
+
+    def test_date_helper(self):
+        for dt in self.datetimes():
+            with self.subTest(dt=dt):
+                date_helper = DateHelper(start=dt, end=dt)
+                self.assertSameDatetime(date_helper.start, expected_floor_hour(dt))
+                self.assertSameDatetime(
+                    date_helper.end,
+                    expected_floor_hour(dt) + HOUR - timedelta(microseconds=1))
+
+    def test_rstart_rend_built_once(self):
+        dt = pytz.utc.localize(datetime(2017, 1, 1, 10, 30))
+        date_helper = DateHelper(start=dt, end=dt + timedelta(days=1))
+        self.assertEqual(date_helper.rstart, arrow.get(date_helper.start))
+        self.assertEqual(date_helper.rend, arrow.get(date_helper.end))
+        self.assertIs(date_helper.rstart, date_helper.rstart)
+        self.assertIs(date_helper.rend, date_helper.rend)
+
+    def test_invalid_range_raises(self):
+        dt = pytz.utc.localize(datetime(2017, 1, 1, 10, 30))
+        self.assertRaises(
+            DateError, DateHelper, start=dt, end=dt - timedelta(hours=1))
@@ -145,3 +145,119 @@ class TestIteratorWithHouseholdMember(TestCase):
         previous_obj = next(iterable)
         self.assertEqual(previous_obj, member1)
         self.assertRaises(StopIteration, next, iterable)
+
+
+class TestIteratorSingleQuery(TestCase):
+
+    survey_helper = SurveyTestHelper()
+
+    def setUp(self):
+        self.survey_helper.load_test_surveys(load_all=True)
+        household = Household.objects.create()
+        self.options = {'household': household}
+        self.survey_schedules = site_surveys.get_survey_schedules(
+            group_name='test_survey')
+        self.objs = [
+            HouseholdStructure.objects.create(
+                survey_schedule=survey_schedule.field_value, **self.options)
+            for survey_schedule in self.survey_schedules]
+
+    def test_single_query(self):
+        survey_schedule_iterator = SurveyScheduleIterator(
+            model_obj=self.objs[0], single_query=True, **self.options)
+        with self.assertNumQueries(1):
+            self.assertEqual(list(survey_schedule_iterator), self.objs[1:])
+
+    def test_single_query_as_per_object(self):
+        for model_obj in self.objs:
+            self.assertEqual(
+                list(SurveyScheduleIterator(
+                    model_obj=model_obj, single_query=True, **self.options)),
+                list(SurveyScheduleIterator(model_obj=model_obj, **self.options)))
+
+    def test_single_query_skips_gaps(self):
+        self.objs[1].delete()
+        survey_schedule_iterator = SurveyScheduleIterator(
+            model_obj=self.objs[0], single_query=True, **self.options)
+        self.assertEqual(list(survey_schedule_iterator), [self.objs[2]])
+
+    def test_single_query_without_model_obj(self):
+        survey_schedule_iterator = SurveyScheduleIterator(
+            model_cls=HouseholdStructure, single_query=True, **self.options)
+        with self.assertNumQueries(1):
+            self.assertEqual(list(survey_schedule_iterator), self.objs)
+
+    def test_without_model_obj_first_missing(self):
+        """Asserts a gap at the first survey schedule is skipped.
+        """
+        self.objs[0].delete()
+        for single_query in [False, True]:
+            with self.subTest(single_query=single_query):
+                survey_schedule_iterator = SurveyScheduleIterator(
+                    model_cls=HouseholdStructure, single_query=single_query,
+                    **self.options)
+                self.assertEqual(list(survey_schedule_iterator), self.objs[1:])
+
+    def test_single_query_multiple_objects(self):
+        HouseholdStructure.objects.create(
+            survey_schedule=self.survey_schedules[1].field_value, **self.options)
+        survey_schedule_iterator = SurveyScheduleIterator(
+            model_obj=self.objs[0], single_query=True, **self.options)
+        self.assertRaises(
+            HouseholdStructure.MultipleObjectsReturned, list, survey_schedule_iterator)
+
+    def test_reversed_single_query(self):
+        survey_schedule_iterator = SurveyScheduleIterator(
+            model_obj=self.objs[0], single_query=True, **self.options)
+        with self.assertNumQueries(1):
+            self.assertEqual(list(survey_schedule_iterator), self.objs[1:])
+            self.assertEqual(
+                list(reversed(survey_schedule_iterator)), self.objs[1:][::-1])
+
+    def test_reversed_walks_back(self):
+        survey_schedule_iterator = SurveyScheduleIterator(
+            model_obj=self.objs[0], **self.options)
+        iterable = reversed(survey_schedule_iterator)
+        with self.assertNumQueries(1):
+            self.assertEqual(next(iterable), self.objs[-1])
+        self.assertEqual(list(iterable), self.objs[1:-1][::-1])
+
+    def test_reversed_walks_back_skips_gaps(self):
+        self.objs[-1].delete()
+        survey_schedule_iterator = SurveyScheduleIterator(
+            model_obj=self.objs[0], **self.options)
+        self.assertEqual(
+            list(reversed(survey_schedule_iterator)), self.objs[1:-1][::-1])
+
+    def test_reversed_without_model_obj(self):
+        survey_schedule_iterator = SurveyScheduleIterator(
+            model_cls=HouseholdStructure, **self.options)
+        with self.assertNumQueries(1):
+            self.assertEqual(
+                list(reversed(survey_schedule_iterator)), self.objs[::-1])
+
+    def test_first_last_at(self):
+        survey_schedule_iterator = SurveyScheduleIterator(
+            model_cls=HouseholdStructure, **self.options)
+        with self.assertNumQueries(1):
+            self.assertEqual(survey_schedule_iterator.first(), self.objs[0])
+            self.assertEqual(survey_schedule_iterator.last(), self.objs[-1])
+            self.assertEqual(survey_schedule_iterator.at(1), self.objs[1])
+            self.assertEqual(survey_schedule_iterator.at(-2), self.objs[-2])
+        self.assertRaises(IndexError, survey_schedule_iterator.at, len(self.objs))
+
+    def test_first_last_at_with_model_obj(self):
+        self.objs[1].delete()
+        survey_schedule_iterator = SurveyScheduleIterator(
+            model_obj=self.objs[0], **self.options)
+        self.assertEqual(survey_schedule_iterator.first(), self.objs[2])
+        self.assertEqual(survey_schedule_iterator.last(), self.objs[-1])
+        self.assertEqual(survey_schedule_iterator.at(0), self.objs[2])
+
+    def test_first_last_none(self):
+        survey_schedule_iterator = SurveyScheduleIterator(
+            model_obj=self.objs[-1], **self.options)
+        self.assertIsNone(survey_schedule_iterator.first())
+        self.assertIsNone(survey_schedule_iterator.last())
+        self.assertRaises(IndexError, survey_schedule_iterator.at, 0)
+        self.assertEqual(list(reversed(survey_schedule_iterator)), [])
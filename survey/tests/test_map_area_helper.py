@@ -0,0 +1,56 @@
+from dateutil.relativedelta import relativedelta
+from django.test import TestCase, tag
+from edc_base.utils import get_utcnow
+from edc_map.site_mappers import site_mappers
+
+from ..helpers import MapAreaHelper, MapAreaTable, map_area_table
+from ..site_surveys import site_surveys
+from ..survey import Survey
+
+
+@tag('map_area_helper')
+class TestMapAreaHelper(TestCase):
+
+    def setUp(self):
+        self.current_map_area = site_mappers.current_map_area
+        map_area_table.invalidate()
+
+    def tearDown(self):
+        site_mappers.current_map_area = self.current_map_area
+        map_area_table.invalidate()
+
+    def test_intern(self):
+        table = MapAreaTable()
+        map_area = ''.join(['test_', 'community'])
+        self.assertIsNot(map_area, 'test_community')
+        self.assertIs(table.intern('test_community'), table.intern(map_area))
+        self.assertIsNone(table.intern(None))
+
+    def test_display(self):
+        table = MapAreaTable()
+        self.assertEqual(table.display('test_community'), 'Test Community')
+        self.assertIs(table.display('test_community'),
+                      table.display(''.join(['test_', 'community'])))
+
+    def test_surveys_share_map_area(self):
+        surveys = [
+            Survey(name=f'survey-{n}',
+                   map_area=''.join(['test_', 'community']),
+                   start=get_utcnow(),
+                   end=get_utcnow() + relativedelta(days=1),
+                   full_enrollment_datetime=get_utcnow() + relativedelta(days=1))
+            for n in range(0, 3)]
+        self.assertIs(surveys[0].map_area, surveys[2].map_area)
+        self.assertIs(surveys[0].map_area_display, surveys[2].map_area_display)
+
+    def test_current_map_area_read_once(self):
+        self.assertEqual(MapAreaHelper().map_area, 'test_community')
+        site_mappers.current_map_area = 'other_community'
+        self.assertEqual(MapAreaHelper().map_area, 'test_community')
+
+    def test_current_map_area_invalidated_on_registry_load(self):
+        self.assertEqual(MapAreaHelper().map_area, 'test_community')
+        site_mappers.current_map_area = 'other_community'
+        site_surveys._registry = []
+        self.assertEqual(MapAreaHelper().map_area, 'other_community')
+        self.assertEqual(MapAreaHelper().map_areas, ['other_community'])
@@ -1,6 +1,12 @@
+import pickle
+
+from django.db import connection
 from django.test import TestCase
+from unittest.mock import patch
 
-from ..site_surveys import site_surveys
+from ..managers import SurveyModelIterable
+from ..model_mixins import SurveyModelMixin, attach_survey_objects
+from ..site_surveys import SiteSurveysError, site_surveys
 from .models import HouseholdStructure, SubjectVisit
 from .survey_test_helper import SurveyTestHelper
 from survey.tests.models import Household
@@ -60,3 +66,158 @@ class TestModelMixin(TestCase):
             self.assertEqual(
                 obj.survey_object.survey_schedule.field_value,
                 'test_survey.year-1.test_community')
+
+    def test_attach_survey_objects(self):
+        survey_schedule = site_surveys.get_survey_schedules(current=True)[0]
+        for survey in survey_schedule.current_surveys:
+            SubjectVisit.objects.create(
+                survey_schedule=survey_schedule.field_value,
+                survey=survey.field_value)
+        objs = attach_survey_objects(SubjectVisit.objects.all())
+        self.assertEqual(len(objs), len(survey_schedule.current_surveys))
+        for obj in objs:
+            self.assertEqual(obj._survey_object, (obj.survey, obj.survey_object))
+            self.assertEqual(obj.survey_object.field_value, obj.survey)
+            self.assertEqual(obj.survey_schedule_object, survey_schedule)
+
+    def test_attached_survey_object_ignored_if_field_value_changes(self):
+        survey_schedule = site_surveys.get_survey_schedules(current=True)[0]
+        survey1, survey2 = survey_schedule.current_surveys[0:2]
+        obj = SubjectVisit.objects.create(
+            survey_schedule=survey_schedule.field_value,
+            survey=survey1.field_value)
+        attach_survey_objects([obj])
+        obj.survey = survey2.field_value
+        self.assertEqual(obj.survey_object, survey2)
+
+    def test_survey_object_kept_on_instance(self):
+        survey_schedule = site_surveys.get_survey_schedules(current=True)[0]
+        survey1, survey2 = survey_schedule.current_surveys[0:2]
+        obj = SubjectVisit.objects.create(
+            survey_schedule=survey_schedule.field_value,
+            survey=survey1.field_value)
+        with patch.object(
+                site_surveys, 'get_survey_from_field_value',
+                wraps=site_surveys.get_survey_from_field_value) as get_survey:
+            self.assertEqual(obj.survey_object, survey1)
+            self.assertEqual(obj.survey_object, survey1)
+            self.assertEqual(get_survey.call_count, 1)
+            obj.survey = survey2.field_value
+            self.assertEqual(obj.survey_object, survey2)
+            self.assertEqual(get_survey.call_count, 2)
+
+    def test_survey_schedule_object_kept_on_instance(self):
+        obj = HouseholdStructure.objects.all()[0]
+        with patch.object(
+                site_surveys, 'get_survey_schedule_from_field_value',
+                wraps=site_surveys.get_survey_schedule_from_field_value) as get:
+            self.assertEqual(obj.survey_schedule_object.name, 'year-1')
+            self.assertEqual(obj.survey_schedule_object.name, 'year-1')
+            self.assertEqual(get.call_count, 1)
+
+    def test_survey_objects_not_pickled(self):
+        survey_schedule = site_surveys.get_survey_schedules(current=True)[0]
+        survey = survey_schedule.current_surveys[0]
+        obj = SubjectVisit.objects.create(
+            survey_schedule=survey_schedule.field_value,
+            survey=survey.field_value)
+        self.assertEqual(obj.survey_object, survey)
+        self.assertEqual(obj.survey_schedule_object, survey_schedule)
+        unpickled = pickle.loads(pickle.dumps(obj))
+        self.assertFalse(hasattr(unpickled, '_survey_object'))
+        self.assertFalse(hasattr(unpickled, '_survey_schedule_object'))
+        self.assertEqual(unpickled.survey_object, survey)
+        self.assertTrue(hasattr(obj, '_survey_object'))
+
+    def make_subject_visits(self, count):
+        survey_schedule = site_surveys.get_survey_schedules(current=True)[0]
+        surveys = survey_schedule.current_surveys
+        for n in range(0, count):
+            SubjectVisit.objects.create(
+                survey_schedule=survey_schedule.field_value,
+                survey=surveys[n % len(surveys)].field_value)
+        return survey_schedule, surveys
+
+    def test_with_survey_objects(self):
+        survey_schedule, surveys = self.make_subject_visits(7)
+        with patch.object(
+                site_surveys, 'get_survey_from_field_value',
+                wraps=site_surveys.get_survey_from_field_value) as get_survey:
+            objs = list(SubjectVisit.objects.with_survey_objects())
+            self.assertEqual(get_survey.call_count, len(surveys))
+            for obj in objs:
+                self.assertEqual(obj.survey_object.field_value, obj.survey)
+                self.assertEqual(obj.survey_schedule_object, survey_schedule)
+            self.assertEqual(get_survey.call_count, len(surveys))
+
+    def test_with_survey_objects_iterator(self):
+        survey_schedule, surveys = self.make_subject_visits(7)
+        with patch.object(SurveyModelIterable, 'chunk_size', 2):
+            with patch.object(
+                    site_surveys, 'get_survey_from_field_value',
+                    wraps=site_surveys.get_survey_from_field_value) as get_survey:
+                objs = list(SubjectVisit.objects.with_survey_objects().iterator())
+                self.assertEqual(get_survey.call_count, len(surveys))
+        self.assertEqual(len(objs), 7)
+        for obj in objs:
+            self.assertEqual(obj._survey_object, (obj.survey, obj.survey_object))
+
+    def test_with_survey_objects_iterator_chunk_size(self):
+        """Asserts instances are attached a chunk at a time, as with
+        `iterator(chunk_size=3)` on Django >= 2.0.
+        """
+        self.make_subject_visits(7)
+        iterable = SurveyModelIterable(SubjectVisit.objects.all())
+        iterable.chunk_size = 3
+        with patch(
+                'survey.managers.attach_survey_objects',
+                wraps=attach_survey_objects) as attach:
+            objs = list(iterable)
+            self.assertEqual(
+                [len(call[0][0]) for call in attach.call_args_list], [3, 3, 1])
+        self.assertEqual(len(objs), 7)
+        for obj in objs:
+            self.assertEqual(obj._survey_object, (obj.survey, obj.survey_object))
+
+    def test_with_survey_objects_not_registered(self):
+        """Asserts a row that does not resolve does not stop the
+        iteration and raises on access.
+        """
+        survey_schedule, _ = self.make_subject_visits(3)
+        stale = SubjectVisit.objects.order_by('pk')[1]
+        SubjectVisit.objects.filter(pk=stale.pk).update(
+            survey_schedule='blah.blah.test_community',
+            survey='blah.blah.baseline.test_community')
+        with patch.object(SurveyModelIterable, 'chunk_size', 2):
+            objs = list(SubjectVisit.objects.with_survey_objects().order_by('pk'))
+        self.assertEqual(len(objs), 3)
+        self.assertEqual(objs[0].survey_schedule_object, survey_schedule)
+        self.assertEqual(objs[2].survey_object.field_value, objs[2].survey)
+        self.assertRaises(SiteSurveysError, getattr, objs[1], 'survey_schedule_object')
+        self.assertRaises(SiteSurveysError, getattr, objs[1], 'survey_object')
+
+    def test_with_survey_objects_values(self):
+        self.make_subject_visits(2)
+        self.assertEqual(
+            len(SubjectVisit.objects.values('survey').with_survey_objects()), 2)
+
+    def get_indexes(self, model_cls):
+        with connection.cursor() as cursor:
+            constraints = connection.introspection.get_constraints(
+                cursor, model_cls._meta.db_table)
+        return sorted(c['columns'] for c in constraints.values() if c['index'])
+
+    def test_survey_indexes(self):
+        indexes = SurveyModelMixin.survey_indexes()
+        self.assertEqual([index.fields for index in indexes], [['survey']])
+        indexes = SurveyModelMixin.survey_schedule_indexes('household', 'report_datetime')
+        self.assertEqual(
+            [index.fields for index in indexes],
+            [['survey_schedule', 'household'], ['survey_schedule', 'report_datetime']])
+
+    def test_survey_indexes_created(self):
+        self.assertIn(
+            ['survey_schedule', 'household_id'], self.get_indexes(HouseholdStructure))
+        indexes = self.get_indexes(SubjectVisit)
+        self.assertIn(['survey_schedule', 'report_datetime'], indexes)
+        self.assertIn(['survey'], indexes)
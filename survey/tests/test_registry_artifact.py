@@ -0,0 +1,320 @@
+import os
+import shutil
+import sys
+import tempfile
+
+from dateutil.relativedelta import relativedelta
+from django.apps import apps as django_apps, AppConfig
+from django.core.management import call_command
+from django.test import TestCase, tag
+from django.test.utils import override_settings
+from edc_base.utils import get_utcnow
+from importlib import import_module
+from io import StringIO
+from unittest.mock import patch
+
+from ..registry_artifact import RegistryArtifact, RegistryArtifactError
+from ..registry_artifact import CompiledSurveysModule
+from ..registry_encoding import RegistryEncoding, EncodedSurveySchedule
+from ..site_surveys import site_surveys, SiteSurveysAlreadyRegistered
+from .survey_test_helper import SurveyTestHelper
+
+surveys_module = '''
+from dateutil.relativedelta import relativedelta
+from edc_base.utils import get_utcnow
+
+from survey.site_surveys import site_surveys
+from survey.survey import Survey
+from survey.survey_schedule import SurveySchedule
+
+start = get_utcnow() - relativedelta(years=3)
+
+survey_schedules = []
+for year in range(0, 2):
+    survey_schedule = SurveySchedule(
+        name=f'year-{year + 1}',
+        group_name='compiled_survey',
+        map_area='test_community',
+        map_areas=['test_community'],
+        start=start + relativedelta(years=year),
+        end=start + relativedelta(years=year + 1, days=-1))
+    survey_schedule.add_survey(Survey(
+        name='baseline',
+        position=0,
+        map_area='test_community',
+        start=survey_schedule.start,
+        end=survey_schedule.end,
+        full_enrollment_datetime=survey_schedule.end))
+    survey_schedules.append(survey_schedule)
+
+year_one, year_two = survey_schedules
+baseline = year_one.surveys[0]
+
+site_surveys.register(year_one)
+site_surveys.register(year_two)
+
+OTHER = 'other'
+'''
+
+
+@tag('registry_artifact')
+class TestRegistryArtifact(TestCase):
+
+    survey_helper = SurveyTestHelper()
+
+    def setUp(self):
+        self.survey_helper.load_test_surveys(load_all=True)
+        self.tmp_dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmp_dir, 'survey_registry.pickle')
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def test_write_read(self):
+        registry_artifact = RegistryArtifact(path=self.path)
+        registry_artifact.write(site_surveys.registry)
+        survey_schedules = registry_artifact.read()
+        self.assertEqual(
+            [s.field_value for s in survey_schedules],
+            [s.field_value for s in site_surveys.registry])
+        self.assertEqual(
+            [s.field_value for s in survey_schedules[0].surveys],
+            [s.field_value for s in site_surveys.registry[0].surveys])
+        self.assertIs(
+            survey_schedules[0].surveys[0].survey_schedule, survey_schedules[0])
+
+    def test_register_many_from_artifact(self):
+        registry_artifact = RegistryArtifact(path=self.path)
+        registry_artifact.write(site_surveys.registry)
+        field_values = site_surveys.get_survey_schedule_field_values()
+        site_surveys._registry = []
+        site_surveys.register_many(registry_artifact.read())
+        self.assertEqual(
+            site_surveys.get_survey_schedule_field_values(), field_values)
+
+    def test_missing_raises(self):
+        self.assertRaises(
+            RegistryArtifactError, RegistryArtifact(path=self.path).read)
+
+    def test_version_raises(self):
+        registry_artifact = RegistryArtifact(path=self.path)
+        registry_artifact.write(site_surveys.registry)
+        registry_artifact.version = 0
+        self.assertRaises(RegistryArtifactError, registry_artifact.read)
+
+    def test_source_changed_raises(self):
+        RegistryArtifact(path=self.path).write(site_surveys.registry)
+        # hash other modules of INSTALLED_APPS to simulate a change
+        registry_artifact = RegistryArtifact(path=self.path, module_name='models')
+        self.assertRaises(RegistryArtifactError, registry_artifact.read)
+
+
+@tag('registry_artifact')
+class TestLoadSurveysCompiled(TestCase):
+
+    """Compiles and loads the surveys of an INSTALLED_APP as
+    `compile_surveys` and LOAD_SURVEYS='compiled' do.
+    """
+
+    survey_helper = SurveyTestHelper()
+    app_name = 'compiled_surveys_app'
+    module_name = f'{app_name}.surveys'
+    load_surveys = 'compiled'
+    encoded = False
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmp_dir, 'survey_registry.pickle')
+        self.encoding_path = os.path.join(self.tmp_dir, 'survey_registry.bin')
+        os.mkdir(os.path.join(self.tmp_dir, self.app_name))
+        with open(os.path.join(self.tmp_dir, self.app_name, '__init__.py'), 'w'):
+            pass
+        with open(os.path.join(self.tmp_dir, self.app_name, 'surveys.py'), 'w') as f:
+            f.write(surveys_module)
+        sys.path.insert(0, self.tmp_dir)
+        # install the app without running every AppConfig.ready again
+        django_apps.app_configs[self.app_name] = AppConfig.create(self.app_name)
+        self.override = override_settings(
+            LOAD_SURVEYS=self.load_surveys, SURVEY_REGISTRY_ARTIFACT=self.path,
+            SURVEY_REGISTRY_ENCODING=self.encoding_path)
+        self.override.enable()
+        self.app_config = django_apps.get_app_config('survey')
+        self.survey_helper.load_test_surveys(
+            survey_schedules=[], register_current=False)
+
+    def tearDown(self):
+        self.unload_module()
+        self.app_config.registry_artifact_loaded = False
+        self.override.disable()
+        del django_apps.app_configs[self.app_name]
+        django_apps.clear_cache()
+        sys.path.remove(self.tmp_dir)
+        sys.modules.pop(self.app_name, None)
+        shutil.rmtree(self.tmp_dir)
+
+    def unload_module(self):
+        """Removes the surveys module as if in a new process.
+        """
+        sys.modules.pop(self.module_name, None)
+        package = sys.modules.get(self.app_name)
+        if package and hasattr(package, 'surveys'):
+            delattr(package, 'surveys')
+
+    def compile_and_load(self):
+        call_command('compile_surveys', encoded=self.encoded, stdout=StringIO())
+        self.unload_module()
+        self.survey_helper.load_test_surveys(
+            survey_schedules=[], register_current=False)
+        self.app_config.load_surveys()
+
+    def test_compile_surveys(self):
+        stdout = StringIO()
+        call_command('compile_surveys', stdout=stdout)
+        self.assertIn('Compiled 2 survey schedules', stdout.getvalue())
+        registry_artifact = RegistryArtifact(path=self.path)
+        self.assertEqual(
+            [s.field_value for s in registry_artifact.read()],
+            ['compiled_survey.year-1.test_community',
+             'compiled_survey.year-2.test_community'])
+        self.assertEqual(
+            registry_artifact.compiled_names[self.module_name],
+            {'survey_schedule': 'compiled_survey.year-2.test_community',
+             'year_one': 'compiled_survey.year-1.test_community',
+             'year_two': 'compiled_survey.year-2.test_community',
+             'baseline': 'compiled_survey.year-1.baseline.test_community'})
+        self.assertEqual(
+            registry_artifact.compiled_constants[self.module_name],
+            {'year': 1, 'OTHER': 'other'})
+
+    def test_compile_surveys_after_compiled_load(self):
+        self.compile_and_load()
+        stdout = StringIO()
+        call_command('compile_surveys', stdout=stdout)
+        self.assertIn('Compiled 2 survey schedules', stdout.getvalue())
+
+    def test_load_compiled(self):
+        self.compile_and_load()
+        self.assertTrue(self.app_config.registry_artifact_loaded)
+        self.assertEqual(
+            site_surveys.get_survey_schedule_field_values(),
+            ['compiled_survey.year-1.test_community',
+             'compiled_survey.year-2.test_community'])
+        self.assertIsInstance(sys.modules[self.module_name], CompiledSurveysModule)
+
+    def test_load_compiled_then_import(self):
+        """Asserts importing the surveys module after loading from
+        the artifact does not register again and returns the
+        registered objects.
+        """
+        self.compile_and_load()
+        module = import_module(self.module_name)
+        year_one = site_surveys.get_survey_schedule('compiled_survey.year-1')
+        self.assertIs(module.year_one, year_one)
+        self.assertIs(module.year_one.next, module.year_two)
+        self.assertIs(module.baseline, year_one.surveys[0])
+        from compiled_surveys_app.surveys import year_two  # noqa
+        self.assertIs(year_two, module.year_two)
+
+    def test_load_compiled_then_import_constant(self):
+        """Asserts a plain constant is read without running the
+        module.
+        """
+        self.compile_and_load()
+        module = import_module(self.module_name)
+        self.assertEqual(module.OTHER, 'other')
+        self.assertFalse(module.__executed__)
+
+    def test_load_compiled_then_import_other_name(self):
+        self.compile_and_load()
+        module = import_module(self.module_name)
+        self.assertLessEqual(module.year_one.start, module.start)
+        self.assertTrue(module.__executed__)
+        self.assertEqual(len(site_surveys.registry), 2)
+        self.assertIs(
+            module.year_one,
+            site_surveys.get_survey_schedule('compiled_survey.year-1'))
+        self.assertRaises(AttributeError, getattr, module, 'blah')
+
+    def test_load_compiled_then_import_other_name_later(self):
+        """Asserts running the module hours after compiling, when
+        dates relative to get_utcnow() differ, does not register
+        again.
+        """
+        self.compile_and_load()
+        module = import_module(self.module_name)
+        utcnow = get_utcnow() + relativedelta(hours=2)
+        with patch('edc_base.utils.get_utcnow', return_value=utcnow):
+            self.assertNotEqual(
+                module.survey_schedules[0].start, module.year_one.start)
+        self.assertEqual(len(site_surveys.registry), 2)
+        self.assertIs(
+            module.year_one,
+            site_surveys.get_survey_schedule('compiled_survey.year-1'))
+
+    def test_load_compiled_out_of_date_autodiscovers(self):
+        call_command('compile_surveys', encoded=self.encoded, stdout=StringIO())
+        self.unload_module()
+        with open(os.path.join(self.tmp_dir, self.app_name, 'surveys.py'), 'a') as f:
+            f.write('\nCHANGED = True\n')
+        self.survey_helper.load_test_surveys(
+            survey_schedules=[], register_current=False)
+        self.app_config.load_surveys()
+        self.assertFalse(self.app_config.registry_artifact_loaded)
+        self.assertEqual(len(site_surveys.registry), 2)
+        self.assertNotIsInstance(
+            sys.modules[self.module_name], CompiledSurveysModule)
+
+    def test_ignoring_registered(self):
+        self.compile_and_load()
+        module = import_module(self.module_name)
+        module.OTHER
+        with site_surveys.ignoring_registered():
+            site_surveys.register(module.survey_schedules[0])
+        self.assertRaises(
+            SiteSurveysAlreadyRegistered,
+            site_surveys.register, module.survey_schedules[0])
+
+
+@tag('registry_artifact')
+class TestLoadSurveysMapped(TestLoadSurveysCompiled):
+
+    """Repeats the tests of TestLoadSurveysCompiled with
+    `compile_surveys --encoded` and LOAD_SURVEYS='mapped'.
+    """
+
+    load_surveys = 'mapped'
+    encoded = True
+
+    def tearDown(self):
+        if site_surveys.registry_encoding is not None:
+            site_surveys.registry_encoding.buffer.close()
+        super().tearDown()
+
+    def test_compile_surveys(self):
+        stdout = StringIO()
+        call_command('compile_surveys', encoded=True, stdout=stdout)
+        self.assertIn('Compiled 2 survey schedules', stdout.getvalue())
+        registry_encoding = RegistryEncoding.open(self.encoding_path)
+        self.assertEqual(
+            registry_encoding.survey_schedule_field_values,
+            ['compiled_survey.year-1.test_community',
+             'compiled_survey.year-2.test_community'])
+        self.assertEqual(
+            registry_encoding.compiled_names[self.module_name],
+            {'survey_schedule': 'compiled_survey.year-2.test_community',
+             'year_one': 'compiled_survey.year-1.test_community',
+             'year_two': 'compiled_survey.year-2.test_community',
+             'baseline': 'compiled_survey.year-1.baseline.test_community'})
+        self.assertEqual(
+            registry_encoding.compiled_constants[self.module_name],
+            {'year': 1, 'OTHER': 'other'})
+        registry_encoding.buffer.close()
+
+    def test_load_mapped_then_import(self):
+        self.compile_and_load()
+        self.assertIsNotNone(site_surveys.registry_encoding)
+        module = import_module(self.module_name)
+        self.assertIsInstance(module.year_one, EncodedSurveySchedule)
+        self.assertIs(module.year_one, site_surveys.registry[0])
+        self.assertIs(module.baseline, module.year_one.surveys[0])
+        self.assertIs(module.year_one.next, module.year_two)
@@ -0,0 +1,218 @@
+import os
+import shutil
+import tempfile
+
+from dateutil.relativedelta import relativedelta
+from django.test import TestCase, tag
+from edc_base.utils import get_utcnow
+
+from ..registry_encoding import RegistryEncoding, RegistryEncodingError
+from ..registry_encoding import EncodedSurvey, EncodedSurveySchedule
+from ..site_surveys import site_surveys
+from ..survey import Survey
+from ..survey_schedule import SurveySchedule
+from .survey_test_helper import SurveyTestHelper
+from .surveys import survey_one, survey_two, survey_three
+
+
+@tag('registry_encoding')
+class TestRegistryEncoding(TestCase):
+
+    survey_helper = SurveyTestHelper()
+
+    def setUp(self):
+        self.survey_helper.load_test_surveys(load_all=True)
+        self.registry_encoding = RegistryEncoding(
+            RegistryEncoding.encode(site_surveys.registry))
+
+    def test_survey_schedules(self):
+        survey_schedules = self.registry_encoding.survey_schedules
+        for attr in ['field_value', 'name', 'group_name', 'map_area',
+                     'map_areas', 'start', 'end', 'short_name']:
+            with self.subTest(attr=attr):
+                self.assertEqual(
+                    [getattr(s, attr) for s in survey_schedules],
+                    [getattr(s, attr) for s in site_surveys.get_survey_schedules()])
+
+    def test_surveys(self):
+        surveys = self.registry_encoding.surveys
+        for attr in ['field_value', 'name', 'map_area', 'map_areas',
+                     'position', 'start', 'end', 'full_enrollment_datetime',
+                     'short_name', 'breadcrumbs', 'map_area_display']:
+            with self.subTest(attr=attr):
+                self.assertEqual(
+                    [getattr(s, attr) for s in surveys],
+                    [getattr(s, attr) for s in site_surveys.surveys])
+
+    def test_encoded_equals_survey(self):
+        survey = survey_one.surveys[1]
+        encoded_survey = self.registry_encoding.get_survey(survey.field_value)
+        self.assertIsInstance(encoded_survey, EncodedSurvey)
+        self.assertEqual(encoded_survey, survey)
+        self.assertEqual(hash(encoded_survey), hash(survey))
+        self.assertIsInstance(encoded_survey.survey_schedule, EncodedSurveySchedule)
+        self.assertEqual(encoded_survey.survey_schedule, survey_one)
+
+    def test_rstart_rend_built_once(self):
+        encoded_survey = self.registry_encoding.get_survey(
+            survey_one.surveys[0].field_value)
+        for obj in [encoded_survey, encoded_survey.survey_schedule]:
+            with self.subTest(obj=obj):
+                self.assertEqual(obj.rstart.datetime, obj.start)
+                self.assertEqual(obj.rend.datetime, obj.end)
+                self.assertIs(obj.rstart, obj.rstart)
+                self.assertIs(obj.rend, obj.rend)
+
+    def test_get_survey_not_found(self):
+        self.assertIsNone(self.registry_encoding.get_survey(
+            'test_survey.year-1.blah.test_community'))
+        self.assertIsNone(self.registry_encoding.get_survey(
+            'test_survey.year-1.baseline.blah'))
+        self.assertIsNone(self.registry_encoding.get_survey('blah'))
+
+    def test_load_encoding(self):
+        field_values = site_surveys.get_survey_names()
+        site_surveys.load_encoding(self.registry_encoding)
+        self.assertEqual(site_surveys.get_survey_names(), field_values)
+        survey = site_surveys.get_survey_from_field_value(
+            survey_two.surveys[0].field_value)
+        self.assertIsInstance(survey, EncodedSurvey)
+        self.assertEqual(survey, survey_two.surveys[0])
+        self.assertEqual(
+            site_surveys.get_survey_schedule('test_survey.year-2'), survey_two)
+
+    def test_load_encoding_current(self):
+        site_surveys.load_encoding(self.registry_encoding)
+        site_surveys.reset_current()
+        site_surveys.register_current(*survey_two.to_sparsers())
+        survey = site_surveys.get_survey(
+            survey_two.surveys[0].field_value, current=True)
+        self.assertEqual(survey.next, survey_two.surveys[1])
+        self.assertEqual(site_surveys.current_surveys, survey_two.surveys)
+
+    def test_lookups_return_same_objects(self):
+        survey = survey_two.surveys[1]
+        encoded_survey = self.registry_encoding.get_survey(survey.field_value)
+        self.assertIs(self.registry_encoding.get_survey(survey.field_value),
+                      encoded_survey)
+        self.assertIs(
+            self.registry_encoding.get_survey_by_map_area(
+                survey_two, survey.name, survey.map_area), encoded_survey)
+        self.assertIs(
+            self.registry_encoding.get_survey_by_name(survey_two, survey.name),
+            encoded_survey)
+        self.assertIs(encoded_survey.survey_schedule.surveys[1], encoded_survey)
+        self.assertIs(
+            self.registry_encoding.get_survey_schedules(group_name='test_survey')[1],
+            encoded_survey.survey_schedule)
+        self.assertIs(self.registry_encoding.surveys, self.registry_encoding.surveys)
+
+    def test_load_encoding_navigation(self):
+        """Asserts navigation and interval queries are served by
+        the encoding without compiling a snapshot.
+        """
+        site_surveys.load_encoding(self.registry_encoding)
+        site_surveys.freeze()
+        year_two = site_surveys.get_survey_schedule('test_survey.year-2')
+        self.assertIs(year_two.next, self.registry_encoding.survey_schedules[2])
+        self.assertEqual(year_two.previous, survey_one)
+        self.assertEqual(site_surveys.nth_survey_schedule(survey_one, 2), survey_three)
+        self.assertIsNone(site_surveys.nth_survey_schedule(survey_one, 3))
+        survey = survey_two.surveys[1]
+        self.assertEqual(
+            site_surveys.surveys_at(survey.start, map_area=survey.map_area), [survey])
+        self.assertEqual(site_surveys.surveys_at(survey.start), [survey])
+        self.assertEqual(
+            site_surveys.survey_schedules_at(
+                survey.start, group_name='test_survey'), [survey_two])
+        self.assertIsNone(site_surveys._snapshot)
+
+    def test_nth_survey_schedule_group_name_blank(self):
+        """Asserts nth_survey_schedule does not depend on an earlier
+        lookup by group_name, e.g. for a blank group_name.
+        """
+        survey_schedules = []
+        for year in range(0, 2):
+            start = get_utcnow() - relativedelta(years=3 - year)
+            survey_schedule = SurveySchedule(
+                name=f'year-{year + 1}',
+                group_name='',
+                map_area='test_community',
+                map_areas=['test_community'],
+                start=start,
+                end=start + relativedelta(months=11))
+            survey_schedule.add_survey(Survey(
+                name='baseline',
+                position=0,
+                map_area='test_community',
+                start=start,
+                end=start + relativedelta(months=4),
+                full_enrollment_datetime=start + relativedelta(months=4)))
+            survey_schedules.append(survey_schedule)
+        registry_encoding = RegistryEncoding(RegistryEncoding.encode(survey_schedules))
+        year_one, year_two = registry_encoding.survey_schedules
+        self.assertIs(registry_encoding.nth_survey_schedule(year_one, 1), year_two)
+        self.assertIsNone(registry_encoding.nth_survey_schedule(year_two, 1))
+        self.assertEqual(
+            registry_encoding.survey_schedules_by_group,
+            {year_one.group_name: (year_one, year_two)})
+
+    def test_register_stops_serving_encoding(self):
+        site_surveys.load_encoding(self.registry_encoding)
+        self.assertIs(site_surveys.lookups, self.registry_encoding)
+        start = survey_three.end + relativedelta(days=1)
+        survey_schedule = SurveySchedule(
+            name='year-4',
+            group_name='test_survey',
+            map_area='test_community',
+            map_areas=['test_community'],
+            start=start,
+            end=start + relativedelta(years=1))
+        survey_schedule.add_survey(Survey(
+            name='baseline',
+            position=0,
+            map_area='test_community',
+            start=start,
+            end=start + relativedelta(months=4),
+            full_enrollment_datetime=start + relativedelta(months=4)))
+        site_surveys.register(survey_schedule)
+        self.assertIsNone(site_surveys.registry_encoding)
+        self.assertIsNot(site_surveys.lookups, self.registry_encoding)
+        self.assertEqual(
+            site_surveys.get_survey(survey_schedule.surveys[0].field_value),
+            survey_schedule.surveys[0])
+        self.assertEqual(site_surveys.nth_survey_schedule(survey_one, 3),
+                         survey_schedule)
+
+    def test_reset_registry_stops_serving_encoding(self):
+        site_surveys.load_encoding(self.registry_encoding)
+        site_surveys._registry = []
+        self.assertIsNone(site_surveys.registry_encoding)
+
+    def test_write_open(self):
+        tmp_dir = tempfile.mkdtemp()
+        try:
+            path = os.path.join(tmp_dir, 'survey_registry.bin')
+            RegistryEncoding.write(
+                path, site_surveys.registry, source_hash='ab' * 32,
+                compiled_names={'app.surveys': {'survey_one': 'a.b.c'}},
+                compiled_constants={'app.surveys': {'map_areas': ['a', 'b']}})
+            registry_encoding = RegistryEncoding.open(path)
+            self.assertEqual(registry_encoding.source_hash, 'ab' * 32)
+            self.assertEqual(
+                registry_encoding.compiled_names,
+                {'app.surveys': {'survey_one': 'a.b.c'}})
+            self.assertEqual(
+                registry_encoding.compiled_constants,
+                {'app.surveys': {'map_areas': ['a', 'b']}})
+            self.assertEqual(
+                registry_encoding.survey_schedule_field_values,
+                site_surveys.get_survey_schedule_field_values())
+            registry_encoding.buffer.close()
+        finally:
+            shutil.rmtree(tmp_dir)
+
+    def test_invalid_raises(self):
+        self.assertRaises(RegistryEncodingError, RegistryEncoding, b'blah')
+        self.assertRaises(
+            RegistryEncodingError, RegistryEncoding, b'blah' + b'\0' * 100)
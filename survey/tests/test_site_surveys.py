@@ -1,8 +1,11 @@
+from threading import Thread
+
 from django.test import TestCase, tag
 from dateutil.relativedelta import relativedelta
 from edc_base.utils import get_utcnow
 
-from ..helpers import CurrentSurveyError
+from ..helpers import CurrentSurveyError, CurrentSurveysHelper
+from ..registry_snapshot import OrderedLinks
 from ..site_surveys import SiteSurveys, SiteSurveysRegistryNotLoaded
 from ..site_surveys import site_surveys, SiteSurveysAlreadyRegistered
 from ..site_surveys import SiteSurveysError
@@ -16,13 +19,26 @@ from copy import copy
 from pprint import pprint
 
 
+class DummySurvey:
+    def __init__(self, position):
+        self.name = f'survey-{position}'
+        self.map_area = 'erik'
+        self.start = get_utcnow() + relativedelta(days=2 * position)
+        self.end = self.start + relativedelta(days=1)
+
+
 class DummySurveySchedule:
     def __init__(self, name=None, surveys=None, group_name=None):
-        self.surveys = surveys or [1, 2, 3]
+        self.surveys = surveys or [DummySurvey(n) for n in range(1, 4)]
+        self.survey_templates = []
         self.name = name or 'erik'
         self.group_name = group_name or 'erik'
         self.start = get_utcnow()
 
+    @property
+    def registry(self):
+        return self.surveys
+
 
 @tag('site_surveys')
 class TestSiteSurvey(TestCase):
@@ -78,6 +94,24 @@ class TestSiteSurveyRegisterCurrent(TestCase):
             site_surveys.register_current(sparser)
         self.assertEqual(cm.exception.code, 'survey_name')
 
+    def test_current_surveys_helper_configuration(self):
+        site_surveys.register(survey_one)
+        sparsers = [
+            S('test_survey.year-1.annual-1.test_community'),
+            S('test_survey.year-1.baseline.test_community'),
+            S('test_survey.year-1.baseline.test_community')]
+        helper = CurrentSurveysHelper(
+            current_survey_schedules=sparsers,
+            registered_survey_schedules=[survey_one])
+        configuration = helper.configuration
+        self.assertEqual(configuration.survey_schedules, (survey_one, ))
+        self.assertEqual(
+            configuration.surveys,
+            (survey_one.surveys[0], survey_one.surveys[1]))
+        self.assertIn(survey_one.surveys[0], configuration.survey_set)
+        self.assertNotIn(survey_one.surveys[2], configuration.survey_set)
+        self.assertEqual(configuration.map_areas, frozenset(['test_community']))
+
     def test_site_survey_registry_register_current_bad_group_name(self):
         site_surveys.register(survey_one)
         sparser = S('blah_group.year-1.baseline.test_community')
@@ -128,6 +162,28 @@ class TestSiteSurveyRegister(TestCase):
         site_surveys.register(survey_one)
         site_surveys.register_current(survey_one)
 
+    def test_register_many(self):
+        site_surveys.register_many([survey_one, survey_two, survey_three])
+        self.assertEqual(
+            site_surveys.get_survey_schedules(),
+            [survey_one, survey_two, survey_three])
+        self.assertEqual(
+            site_surveys.get_survey_schedule('test_survey.year-2'), survey_two)
+
+    def test_register_many_duplicate_name_registers_none(self):
+        self.assertRaises(
+            SiteSurveysAlreadyRegistered,
+            site_surveys.register_many, [survey_one, survey_two, survey_one])
+        self.assertEqual(site_surveys.registry, [])
+
+    def test_register_many_duplicate_start_raises(self):
+        site_surveys.register(DummySurveySchedule(name='erik'))
+        dummy = DummySurveySchedule(name='bob')
+        dummy.start = site_surveys.registry[0].start
+        self.assertRaises(
+            SiteSurveysAlreadyRegistered,
+            site_surveys.register_many, [dummy])
+
 
 @tag('site_surveys')
 class TestSiteSurveys(TestCase):
@@ -173,6 +229,70 @@ class TestSiteSurveys(TestCase):
             CurrentSurveySchedulesAlreadyLoaded,
             site_surveys.register_current, survey_two)
 
+    def test_reload_current(self):
+        self.survey_helper.load_test_surveys(load_count=2)
+        configuration = site_surveys.current_configuration
+        site_surveys.reload_current(survey_two)
+        self.assertIsNot(site_surveys.current_configuration, configuration)
+        self.assertEqual(site_surveys.current_surveys, survey_two.surveys)
+        self.assertEqual(
+            site_surveys.get_survey_schedules(current=True), [survey_two])
+        self.assertTrue(survey_two.current)
+        self.assertFalse(survey_one.current)
+        self.assertFalse(survey_one.surveys[0].current)
+        # a configuration held by the caller is unchanged
+        self.assertEqual(configuration.surveys, tuple(survey_one.surveys))
+
+    def test_reload_current_invalid_keeps_configuration(self):
+        configuration = site_surveys.current_configuration
+        self.assertRaises(
+            CurrentSurveyError,
+            site_surveys.reload_current,
+            S('test_survey.year-1.blahblah.test_community'))
+        self.assertIs(site_surveys.current_configuration, configuration)
+
+    def test_register_current_named(self):
+        self.survey_helper.load_test_surveys(load_count=2)
+        site_surveys.register_current(survey_two, name='two')
+        self.assertEqual(site_surveys.current_configuration_names, ['two'])
+        self.assertEqual(site_surveys.current_surveys, survey_one.surveys)
+        with site_surveys.using_current('two'):
+            self.assertEqual(site_surveys.current_surveys, survey_two.surveys)
+            self.assertTrue(survey_two.current)
+            self.assertFalse(survey_one.current)
+            self.assertIsNone(site_surveys.get_survey(
+                survey_one.surveys[0].field_value, current=True))
+            self.assertEqual(
+                survey_two.surveys[0].next, survey_two.surveys[1])
+        self.assertEqual(site_surveys.current_surveys, survey_one.surveys)
+        self.assertEqual(survey_one.surveys[0].next, survey_one.surveys[1])
+
+    def test_register_current_named_twice(self):
+        self.survey_helper.load_test_surveys(load_count=2)
+        site_surveys.register_current(survey_two, name='two')
+        self.assertRaises(
+            CurrentSurveySchedulesAlreadyLoaded,
+            site_surveys.register_current, survey_two, name='two')
+
+    def test_using_current_unknown_name(self):
+        with self.assertRaises(SiteSurveysError):
+            with site_surveys.using_current('blahblah'):
+                pass
+
+    def test_using_current_is_context_local(self):
+        self.survey_helper.load_test_surveys(load_count=2)
+        site_surveys.register_current(survey_two, name='two')
+        found = []
+
+        def run():
+            found.extend(site_surveys.current_surveys)
+
+        with site_surveys.using_current('two'):
+            thread = Thread(target=run)
+            thread.start()
+            thread.join()
+        self.assertEqual(found, survey_one.surveys)
+
     def test_site_survey_already_registered_name(self):
         survey_schedule = SurveySchedule(
             name='survey',
@@ -293,6 +413,53 @@ class TestSiteSurveys2(TestCase):
             site_surveys.get_survey_names('test_survey'),
             [s.field_value for s in survey_one.surveys])
 
+    def test_get_survey_schedule_uses_index(self):
+        self.survey_helper.load_test_surveys(load_all=True)
+        self.assertIs(
+            site_surveys.get_survey_schedule('test_survey.year-2'), survey_two)
+        self.assertIs(
+            site_surveys.get_survey_schedule(survey_three.field_value),
+            survey_three)
+
+    def test_survey_indexes_reset_with_registry(self):
+        self.survey_helper.load_test_surveys(load_all=True)
+        field_value = survey_two.surveys[0].field_value
+        self.assertIs(
+            site_surveys.get_survey(field_value), survey_two.surveys[0])
+        self.survey_helper.load_test_surveys(load_count=1)
+        self.assertIsNone(site_surveys.get_survey(field_value))
+        self.assertRaises(
+            SiteSurveysError,
+            site_surveys.get_survey_schedule, 'test_survey.year-2')
+
+    def test_get_survey_from_field_value_by_map_area(self):
+        self.survey_helper.load_test_surveys(load_all=True)
+        for survey in survey_two.surveys:
+            self.assertIs(
+                site_surveys.get_survey_from_field_value(survey.field_value),
+                survey)
+
+    def test_resolve_many(self):
+        self.survey_helper.load_test_surveys(load_all=True)
+        field_values = [
+            s.field_value for s in survey_two.surveys + survey_two.surveys]
+        resolved = site_surveys.resolve_many(field_values)
+        self.assertEqual(
+            resolved, {s.field_value: s for s in survey_two.surveys})
+
+    def test_resolve_many_invalid(self):
+        self.assertEqual(site_surveys.resolve_many([None]), {None: None})
+
+    def test_resolve_schedules_many(self):
+        self.survey_helper.load_test_surveys(load_all=True)
+        field_values = [
+            survey_one.field_value, survey_three.field_value,
+            survey_one.field_value]
+        self.assertEqual(
+            site_surveys.resolve_schedules_many(field_values),
+            {survey_one.field_value: survey_one,
+             survey_three.field_value: survey_three})
+
     def test_get_survey_schedule_field_values(self):
         self.survey_helper.load_test_surveys(load_all=True)
         self.assertEqual(
@@ -314,6 +481,46 @@ class TestSiteSurveys2(TestCase):
         self.assertEqual(site_surveys.current_map_areas, ['test_community'])
 
 
+@tag('site_surveys')
+class TestSiteSurveysFreeze(TestCase):
+
+    survey_helper = SurveyTestHelper()
+
+    def setUp(self):
+        self.survey_helper.load_test_surveys(load_count=2)
+
+    def test_freeze(self):
+        site_surveys.freeze()
+        self.assertTrue(site_surveys.frozen)
+        self.assertEqual(
+            site_surveys.snapshot.survey_schedules, (survey_one, survey_two))
+        self.assertEqual(
+            site_surveys.current_configuration.survey_schedule_set,
+            frozenset([survey_one]))
+
+    def test_snapshot_is_reused(self):
+        site_surveys.freeze()
+        snapshot = site_surveys.snapshot
+        site_surveys.get_survey_schedules()
+        self.assertIs(site_surveys.snapshot, snapshot)
+
+    def test_register_after_freeze_rebuilds_snapshot(self):
+        site_surveys.freeze()
+        snapshot = site_surveys.snapshot
+        site_surveys.register(survey_three)
+        self.assertIsNot(site_surveys.snapshot, snapshot)
+        self.assertEqual(
+            site_surveys.get_survey_schedules(),
+            [survey_one, survey_two, survey_three])
+        self.assertIn(
+            survey_three.surveys[0], site_surveys.snapshot.surveys)
+
+    def test_reset_registry_unfreezes(self):
+        site_surveys.freeze()
+        self.survey_helper.load_test_surveys()
+        self.assertFalse(site_surveys.frozen)
+
+
 @tag('site_surveys')
 class TestSiteSurveysSurveyOrder(TestCase):
 
@@ -383,6 +590,17 @@ class TestSiteSurveysSurveyOrder(TestCase):
         self.assertEqual(surveys[1].next, self.survey3)
         self.assertEqual(surveys[2].next, None)
 
+    def test_nth_survey(self):
+        self.survey_schedule.add_survey(
+            self.survey3, self.survey1, self.survey2)
+        site_surveys.register(self.survey_schedule)
+        site_surveys.register_current(*self.current_sparsers)
+        self.assertEqual(self.survey1.nth(0), self.survey1)
+        self.assertEqual(self.survey1.nth(2), self.survey3)
+        self.assertEqual(self.survey3.nth(-2), self.survey1)
+        self.assertIsNone(self.survey1.nth(3))
+        self.assertIsNone(self.survey2.nth(-2))
+
     def test_register_current(self):
         self.survey_schedule.add_survey(
             self.survey3, self.survey1, self.survey2)
@@ -411,3 +629,146 @@ class TestSiteSurveysSurveyOrder(TestCase):
             if survey.field_value in [
                     survey.field_value for survey in site_surveys.current_surveys]:
                 self.assertTrue(survey.current)
+
+
+@tag('site_surveys')
+class TestOrderedLinks(TestCase):
+
+    survey_helper = SurveyTestHelper()
+
+    def make_items(self, days):
+        start = get_utcnow()
+        items = []
+        for n, day in enumerate(days):
+            item = DummySurvey(0)
+            item.name = f'item-{n}'
+            item.start = start + relativedelta(days=day)
+            items.append(item)
+        return items
+
+    def test_links_as_filters(self):
+        """Asserts next/previous are the first/last item, in the
+        given order, starting after/before the item, as with the
+        original filters, including for items sharing a start.
+        """
+        items = self.make_items([3, 1, 2, 1, 3, 0, 2])
+        links = OrderedLinks(items)
+        for item in items:
+            next_items = [x for x in items if x.start > item.start]
+            previous_items = [x for x in items if x.start < item.start]
+            self.assertIs(links.next(item), (next_items or [None])[0])
+            self.assertIs(links.previous(item), (previous_items or [None])[-1])
+
+    def test_links_nth(self):
+        items = self.make_items([0, 1, 1, 2])
+        links = OrderedLinks(items)
+        self.assertIs(links.nth(items[0], 2), items[3])
+        self.assertIs(links.nth(items[3], -2), items[0])
+        self.assertIs(links.nth(items[2], 0), items[2])
+        self.assertIsNone(links.nth(items[0], 3))
+
+    def test_links_not_in_items(self):
+        items = self.make_items([0, 2])
+        links = OrderedLinks(items)
+        other = self.make_items([1])[0]
+        self.assertIs(links.next(other), items[1])
+        self.assertIs(links.previous(other), items[0])
+
+    def test_current_surveys_sharing_a_start(self):
+        """Asserts current surveys sharing a start, e.g. in two
+        survey schedules, link as with the original filters over
+        current_surveys.
+
+        Survey schedules in a group may not share a start.
+        """
+        start = get_utcnow() - relativedelta(years=2)
+        survey_schedules = []
+        for n in range(0, 2):
+            survey_schedule = SurveySchedule(
+                name=f'year-{n + 1}',
+                group_name='test_survey',
+                map_area='test_community',
+                start=start + relativedelta(days=n),
+                end=start + relativedelta(years=1))
+            survey_schedule.add_survey(*[Survey(
+                position=position,
+                name=f'survey{position}',
+                map_area='test_community',
+                start=start + relativedelta(days=days),
+                end=start + relativedelta(days=days + 49),
+                full_enrollment_datetime=start + relativedelta(days=days + 30))
+                for position, days in enumerate([2, 52])])
+            survey_schedules.append(survey_schedule)
+        self.survey_helper.load_test_surveys(
+            survey_schedules=survey_schedules, load_all=True, register_current=False)
+        site_surveys.register_current(*[
+            S(f'test_survey.{name}.survey{position}.test_community')
+            for name in ['year-1', 'year-2'] for position in [0, 1]])
+        current_surveys = site_surveys.current_surveys
+        self.assertEqual(len(current_surveys), 4)
+        for survey in current_surveys:
+            next_surveys = [s for s in current_surveys if s.start > survey.start]
+            previous_surveys = [s for s in current_surveys if s.start < survey.start]
+            self.assertIs(survey.next, (next_surveys or [None])[0])
+            self.assertIs(survey.previous, (previous_surveys or [None])[-1])
+
+
+@tag('site_surveys')
+class TestSiteSurveysAt(TestCase):
+
+    survey_helper = SurveyTestHelper()
+
+    def setUp(self):
+        self.survey_schedule = self.survey_helper.make_survey_schedule(
+            name='year-1', map_area='test_community',
+            map_areas=['test_community', 'other_community'])
+        self.surveys = []
+        for map_area in ['test_community', 'other_community']:
+            for position, days in enumerate([1, 51]):
+                self.surveys.append(Survey(
+                    position=position,
+                    name=f'survey{position}',
+                    map_area=map_area,
+                    start=self.survey_schedule.start + relativedelta(days=days),
+                    end=self.survey_schedule.start + relativedelta(days=days + 49),
+                    full_enrollment_datetime=(
+                        self.survey_schedule.start + relativedelta(days=days + 30))))
+        self.survey_schedule.add_survey(*self.surveys)
+        self.survey_helper.load_test_surveys(
+            survey_schedules=[self.survey_schedule], register_current=False)
+
+    def test_surveys_at(self):
+        reference_datetime = self.survey_schedule.start + relativedelta(days=10)
+        self.assertEqual(
+            set(site_surveys.surveys_at(reference_datetime)),
+            set([self.surveys[0], self.surveys[2]]))
+
+    def test_surveys_at_by_map_area(self):
+        reference_datetime = self.survey_schedule.start + relativedelta(days=60)
+        self.assertEqual(
+            site_surveys.surveys_at(
+                reference_datetime, map_area='other_community'),
+            [self.surveys[3]])
+
+    def test_surveys_at_none(self):
+        reference_datetime = self.survey_schedule.start - relativedelta(days=1)
+        self.assertEqual(site_surveys.surveys_at(reference_datetime), [])
+        self.assertEqual(site_surveys.surveys_at(
+            self.survey_schedule.start, map_area='blah'), [])
+
+    def test_surveys_at_current(self):
+        site_surveys.register_current(
+            S('test_survey.year-1.survey0.test_community'))
+        reference_datetime = self.survey_schedule.start + relativedelta(days=10)
+        self.assertEqual(
+            site_surveys.surveys_at(reference_datetime, current=True),
+            [self.surveys[0]])
+
+    def test_survey_schedules_at(self):
+        reference_datetime = self.survey_schedule.start + relativedelta(days=10)
+        self.assertEqual(
+            site_surveys.survey_schedules_at(reference_datetime),
+            [self.survey_schedule])
+        self.assertEqual(
+            site_surveys.survey_schedules_at(
+                reference_datetime, group_name='blah'), [])
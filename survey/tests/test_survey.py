@@ -1,17 +1,20 @@
 # coding=utf-8
 
+from copy import copy
 from dateutil.relativedelta import relativedelta
 
 from django.test import TestCase, tag
 
 from edc_base.utils import get_utcnow
 
-from ..exceptions import AddSurveyMapAreaError
+from ..exceptions import AddSurveyMapAreaError, AddSurveyNameError
 from ..exceptions import SurveyError, AddSurveyDateError
+from ..site_surveys import site_surveys
 from ..sparser import S
-from ..survey import Survey
+from ..survey import Survey, CompactSurvey
+from ..survey_schedule import CompactSurveySchedule
 from .survey_test_helper import SurveyTestHelper
-from .surveys import survey_one
+from .surveys import survey_one, survey_two
 
 
 class TestSurveyAttrs(TestCase):
@@ -43,6 +46,59 @@ class TestSurveyAttrs(TestCase):
             survey_one.surveys[0].field_value,
             'test_survey.year-1.baseline.test_community')
 
+    def test_field_value_reset_on_group_name(self):
+        survey = survey_one.surveys[0]
+        self.assertEqual(
+            survey.field_value, 'test_survey.year-1.baseline.test_community')
+        survey_one.group_name = 'blah'
+        self.assertEqual(survey.field_value, 'blah.year-1.baseline.test_community')
+        self.assertEqual(survey.breadcrumbs, ['blah', 'year-1', 'baseline'])
+        self.assertEqual(survey_one.short_name, 'blah.year-1')
+        survey_one.group_name = 'test_survey'
+        self.assertEqual(
+            survey.field_value, 'test_survey.year-1.baseline.test_community')
+
+    def test_field_value_reset_on_map_area(self):
+        survey = survey_one.surveys[0]
+        survey.map_area = 'other_community'
+        self.assertEqual(
+            survey.field_value, 'test_survey.year-1.baseline.other_community')
+        self.assertEqual(survey.map_area_display, 'Other Community')
+        survey.map_area = 'test_community'
+        self.assertEqual(
+            survey.field_value, 'test_survey.year-1.baseline.test_community')
+        self.assertEqual(survey.map_area_display, 'Test Community')
+
+    def test_eq_and_hash_by_field_value(self):
+        survey = survey_one.surveys[0]
+        other = copy(survey)
+        self.assertIsNot(survey, other)
+        self.assertEqual(survey, other)
+        self.assertEqual(hash(survey), hash(other))
+        self.assertIn(other, set(survey_one.surveys))
+        self.assertNotEqual(survey, survey_one.surveys[1])
+        self.assertNotEqual(survey, survey.field_value)
+
+    def test_unbound_survey_eq_by_identity(self):
+        survey = Survey(
+            position=0,
+            map_area='test_community',
+            start=(get_utcnow() - relativedelta(years=1)),
+            end=get_utcnow(),
+            full_enrollment_datetime=(get_utcnow() - relativedelta(weeks=1)))
+        self.assertEqual(survey, survey)
+        self.assertNotEqual(survey, copy(survey))
+        self.assertIn(survey, set([survey]))
+
+    def test_is_current_survey(self):
+        self.survey_helper.load_test_surveys(load_all=True)
+        self.assertTrue(site_surveys.is_current_survey(
+            copy(survey_one.surveys[0])))
+        self.assertFalse(site_surveys.is_current_survey(
+            survey_two.surveys[0]))
+        self.assertTrue(site_surveys.is_current_survey_schedule(survey_one))
+        self.assertFalse(site_surveys.is_current_survey_schedule(survey_two))
+
     def test_to_sparser(self):
         self.assertEqual(
             survey_one.surveys[0].to_sparser().field_value,
@@ -109,6 +165,23 @@ class TestSurvey(TestCase):
             full_enrollment_datetime=(get_utcnow() - relativedelta(years=3)))
         survey_schedule.add_survey(survey)
 
+    def test_add_survey_duplicate_name_raises(self):
+        survey_schedule = self.survey_helper.make_survey_schedule()
+        surveys = [Survey(
+            name='baseline',
+            position=position,
+            map_area='test_community',
+            start=(get_utcnow() - relativedelta(years=4)),
+            end=(get_utcnow() - relativedelta(years=2)),
+            full_enrollment_datetime=(get_utcnow() - relativedelta(years=3)))
+            for position in range(0, 2)]
+        self.assertRaises(
+            AddSurveyNameError, survey_schedule.add_survey, *surveys)
+        self.assertEqual(survey_schedule.registry, [])
+        survey_schedule.add_survey(surveys[0])
+        self.assertRaises(
+            AddSurveyNameError, survey_schedule.add_survey, surveys[1])
+
     def test_add_survey_with_bad_dates(self):
         survey_schedule = self.survey_helper.make_survey_schedule()
         bad_start = survey_schedule.start - relativedelta(years=1)
@@ -212,3 +285,67 @@ class TestSurvey(TestCase):
         survey_schedule.add_survey(survey1, survey2)
         self.assertEqual([survey2], survey_schedule.get_surveys(
             reference_datetime=survey_schedule.start + relativedelta(days=80)))
+
+
+class TestCompactSurvey(TestCase):
+
+    survey_helper = SurveyTestHelper()
+
+    def make_survey(self, survey_cls, survey_schedule):
+        return survey_cls(
+            name='baseline',
+            position=0,
+            map_area='test_community',
+            start=survey_schedule.start + relativedelta(days=1),
+            end=survey_schedule.end - relativedelta(days=1),
+            full_enrollment_datetime=survey_schedule.end - relativedelta(days=2))
+
+    def test_compact_survey_attrs(self):
+        survey_schedule = self.survey_helper.make_survey_schedule(
+            map_area='test_community')
+        compact_survey_schedule = CompactSurveySchedule(
+            name=survey_schedule.name,
+            group_name=survey_schedule.group_name,
+            map_area='test_community',
+            start=survey_schedule.start,
+            end=survey_schedule.end)
+        survey = self.make_survey(Survey, survey_schedule)
+        compact_survey = self.make_survey(CompactSurvey, compact_survey_schedule)
+        survey_schedule.add_survey(survey)
+        compact_survey_schedule.add_survey(compact_survey)
+        for attr in ['name', 'start', 'end', 'rstart', 'rend', 'map_area',
+                     'map_areas', 'map_area_display', 'field_value',
+                     'short_name', 'breadcrumbs', 'full_enrollment_datetime']:
+            self.assertEqual(
+                getattr(survey, attr), getattr(compact_survey, attr), attr)
+        self.assertEqual(
+            survey_schedule.field_value, compact_survey_schedule.field_value)
+        self.assertEqual(
+            survey_schedule.rstart, compact_survey_schedule.rstart)
+
+    def test_compact_rstart_rend_built_once(self):
+        survey_schedule = CompactSurveySchedule(
+            name='year-1',
+            group_name='test_survey',
+            map_area='test_community',
+            start=(get_utcnow() - relativedelta(years=5)),
+            end=(get_utcnow() - relativedelta(years=1)))
+        survey = self.make_survey(CompactSurvey, survey_schedule)
+        for obj in [survey, survey_schedule]:
+            with self.subTest(obj=obj):
+                self.assertEqual(obj.rstart.datetime, obj.start)
+                self.assertEqual(obj.rend.datetime, obj.end)
+                self.assertIs(obj.rstart, obj.rstart)
+                self.assertIs(obj.rend, obj.rend)
+
+    def test_compact_survey_has_no_dict(self):
+        survey_schedule = CompactSurveySchedule(
+            name='year-1',
+            group_name='test_survey',
+            map_area='test_community',
+            start=(get_utcnow() - relativedelta(years=5)),
+            end=(get_utcnow() - relativedelta(years=1)))
+        survey = self.make_survey(CompactSurvey, survey_schedule)
+        self.assertFalse(hasattr(survey, '__dict__'))
+        self.assertFalse(hasattr(survey_schedule, '__dict__'))
+        self.assertFalse(hasattr(survey, 'date_helper'))
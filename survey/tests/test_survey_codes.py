@@ -0,0 +1,280 @@
+import pickle
+
+from dateutil.relativedelta import relativedelta
+from django.test import TestCase, tag
+
+from ..exceptions import SurveyError
+from ..managers import SurveyModelIterable
+from ..site_surveys import site_surveys
+from ..survey import Survey, SurveyTemplate
+from ..survey_codes import SurveyCodes, SurveyCodeError
+from ..survey_schedule import SurveyScheduleError
+from ..survey_codes import migrate_survey_codes, translate_survey_lookups
+from .models import HouseholdStructureCode, SubjectVisitCode, SubjectVisitMigrating
+from .survey_test_helper import SurveyTestHelper
+
+
+@tag('survey_codes')
+class TestSurveyCodes(TestCase):
+
+    survey_helper = SurveyTestHelper()
+
+    def setUp(self):
+        self.survey_helper.load_test_surveys()
+        self.survey_schedule = site_surveys.get_survey_schedules(current=True)[0]
+        self.surveys = self.survey_schedule.current_surveys
+
+    def make_subject_visits(self, count, model_cls=None):
+        model_cls = model_cls or SubjectVisitCode
+        for n in range(0, count):
+            model_cls.objects.create(
+                survey_schedule=self.survey_schedule.field_value,
+                survey=self.surveys[n % len(self.surveys)].field_value)
+
+    def test_codes(self):
+        """Asserts codes are the codes assigned in tests/surveys.py.
+        """
+        survey_codes = site_surveys.survey_codes
+        for survey_schedule in site_surveys.registry:
+            code = survey_codes.code(survey_schedule.field_value)
+            self.assertEqual(code, survey_schedule.code)
+            self.assertEqual(
+                survey_codes.survey_schedule_field_value(code),
+                survey_schedule.field_value)
+            for survey in survey_schedule.surveys:
+                code = survey_codes.code(survey.field_value)
+                self.assertEqual(code, survey.code)
+                self.assertEqual(
+                    survey_codes.survey_field_value(code), survey.field_value)
+        self.assertEqual(survey_codes.code(self.survey_schedule.field_value), 1)
+        self.assertEqual(survey_codes.code(self.surveys[0].field_value), 10)
+
+    def test_codes_stable(self):
+        """Asserts a code does not depend on the order of registration.
+        """
+        survey_schedules = site_surveys.registry
+        self.assertEqual(
+            SurveyCodes(survey_schedules).codes,
+            SurveyCodes(list(reversed(survey_schedules))).codes)
+        field_value = survey_schedules[-1].field_value
+        self.assertEqual(
+            SurveyCodes(survey_schedules[-1:]).code(field_value),
+            site_surveys.survey_codes.code(field_value))
+
+    def test_codes_rebuilt_on_registry_load(self):
+        survey_codes = site_surveys.survey_codes
+        self.assertIs(site_surveys.survey_codes, survey_codes)
+        self.survey_helper.load_test_surveys()
+        self.assertIsNot(site_surveys.survey_codes, survey_codes)
+
+    def test_code_not_registered(self):
+        self.assertRaises(
+            SurveyCodeError, site_surveys.survey_codes.code, 'blah.blah.blah')
+        self.assertIsNone(site_surveys.survey_codes.code(None))
+        self.assertIsNone(site_surveys.survey_codes.survey_schedule_field_value(None))
+        self.assertIsNone(site_surveys.survey_codes.survey_field_value(999))
+
+    def test_schedule_and_survey_codes_separate(self):
+        survey_codes = site_surveys.survey_codes
+        self.assertEqual(
+            survey_codes.survey_schedule_field_value(1),
+            site_surveys.registry[0].field_value)
+        self.assertIsNone(survey_codes.survey_field_value(1))
+
+    def make_survey_schedule(self, code=None, survey_code=None):
+        survey_schedule = self.survey_helper.make_survey_schedule(
+            group_name='other', code=code)
+        start = survey_schedule.start
+        survey_schedule.add_survey(Survey(
+            name='baseline',
+            position=0,
+            code=survey_code,
+            map_area=survey_schedule.map_area,
+            start=start,
+            end=start + relativedelta(months=4, days=-1),
+            full_enrollment_datetime=start + relativedelta(months=4, days=-1)))
+        return survey_schedule
+
+    def test_code_not_unique_raises(self):
+        survey_schedule = self.make_survey_schedule(code=1)
+        self.assertRaises(SurveyCodeError, site_surveys.register, survey_schedule)
+        self.assertNotIn(survey_schedule, site_surveys.registry)
+        self.assertRaises(
+            SurveyCodeError, site_surveys.survey_codes.code, survey_schedule.field_value)
+
+    def test_survey_code_not_unique_raises(self):
+        survey_schedule = self.make_survey_schedule(code=9, survey_code=10)
+        self.assertRaises(SurveyCodeError, site_surveys.register, survey_schedule)
+        self.assertNotIn(survey_schedule, site_surveys.registry)
+        self.assertIsNone(site_surveys.survey_codes.survey_schedule_field_value(9))
+
+    def test_code_invalid_raises(self):
+        for code in [-1, 2 ** 31, '1', 1.0]:
+            with self.subTest(code=code):
+                self.assertRaises(
+                    SurveyCodeError, site_surveys.register,
+                    self.make_survey_schedule(code=code))
+                self.assertRaises(
+                    SurveyCodeError, site_surveys.register,
+                    self.make_survey_schedule(code=9, survey_code=code))
+
+    def test_code_not_assigned(self):
+        survey_schedule = self.make_survey_schedule()
+        site_surveys.register(survey_schedule)
+        self.assertRaises(
+            SurveyCodeError, site_surveys.survey_codes.code, survey_schedule.field_value)
+        self.assertRaises(
+            SurveyCodeError, site_surveys.survey_codes.code,
+            survey_schedule.surveys[0].field_value)
+
+    def make_survey_template_schedule(self, codes, map_areas):
+        survey_schedule = self.survey_helper.make_survey_schedule(
+            group_name='other', code=9, map_area='community_0', map_areas=map_areas)
+        start = survey_schedule.start + relativedelta(days=1)
+        survey_schedule.add_survey_template(SurveyTemplate(
+            name='baseline',
+            position=0,
+            codes=codes,
+            start=start,
+            end=start + relativedelta(days=50),
+            full_enrollment_datetime=start + relativedelta(days=30)))
+        return survey_schedule
+
+    def test_survey_template_codes(self):
+        codes = {'community_0': 100, 'community_1': 107, 'community_2': 101}
+        survey_schedule = self.make_survey_template_schedule(
+            codes, ['community_0', 'community_1', 'community_2'])
+        site_surveys.register(survey_schedule)
+        self.assertEqual(survey_schedule._template_surveys, {})
+        survey_codes = site_surveys.survey_codes
+        for map_area, code in codes.items():
+            survey = survey_schedule.get_template_survey('baseline', map_area)
+            self.assertEqual(survey.code, code)
+            self.assertEqual(survey_codes.code(survey.field_value), code)
+            self.assertEqual(survey_codes.survey_field_value(code), survey.field_value)
+
+    def test_survey_template_codes_map_areas_reordered(self):
+        """Asserts a template survey keeps its code if map_areas
+        are reordered or one is inserted.
+        """
+        codes = {'community_0': 100, 'community_1': 107, 'community_2': 101}
+        survey_schedule = self.make_survey_template_schedule(
+            dict(codes, community_3=102),
+            ['community_3', 'community_2', 'community_0', 'community_1'])
+        site_surveys.register(survey_schedule)
+        for map_area, code in codes.items():
+            self.assertEqual(
+                survey_schedule.get_template_survey('baseline', map_area).code, code)
+
+    def test_survey_template_code_missing_raises(self):
+        survey_schedule = self.make_survey_template_schedule(
+            {'community_0': 100}, ['community_0', 'community_1'])
+        self.assertRaises(SurveyCodeError, site_surveys.register, survey_schedule)
+        self.assertNotIn(survey_schedule, site_surveys.registry)
+
+    def test_model_fields(self):
+        self.make_subject_visits(1)
+        obj = SubjectVisitCode.objects.get()
+        self.assertEqual(obj.survey_schedule_code, self.survey_schedule.code)
+        self.assertEqual(obj.survey_code, self.surveys[0].code)
+        self.assertEqual(obj.survey_schedule, self.survey_schedule.field_value)
+        self.assertEqual(obj.survey, self.surveys[0].field_value)
+        self.assertEqual(obj.survey_schedule_object, self.survey_schedule)
+        self.assertEqual(obj.survey_object, self.surveys[0])
+
+    def test_model_survey_not_registered(self):
+        self.assertRaises(
+            SurveyCodeError, SubjectVisitCode, survey_schedule='blah.blah.blah')
+
+    def test_model_code_not_registered(self):
+        """Asserts a stored code with no registered field value
+        raises the errors the string field mixins raise.
+        """
+        self.make_subject_visits(1)
+        SubjectVisitCode.objects.update(survey_schedule_code=999, survey_code=999)
+        obj = SubjectVisitCode.objects.get()
+        self.assertIsNone(obj.survey_schedule)
+        self.assertIsNone(obj.survey)
+        self.assertRaises(SurveyScheduleError, getattr, obj, 'survey_schedule_object')
+        self.assertRaises(SurveyError, getattr, obj, 'survey_object')
+
+    def test_survey_objects_not_pickled(self):
+        self.make_subject_visits(1)
+        obj = SubjectVisitCode.objects.get()
+        self.assertEqual(obj.survey_object, self.surveys[0])
+        unpickled = pickle.loads(pickle.dumps(obj))
+        self.assertFalse(hasattr(unpickled, '_survey_object'))
+        self.assertEqual(unpickled.survey_object, self.surveys[0])
+
+    def test_filter(self):
+        self.make_subject_visits(4)
+        survey = self.surveys[0]
+        self.assertEqual(
+            SubjectVisitCode.objects.filter(
+                survey_schedule=self.survey_schedule.field_value).count(), 4)
+        self.assertEqual(
+            SubjectVisitCode.objects.filter(survey=survey.field_value).count(),
+            len([n for n in range(0, 4) if n % len(self.surveys) == 0]))
+        self.assertEqual(
+            SubjectVisitCode.objects.exclude(
+                survey_schedule=self.survey_schedule.field_value).count(), 0)
+        self.assertEqual(
+            SubjectVisitCode.objects.filter(
+                survey_schedule__in=[self.survey_schedule.field_value, None]).count(), 4)
+        self.assertEqual(
+            SubjectVisitCode.objects.filter(survey_schedule='blah.blah.blah').count(), 0)
+
+    def test_filter_across_relation(self):
+        household_structure = HouseholdStructureCode.objects.create(
+            survey_schedule=self.survey_schedule.field_value)
+        SubjectVisitCode.objects.create(
+            household_structure=household_structure,
+            survey_schedule=self.survey_schedule.field_value)
+        self.assertEqual(
+            SubjectVisitCode.objects.filter(
+                household_structure__survey_schedule=(
+                    self.survey_schedule.field_value)).count(), 1)
+
+    def test_translate_survey_lookups(self):
+        field_value = self.survey_schedule.field_value
+        self.assertEqual(
+            translate_survey_lookups(
+                SubjectVisitCode, survey_schedule__exact=field_value,
+                report_datetime__isnull=False),
+            dict(survey_schedule_code__exact=self.survey_schedule.code,
+                 report_datetime__isnull=False))
+        self.assertEqual(
+            translate_survey_lookups(
+                SubjectVisitCode, household_structure__survey_schedule=field_value),
+            dict(household_structure__survey_schedule_code=self.survey_schedule.code))
+        # not translated while the string field exists
+        self.assertEqual(
+            translate_survey_lookups(SubjectVisitMigrating, survey_schedule=field_value),
+            dict(survey_schedule=field_value))
+
+    def test_with_survey_objects(self):
+        self.make_subject_visits(5)
+        objs = list(SubjectVisitCode.objects.with_survey_objects())
+        self.assertEqual(len(objs), 5)
+        for obj in objs:
+            self.assertEqual(obj._survey_object, (obj.survey, obj.survey_object))
+            self.assertEqual(obj.survey_object.field_value, obj.survey)
+        self.assertEqual(
+            SubjectVisitCode.objects.all().with_survey_objects()._iterable_class,
+            SurveyModelIterable)
+
+    def test_migrate_survey_codes(self):
+        self.make_subject_visits(5, model_cls=SubjectVisitMigrating)
+        self.assertEqual(migrate_survey_codes(SubjectVisitMigrating, chunk_size=2), 5)
+        survey_codes = {survey.field_value: survey.code for survey in self.surveys}
+        for obj in SubjectVisitMigrating.objects.all():
+            self.assertEqual(obj.survey_schedule_code, self.survey_schedule.code)
+            self.assertEqual(obj.survey_code, survey_codes[obj.survey])
+        self.assertEqual(
+            SubjectVisitMigrating.objects.filter(survey_code__isnull=True).count(), 0)
+
+    def test_migrate_survey_codes_not_registered(self):
+        SubjectVisitMigrating.objects.create(
+            survey_schedule='blah.blah.blah', survey='blah.blah.blah.blah')
+        self.assertRaises(
+            SurveyCodeError, migrate_survey_codes, SubjectVisitMigrating)
@@ -2,7 +2,8 @@
 
 from django.test import TestCase, tag
 
-from ..sparser import S, SurveyParserError
+from ..sparser import S, CompactS, SurveyParserError
+from ..sparser import parser_cache_info, parser_cache_clear
 from .survey_test_helper import SurveyTestHelper
 
 
@@ -63,3 +64,47 @@ class TestSurveyParser(TestCase):
             s.survey_schedule_field_value, 'bcpp_survey.year-1.test_community')
         self.assertEqual(
             s.field_value, 'bcpp_survey.year-1.ess.test_community')
+
+    def test_s_parse_is_cached(self):
+        parser_cache_clear()
+        s1 = S('bcpp_survey.year-1.ess.test_community')
+        s2 = S('bcpp_survey.year-1.ess.test_community')
+        self.assertIs(s1.parsed, s2.parsed)
+        cache_info = parser_cache_info()
+        self.assertEqual(cache_info.hits, 1)
+        self.assertEqual(cache_info.misses, 1)
+
+    def test_s_parse_cache_ignores_survey_name_of_survey(self):
+        parser_cache_clear()
+        s1 = S('bcpp_survey.year-1.ess.test_community')
+        s2 = S('bcpp_survey.year-1.ess.test_community', survey_name='ess')
+        s3 = S('bcpp_survey.year-1.ess.test_community', survey_name='ahs')
+        self.assertIs(s1.parsed, s2.parsed)
+        self.assertIs(s1.parsed, s3.parsed)
+        self.assertEqual(s3.survey_name, 'ess')
+        self.assertEqual(parser_cache_info().currsize, 1)
+
+    def test_s_parse_cache_by_survey_name(self):
+        s1 = S('bcpp_survey.year-1.test_community', survey_name='ess')
+        s2 = S('bcpp_survey.year-1.test_community', survey_name='ahs')
+        self.assertEqual(s1.survey_name, 'ess')
+        self.assertEqual(s2.survey_name, 'ahs')
+
+    def test_s_parse_result_is_immutable(self):
+        s = S('bcpp_survey.year-1.ess.test_community')
+        self.assertRaises(AttributeError, setattr, s.parsed, 'map_area', 'blah')
+
+    def test_compact_s(self):
+        for value, survey_name in [
+                ('bcpp_survey.year-1.ess.test_community', None),
+                ('bcpp_survey.year-1.test_community', 'ess')]:
+            s = S(value, survey_name=survey_name)
+            compact_s = CompactS(value, survey_name=survey_name)
+            self.assertFalse(hasattr(compact_s, '__dict__'))
+            for attr in ['group_name', 'survey_schedule_name', 'survey_name',
+                         'map_area', 'field_value', 'survey_field_value',
+                         'survey_schedule_field_value']:
+                self.assertEqual(getattr(s, attr), getattr(compact_s, attr))
+
+    def test_compact_s_raises(self):
+        self.assertRaises(SurveyParserError, CompactS, 'bcpp_survey.ess')
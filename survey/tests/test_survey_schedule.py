@@ -6,7 +6,11 @@ from django.test import TestCase, tag
 
 from edc_base.utils import get_utcnow
 
+from ..exceptions import AddSurveyNameError, AddSurveyOverlapError
+from ..helpers import SurveyOverlapHelper
 from ..site_surveys import site_surveys
+from ..sparser import S
+from ..survey import Survey, SurveyTemplate, TemplateSurvey
 from ..survey_schedule import SurveySchedule, SurveyScheduleError
 from .survey_test_helper import SurveyTestHelper
 from .surveys import survey_one, survey_two, survey_three
@@ -46,6 +50,16 @@ class TestSurveySchedule(TestCase):
         self.assertEqual(survey_one.next, survey_two)
         self.assertEqual(survey_two.previous, survey_one)
 
+    def test_schedule_surveys_nth(self):
+        self.survey_helper.load_test_surveys(load_all=True)
+        self.assertEqual(survey_one.nth(2), survey_three)
+        self.assertEqual(survey_three.nth(-1), survey_two)
+        self.assertEqual(survey_three.nth(-2), survey_one)
+        self.assertIsNone(survey_three.nth(1))
+        self.assertIsNone(survey_one.nth(-1))
+        self.assertIsNone(survey_one.previous)
+        self.assertIsNone(survey_three.next)
+
     def test_schedule_surveys_current(self):
         self.survey_helper.load_test_surveys()
         self.assertEqual(
@@ -87,3 +101,190 @@ class TestSurveySchedule(TestCase):
         self.assertEqual(
             survey_three.field_value,
             site_surveys.get_survey_schedules(current=True)[0].field_value)
+
+
+class TestSurveyScheduleOverlap(TestCase):
+
+    survey_helper = SurveyTestHelper()
+
+    def setUp(self):
+        self.survey_schedule = self.survey_helper.make_survey_schedule(
+            map_areas=['test_community', 'other_community'])
+
+    def make_survey(self, name, position, days, map_area=None):
+        start = self.survey_schedule.start + relativedelta(days=days)
+        return Survey(
+            name=name,
+            position=position,
+            map_area=map_area or 'test_community',
+            start=start,
+            end=start + relativedelta(days=50),
+            full_enrollment_datetime=start + relativedelta(days=30))
+
+    def test_overlap_raises(self):
+        surveys = [
+            self.make_survey('survey1', 0, 1),
+            self.make_survey('survey2', 1, 40),
+            self.make_survey('survey3', 2, 45)]
+        with self.assertRaises(AddSurveyOverlapError) as cm:
+            self.survey_schedule.add_survey(*surveys)
+        self.assertIn('survey2', str(cm.exception))
+        self.assertIn('survey3', str(cm.exception))
+        self.assertEqual(self.survey_schedule.registry, [])
+
+    def test_overlap_with_added_survey_raises(self):
+        self.survey_schedule.add_survey(self.make_survey('survey1', 0, 1))
+        self.assertRaises(
+            AddSurveyOverlapError,
+            self.survey_schedule.add_survey, self.make_survey('survey2', 1, 40))
+
+    def test_overlap_other_map_area_ok(self):
+        surveys = [
+            self.make_survey('survey1', 0, 1),
+            self.make_survey('survey1', 0, 1, map_area='other_community')]
+        self.survey_schedule.add_survey(*surveys)
+        self.assertEqual(len(self.survey_schedule.surveys), 2)
+
+    def test_overlap_helper_reports_all(self):
+        surveys = [
+            self.make_survey('survey1', 0, 1),
+            self.make_survey('survey2', 1, 10),
+            self.make_survey('survey3', 2, 100),
+            self.make_survey('survey4', 3, 120)]
+        overlap_helper = SurveyOverlapHelper(surveys=surveys)
+        self.assertEqual(
+            overlap_helper.overlaps,
+            [(surveys[0], surveys[1]), (surveys[2], surveys[3])])
+
+    def test_overlap_helper_survey_templates(self):
+        survey_template = SurveyTemplate(
+            name='template',
+            position=4,
+            start=self.survey_schedule.start + relativedelta(days=100),
+            end=self.survey_schedule.start + relativedelta(days=150),
+            full_enrollment_datetime=(
+                self.survey_schedule.start + relativedelta(days=130)))
+        surveys = [
+            self.make_survey('survey1', 0, 1),
+            self.make_survey('survey2', 1, 120),
+            self.make_survey('survey1', 0, 90, map_area='other_community'),
+            self.make_survey('survey3', 2, 200, map_area='other_community')]
+        overlap_helper = SurveyOverlapHelper(
+            surveys=surveys, survey_templates=[survey_template])
+        self.assertEqual(
+            overlap_helper.overlaps,
+            [(surveys[2], survey_template), (survey_template, surveys[1])])
+        self.assertEqual(
+            SurveyOverlapHelper(
+                surveys=surveys[3:], survey_templates=[survey_template]).overlaps,
+            [])
+
+    def test_register_overlap_raises(self):
+        surveys = [
+            self.make_survey('survey1', 0, 1),
+            self.make_survey('survey2', 1, 100)]
+        self.survey_schedule.add_survey(*surveys)
+        # dates changed after the surveys were added
+        surveys[1].start = surveys[0].start
+        site_surveys._registry = []
+        self.assertRaises(
+            AddSurveyOverlapError,
+            site_surveys.register, self.survey_schedule)
+        self.assertEqual(site_surveys.registry, [])
+
+
+@tag('survey_template')
+class TestSurveyScheduleTemplate(TestCase):
+
+    survey_helper = SurveyTestHelper()
+
+    def setUp(self):
+        self.map_areas = [f'community_{n}' for n in range(0, 30)]
+        self.survey_schedule = self.survey_helper.make_survey_schedule(
+            name='year-1', map_area='community_0', map_areas=self.map_areas)
+        self.survey_schedule.add_survey_template(*[
+            self.make_survey_template(name, position, days)
+            for position, (name, days) in enumerate(
+                [('baseline', 1), ('annual-1', 100), ('annual-2', 200)])])
+        site_surveys._registry = []
+        site_surveys.register(self.survey_schedule)
+
+    def make_survey_template(self, name, position, days):
+        start = self.survey_schedule.start + relativedelta(days=days)
+        return SurveyTemplate(
+            name=name,
+            position=position,
+            start=start,
+            end=start + relativedelta(days=50),
+            full_enrollment_datetime=start + relativedelta(days=30))
+
+    def test_surveys_made_on_request(self):
+        self.assertEqual(self.survey_schedule._template_surveys, {})
+        surveys = self.survey_schedule.get_surveys(map_area='community_7')
+        self.assertEqual(
+            [s.field_value for s in surveys],
+            ['test_survey.year-1.baseline.community_7',
+             'test_survey.year-1.annual-1.community_7',
+             'test_survey.year-1.annual-2.community_7'])
+        self.assertEqual(len(self.survey_schedule._template_surveys), 3)
+        self.assertEqual(self.survey_schedule.get_surveys(map_area='blah'), [])
+
+    def test_get_survey_from_field_value(self):
+        field_value = 'test_survey.year-1.annual-1.community_12'
+        survey = site_surveys.get_survey_from_field_value(field_value)
+        self.assertIsInstance(survey, TemplateSurvey)
+        self.assertEqual(survey.field_value, field_value)
+        self.assertEqual(survey.position, 1)
+        self.assertEqual(survey.map_area_display, 'Community 12')
+        self.assertIs(survey.survey_schedule, self.survey_schedule)
+        self.assertIs(site_surveys.get_survey_from_field_value(field_value), survey)
+        self.assertIs(site_surveys.get_survey(field_value), survey)
+        self.assertEqual(len(self.survey_schedule._template_surveys), 1)
+
+    def test_templates_shared(self):
+        baseline = site_surveys.get_survey_from_field_value(
+            'test_survey.year-1.baseline.community_1')
+        other = site_surveys.get_survey_from_field_value(
+            'test_survey.year-1.baseline.community_2')
+        self.assertIs(baseline.template, other.template)
+        self.assertEqual(baseline.start, other.start)
+        self.assertNotEqual(baseline, other)
+
+    def test_all_surveys(self):
+        self.assertEqual(len(self.survey_schedule.surveys), 90)
+        self.assertEqual(len(site_surveys.surveys), 90)
+        self.assertEqual(sorted(site_surveys.map_areas), sorted(self.map_areas))
+
+    def test_current(self):
+        site_surveys.reset_current()
+        site_surveys.register_current(
+            S('test_survey.year-1.baseline.community_0'),
+            S('test_survey.year-1.annual-1.community_0'))
+        self.assertEqual(
+            [s.field_value for s in site_surveys.current_surveys],
+            ['test_survey.year-1.baseline.community_0',
+             'test_survey.year-1.annual-1.community_0'])
+        self.assertEqual(len(self.survey_schedule._template_surveys), 2)
+        self.assertEqual(
+            self.survey_schedule.current_surveys, site_surveys.current_surveys)
+
+    def test_template_overlap_raises(self):
+        self.assertRaises(
+            AddSurveyOverlapError,
+            self.survey_schedule.add_survey_template,
+            self.make_survey_template('annual-3', 3, 220))
+
+    def test_survey_overlaps_template_raises(self):
+        start = self.survey_schedule.start + relativedelta(days=120)
+        self.assertRaises(
+            AddSurveyOverlapError,
+            self.survey_schedule.add_survey,
+            Survey(name='extra', position=3, map_area='community_4',
+                   start=start, end=start + relativedelta(days=10),
+                   full_enrollment_datetime=start + relativedelta(days=5)))
+
+    def test_name_used_raises(self):
+        self.assertRaises(
+            AddSurveyNameError,
+            self.survey_schedule.add_survey_template,
+            self.make_survey_template('baseline', 3, 300))
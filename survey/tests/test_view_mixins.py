@@ -5,9 +5,10 @@ from django.views.generic.base import ContextMixin
 
 from edc_device import CLIENT
 
+from ..site_surveys import site_surveys
 from ..view_mixins import SurveyViewMixin, SurveyQuerysetViewMixin
 from .survey_test_helper import SurveyTestHelper
-from .surveys import survey_one
+from .surveys import survey_one, survey_two
 
 
 class TestView(SurveyViewMixin, ContextMixin):
@@ -24,6 +25,53 @@ class TestViewQs(SurveyViewMixin, SurveyQuerysetViewMixin,
     pass
 
 
+class DummyTemplateResponse:
+
+    def __init__(self):
+        self.current_surveys = None
+
+    def render(self):
+        self.current_surveys = site_surveys.current_surveys
+        return self
+
+
+class DispatchView:
+
+    def dispatch(self, request, *args, **kwargs):
+        return DummyTemplateResponse()
+
+
+class TestDispatchView(SurveyViewMixin, DispatchView):
+    pass
+
+
+class TestSurveyViewMixinDispatch(TestCase):
+
+    survey_helper = SurveyTestHelper()
+
+    def setUp(self):
+        self.survey_helper.load_test_surveys(load_count=2)
+
+    def test_dispatch_default_not_rendered(self):
+        response = TestDispatchView().dispatch(None)
+        self.assertIsNone(response.current_surveys)
+
+    def test_dispatch_named_as_default_not_rendered(self):
+        site_surveys.register_current(survey_one, name='one')
+        view = TestDispatchView()
+        view.current_surveys_name = 'one'
+        response = view.dispatch(None)
+        self.assertIsNone(response.current_surveys)
+
+    def test_dispatch_named_rendered_in_scope(self):
+        site_surveys.register_current(survey_two, name='two')
+        view = TestDispatchView()
+        view.current_surveys_name = 'two'
+        response = view.dispatch(None)
+        self.assertEqual(response.current_surveys, survey_two.surveys)
+        self.assertEqual(site_surveys.current_surveys, survey_one.surveys)
+
+
 class TestSurveyViewMixin(TestCase):
 
     survey_helper = SurveyTestHelper()
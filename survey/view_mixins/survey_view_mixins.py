@@ -5,6 +5,44 @@ from ..site_surveys import site_surveys
 
 class SurveyViewMixin:
 
+    # name of a current surveys configuration registered with
+    # `site_surveys.register_current(..., name=...)`, None for the default.
+    current_surveys_name = None
+
+    def get_current_surveys_name(self):
+        return self.current_surveys_name
+
+    def dispatch(self, request, *args, **kwargs):
+        """Handles the request with the selected current surveys
+        configuration, see `site_surveys.using_current`.
+
+        A TemplateResponse is usually rendered after dispatch returns,
+        outside the scope, where templates would see the default
+        configuration. So if the selected configuration has other
+        current surveys than the default, the response is rendered
+        before leaving the scope. Otherwise rendering is left deferred,
+        e.g. for middleware that changes `context_data`.
+        """
+        name = self.get_current_surveys_name()
+        with site_surveys.using_current(name):
+            response = super().dispatch(request, *args, **kwargs)
+            if (callable(getattr(response, 'render', None))
+                    and self.differs_from_default(name)):
+                response = response.render()
+        return response
+
+    @staticmethod
+    def differs_from_default(name):
+        """Returns True if the named current surveys configuration
+        has other current surveys than the default.
+        """
+        if name is None:
+            return False
+        configuration = site_surveys.get_current_configuration(name)
+        default = site_surveys.get_current_configuration()
+        return (configuration.survey_set != default.survey_set
+                or configuration.survey_schedule_set != default.survey_schedule_set)
+
     def get_context_data(self, **kwargs):
         """Add survey and survey_schedule objects to the context.
         """